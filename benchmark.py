@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Benchmark offline dos scanners e da API contra o servidor simulado (mock_github.py).
+
+Cada combinação cenário × número de repositórios roda em um subprocesso
+próprio (o pico de memória medido é só daquele cenário), com todas as
+requisições redirecionadas para o servidor simulado. Para cada execução são
+medidos: tempo total, requisições/s, latência p50/p99 das requisições HTTP,
+erros e pico de RSS.
+
+Cenários:
+    verify       verify_github_pages.scan_all_repos()
+    check-urls   check_dashboard_urls.check_all_urls()
+    smart        smart_scanner.main()
+    fetch-all    fetch_all_github_repos.main() --full (API + CNAME)
+    pages-rest   fetch_github_pages_urls (API REST: /pages e /contents/CNAME)
+    unified      unified_scan.main() --full
+    api          dashboard_api: /api/sync-github (frio, em cache e 304)
+
+Uso:
+    python3 benchmark.py                                  # 30, 300 e 3000 repositórios
+    python3 benchmark.py --sizes 30,300 --scenarios verify,api
+    python3 benchmark.py --latency 0.05 --jitter 0.02 --slow-rate 0.01 --error-rate 0.01
+    python3 benchmark.py --baseline benchmark_baseline.json   # falha (exit 1) se houver regressão
+
+Por padrão os limites de taxa por host são elevados para --rate (o objetivo é
+medir o custo dos scanners, não a espera pela cota); use --rate 0 para manter
+os limites reais do rate_limiter.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from latency_tracker import percentile
+
+SIZES = (30, 300, 3000)
+SCENARIOS = ('verify', 'check-urls', 'smart', 'fetch-all', 'pages-rest', 'unified', 'api')
+DEFAULT_RATE = 1000.0
+REPORT_FILE = 'benchmark_report.json'
+WORKER_TIMEOUT = 1800
+# Métricas comparadas com o baseline (maior = pior)
+REGRESSION_METRICS = ('wall_s', 'p99_ms', 'peak_rss_mb')
+DEFAULT_TOLERANCE = 0.25
+
+
+# ----------------------------------------------------------------------
+# Subprocesso: executa um cenário e imprime o resultado em JSON
+# ----------------------------------------------------------------------
+
+class RequestLog:
+    """Observador do http_client: latência e status de cada requisição"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, method: str, url: str, seconds: float, status: Optional[int]) -> None:
+        with self._lock:
+            self.latencies.append(seconds)
+            if status is None or status >= 500:
+                self.errors += 1
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def relax_rate_limits(rate: float) -> None:
+    import rate_limiter
+    rate_limiter.MAX_RATE = max(rate_limiter.MAX_RATE, rate)
+    limiter = rate_limiter.get_rate_limiter()
+    limiter.default_rate = rate
+    limiter.host_rates = {}
+
+
+def run_verify(names: List[str], domains: Dict[str, str]) -> Dict:
+    import verify_github_pages
+    verify_github_pages.KNOWN_REPOS = names
+    results = verify_github_pages.scan_all_repos()
+    return {key: results[key] for key in ('active', 'with_custom_domain', 'not_found', 'host_down')}
+
+
+def run_check_urls(names: List[str], domains: Dict[str, str]) -> Dict:
+    import check_dashboard_urls
+    from mock_github import MOCK_USERNAME
+    urls = [(name, f"https://{MOCK_USERNAME}.github.io/{name}/") for name in names]
+    urls += [(f"{name} (domínio)", f"https://{domain}") for name, domain in domains.items()]
+    check_dashboard_urls.TEST_URLS = urls
+    results = check_dashboard_urls.check_all_urls()
+    return {key: len(value) for key, value in results.items()}
+
+
+def run_smart(names: List[str], domains: Dict[str, str]) -> Dict:
+    import smart_scanner
+    smart_scanner.REPOS = names
+    smart_scanner.CUSTOM_DOMAINS = domains
+    smart_scanner.main()
+    return {}
+
+
+def isolate_api_caches(workdir: str) -> None:
+    """Caches do scan da API (ETag e CNAME negativo) em um diretório vazio"""
+    import fetch_all_github_repos
+    import http_cache
+    http_cache._cache.cache_dir = os.path.join(workdir, '.http_cache')
+    fetch_all_github_repos.NEGATIVE_CACHE = fetch_all_github_repos.NegativeCache(
+        os.path.join(workdir, '.http_cache', 'cname_negative.json'))
+
+
+def run_fetch_all(names: List[str], domains: Dict[str, str]) -> Dict:
+    import fetch_all_github_repos
+    isolate_api_caches(os.getcwd())
+    sys.argv = ['fetch_all_github_repos.py', '--full']
+    fetch_all_github_repos.main()
+    with open(fetch_all_github_repos.OUTPUT_FILE, encoding='utf-8') as f:
+        output = json.load(f)
+    return {key: output[key] for key in ('total_repos', 'with_custom_domain', 'github_pages_only')}
+
+
+def run_pages_rest(names: List[str], domains: Dict[str, str]) -> Dict:
+    import fetch_github_pages_urls
+    from mock_github import MOCK_USERNAME
+    isolate_api_caches(os.getcwd())
+    scanner = fetch_github_pages_urls.GitHubPagesScanner(MOCK_USERNAME, None)
+    results = scanner.scan_all_pages(batched=False)
+    return {key: results[key] for key in ('total_repos', 'pages_enabled', 'custom_domains')}
+
+
+def run_unified(names: List[str], domains: Dict[str, str]) -> Dict:
+    import check_dashboard_urls
+    import smart_scanner
+    import unified_scan
+    import verify_github_pages
+    from mock_github import MOCK_USERNAME
+    isolate_api_caches(os.getcwd())
+    verify_github_pages.KNOWN_REPOS = names
+    check_dashboard_urls.TEST_URLS = [(name, f"https://{MOCK_USERNAME}.github.io/{name}/") for name in names]
+    smart_scanner.GITHUB_PAGES_BASE = f"https://{MOCK_USERNAME}.github.io"
+    smart_scanner.REPOS = names
+    smart_scanner.CUSTOM_DOMAINS = domains
+    sys.argv = ['unified_scan.py', '--full']
+    unified_scan.main()
+    return {}
+
+
+def run_api(names: List[str], domains: Dict[str, str]) -> Dict:
+    # Sem snapshot anterior e sem atualização em segundo plano durante a medição
+    os.environ['DASHBOARD_SNAPSHOT'] = os.path.join(os.getcwd(), 'dashboard_snapshot.json')
+    os.environ['DASHBOARD_REFRESH_INTERVAL'] = '0'
+    import dashboard_api
+    dashboard_api.KNOWN_REPOS = names
+    client = dashboard_api.app.test_client()
+
+    started = time.monotonic()
+    cold = client.get('/api/sync-github')
+    cold_s = time.monotonic() - started
+
+    started = time.monotonic()
+    warm = client.get('/api/sync-github')
+    warm_s = time.monotonic() - started
+
+    not_modified = client.get('/api/sync-github', headers={'If-None-Match': warm.headers['ETag']})
+    payload = cold.get_json()
+    return {
+        'active': payload['active'],
+        'with_custom_domain': payload['with_custom_domain'],
+        'cold_s': round(cold_s, 3),
+        'warm_ms': round(warm_s * 1000, 1),
+        'not_modified_status': not_modified.status_code
+    }
+
+
+RUNNERS: Dict[str, Callable[[List[str], Dict[str, str]], Dict]] = {
+    'verify': run_verify,
+    'check-urls': run_check_urls,
+    'smart': run_smart,
+    'fetch-all': run_fetch_all,
+    'pages-rest': run_pages_rest,
+    'unified': run_unified,
+    'api': run_api,
+}
+
+
+def run_worker(scenario: str, repos: int, mock_url: str, rate: float) -> Dict:
+    """Executa um cenário neste processo, com as requisições enviadas ao mock_url"""
+    import http_client
+    from mock_github import MockWorld, local_url, public_url
+
+    world = MockWorld(repos)
+    http_client.set_url_rewriter(lambda url: local_url(mock_url, url), lambda url: public_url(mock_url, url))
+    log = RequestLog()
+    http_client.add_observer(log)
+    if rate > 0:
+        relax_rate_limits(rate)
+
+    workdir = tempfile.mkdtemp(prefix='bench-')
+    os.chdir(workdir)
+    baseline_rss = peak_rss_mb()
+
+    started = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = RUNNERS[scenario](world.names, world.custom_domains)
+    wall = time.monotonic() - started
+
+    latencies = list(log.latencies)
+    return {
+        'scenario': scenario,
+        'repos': repos,
+        'wall_s': round(wall, 3),
+        'requests': len(latencies),
+        'requests_per_s': round(len(latencies) / wall, 1) if wall > 0 else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        'errors': log.errors,
+        'baseline_rss_mb': baseline_rss,
+        'peak_rss_mb': peak_rss_mb(),
+        'result': result
+    }
+
+
+# ----------------------------------------------------------------------
+# Processo principal: servidor simulado, subprocessos e relatório
+# ----------------------------------------------------------------------
+
+def run_scenario(scenario: str, repos: int, mock_url: str, rate: float) -> Dict:
+    command = [sys.executable, os.path.abspath(__file__), '--worker', scenario,
+               '--repos', str(repos), '--mock-url', mock_url, '--rate', str(rate)]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=WORKER_TIMEOUT,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+    except subprocess.TimeoutExpired:
+        return {'scenario': scenario, 'repos': repos, 'error': f'timeout ({WORKER_TIMEOUT}s)'}
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        error = (completed.stderr.strip().splitlines() or ['sem saída'])[-1]
+        return {'scenario': scenario, 'repos': repos, 'error': error}
+    return json.loads(lines[-1])
+
+
+def compare(results: List[Dict], baseline_file: str, tolerance: float) -> List[str]:
+    """Compara com um relatório anterior; retorna as regressões encontradas"""
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = {(r['scenario'], r['repos']): r for r in json.load(f)['results'] if 'error' not in r}
+
+    regressions = []
+    for result in results:
+        before = baseline.get((result['scenario'], result['repos']))
+        if before is None or 'error' in result:
+            continue
+        for metric in REGRESSION_METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{result['scenario']} @ {result['repos']}: {metric} {old} → {new} "
+                                   f"(+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_table(results: List[Dict]) -> None:
+    print(f"\n{'cenário':<12} {'repos':>6} {'tempo(s)':>9} {'req':>7} {'req/s':>8} "
+          f"{'p50(ms)':>8} {'p99(ms)':>8} {'erros':>6} {'RSS(MB)':>8}")
+    print("-" * 82)
+    for r in results:
+        if 'error' in r:
+            print(f"{r['scenario']:<12} {r['repos']:>6}  ❌ {r['error'][:60]}")
+            continue
+        print(f"{r['scenario']:<12} {r['repos']:>6} {r['wall_s']:>9.2f} {r['requests']:>7} "
+              f"{r['requests_per_s'] or 0:>8.1f} {r['p50_ms'] or 0:>8.1f} {r['p99_ms'] or 0:>8.1f} "
+              f"{r['errors']:>6} {r['peak_rss_mb']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline dos scanners e da API")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                        help="números de repositórios (separados por vírgula)")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"cenários (separados por vírgula): {', '.join(SCENARIOS)}")
+    parser.add_argument('--latency', type=float, default=0.01, help="latência base do servidor (s)")
+    parser.add_argument('--jitter', type=float, default=0.01, help="latência adicional aleatória (s)")
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="fração de respostas lentas")
+    parser.add_argument('--slow-latency', type=float, default=1.0, help="atraso extra das respostas lentas (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fração de respostas 500")
+    parser.add_argument('--reset-rate', type=float, default=0.0, help="fração de conexões encerradas sem resposta")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help="taxa por host no rate_limiter (req/s); 0 mantém os limites reais")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=REPORT_FILE)
+    parser.add_argument('--baseline', help="relatório anterior para detectar regressões")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="piora aceita em relação ao baseline (0.25 = 25%%)")
+    # Uso interno (subprocesso de cada cenário)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--repos', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--mock-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.repos, args.mock_url, args.rate)))
+        return
+
+    from mock_github import MockGitHub
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    scenarios = [name.strip() for name in args.scenarios.split(',')]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"cenário(s) desconhecido(s): {', '.join(sorted(unknown))}")
+
+    settings = {key: getattr(args, key) for key in
+                ('latency', 'jitter', 'slow_rate', 'slow_latency', 'error_rate', 'reset_rate', 'rate', 'seed')}
+    print("="*82)
+    print("⏱️  BENCHMARK OFFLINE (servidor simulado)")
+    print("="*82)
+    print(f"Tamanhos: {sizes} | Cenários: {', '.join(scenarios)}")
+    print(f"Configuração: {settings}")
+
+    results = []
+    for size in sizes:
+        with MockGitHub(repos=size, latency=args.latency, jitter=args.jitter, slow_rate=args.slow_rate,
+                        slow_latency=args.slow_latency, error_rate=args.error_rate,
+                        reset_rate=args.reset_rate, seed=args.seed) as mock:
+            for scenario in scenarios:
+                print(f"▶️  {scenario} @ {size} repositórios...", flush=True)
+                result = run_scenario(scenario, size, mock.base_url, args.rate)
+                results.append(result)
+                if 'error' in result:
+                    print(f"   ❌ {result['error']}")
+                else:
+                    print(f"   ✅ {result['wall_s']:.2f}s, {result['requests']} requisições, "
+                          f"p99 {result['p99_ms']} ms, RSS {result['peak_rss_mb']} MB")
+
+    print_table(results)
+
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'settings': settings,
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Relatório salvo em: {args.output}")
+
+    failed = any('error' in result for result in results)
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\n🚨 REGRESSÕES (tolerância {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  • {line}")
+            failed = True
+        else:
+            print(f"\n✅ Nenhuma regressão em relação a {args.baseline}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
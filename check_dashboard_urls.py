@@ -6,10 +6,12 @@ e encontrar URLs corretas para os projetos.
 
 import requests
 import json
-import time
 from urllib.parse import urlparse
 from typing import Dict, List, Tuple
 
+from circuit_breaker import HostDownError
+from probe_engine import get_engine
+
 # Lista de URLs para testar (extraídas do dashboard)
 TEST_URLS = [
     # AMCC
@@ -56,10 +58,10 @@ TEST_URLS = [
     ("Wolf - ADU", "https://adu.wolfcarpenters.com"),
 ]
 
-def check_url(name: str, url: str) -> Tuple[str, str, int, str]:
+async def check_url(name: str, url: str) -> Tuple[str, str, int, str]:
     """Verifica se uma URL está acessível"""
     try:
-        response = requests.head(url, allow_redirects=True, timeout=10)
+        response = await get_engine().probe(url, allow_redirects=True, timeout=10)
         status = response.status_code
         final_url = response.url
         
@@ -73,6 +75,8 @@ def check_url(name: str, url: str) -> Tuple[str, str, int, str]:
             return (name, url, status, f"↪️  REDIRECIONADO para {final_url}")
         else:
             return (name, url, status, f"⚠️  STATUS {status}")
+    except HostDownError:
+        return (name, url, 0, "🔌 HOST FORA DO AR")
     except requests.exceptions.Timeout:
         return (name, url, 0, "⏱️  TIMEOUT")
     except requests.exceptions.ConnectionError:
@@ -80,11 +84,8 @@ def check_url(name: str, url: str) -> Tuple[str, str, int, str]:
     except Exception as e:
         return (name, url, 0, f"❌ ERRO: {str(e)[:50]}")
 
-def main():
-    print("="*80)
-    print("🔍 VERIFICADOR DE URLs DO DASHBOARD")
-    print("="*80 + "\n")
-    
+def check_all_urls() -> Dict[str, List[Tuple[str, str, int, str]]]:
+    """Verifica todas as URLs em paralelo e agrupa por resultado"""
     results = {
         'accessible': [],
         'not_found': [],
@@ -93,22 +94,40 @@ def main():
     
     print(f"🌐 Testando {len(TEST_URLS)} URLs...\n")
     
-    for name, url in TEST_URLS:
-        print(f"📍 {name[:40]:<40} ", end="", flush=True)
-        
-        result = check_url(name, url)
+    async def check_entry(entry: Tuple[str, str]) -> Tuple[str, str, int, str]:
+        result = await check_url(*entry)
+        print(f"📍 {entry[0][:40]:<40} {result[3]}")
+        return result
+    
+    for result in get_engine().map(check_entry, TEST_URLS):
         _, _, status, message = result
         
-        print(message)
-        
         if status == 200:
             results['accessible'].append(result)
         elif status == 404 or status == 0:
             results['not_found'].append(result)
         else:
             results['error'].append(result)
-        
-        time.sleep(0.3)  # Rate limiting
+    
+    return results
+
+def save_results(results: Dict, filename: str = 'url_check_results.json') -> None:
+    """Salva os resultados no formato de url_check_results.json"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({
+            'accessible': results['accessible'],
+            'not_found': results['not_found'],
+            'error': results['error']
+        }, f, indent=2)
+    
+    print(f"💾 Resultados salvos em: {filename}\n")
+
+def main():
+    print("="*80)
+    print("🔍 VERIFICADOR DE URLs DO DASHBOARD")
+    print("="*80 + "\n")
+    
+    results = check_all_urls()
     
     # Resumo
     print("\n" + "="*80)
@@ -172,14 +191,7 @@ def main():
         print()
     
     # Salva resultados
-    with open('url_check_results.json', 'w', encoding='utf-8') as f:
-        json.dump({
-            'accessible': results['accessible'],
-            'not_found': results['not_found'],
-            'error': results['error']
-        }, f, indent=2)
-    
-    print("💾 Resultados salvos em: url_check_results.json\n")
+    save_results(results)
 
 if __name__ == "__main__":
     try:
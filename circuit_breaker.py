@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker por host.
+
+Depois de FAILURE_THRESHOLD erros de conexão/timeouts seguidos, o host é
+considerado fora do ar: as próximas requisições para ele falham na hora com
+HostDownError, em vez de esperar o TIMEOUT inteiro. Passado o COOLDOWN, uma
+única requisição de teste (half-open) é liberada; se ela funcionar o host
+volta ao normal, senão (qualquer outro desfecho, inclusive cancelamento)
+fica bloqueado por mais um COOLDOWN.
+"""
+
+import os
+import threading
+import time
+from typing import Dict
+
+import requests
+
+FAILURE_THRESHOLD = int(os.environ.get('BREAKER_FAILURES', 3))
+COOLDOWN = float(os.environ.get('BREAKER_COOLDOWN', 60))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class HostDownError(requests.exceptions.ConnectionError):
+    """Host marcado como fora do ar pelo circuit breaker (nenhuma requisição foi feita)"""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"host down: {host} (nova tentativa em {retry_in:.0f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Estado do circuito (closed / open / half_open) de cada host"""
+
+    def __init__(self, threshold: int = FAILURE_THRESHOLD, cooldown: float = COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._hosts: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host: str) -> Dict:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {'state': CLOSED, 'failures': 0, 'opened_at': 0.0}
+        return state
+
+    def check(self, host: str) -> bool:
+        """
+        Levanta HostDownError se o host estiver bloqueado. Retorna True quando
+        a chamada é a requisição de teste (half-open) liberada após o COOLDOWN.
+        """
+        with self._lock:
+            state = self._state(host)
+            if state['state'] == CLOSED:
+                return False
+            elapsed = time.monotonic() - state['opened_at']
+            if state['state'] == OPEN and elapsed >= self.cooldown:
+                # Libera uma única requisição de teste
+                state['state'] = HALF_OPEN
+                return True
+            retry_in = max(0.0, self.cooldown - elapsed)
+        raise HostDownError(host, retry_in)
+
+    def success(self, host: str) -> None:
+        with self._lock:
+            state = self._state(host)
+            state.update(state=CLOSED, failures=0)
+
+    def failure(self, host: str) -> None:
+        """Registra um erro de conexão/timeout; abre o circuito ao atingir o limite"""
+        with self._lock:
+            state = self._state(host)
+            state['failures'] += 1
+            if state['state'] == HALF_OPEN or state['failures'] >= self.threshold:
+                state.update(state=OPEN, opened_at=time.monotonic())
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Estado de cada host que não está fechado"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    'state': state['state'],
+                    'failures': state['failures'],
+                    'retry_in': round(max(0.0, self.cooldown - (now - state['opened_at'])), 1)
+                }
+                for host, state in self._hosts.items() if state['state'] != CLOSED
+            }
+
+
+_breaker = CircuitBreaker()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Retorna o circuit breaker compartilhado"""
+    return _breaker
@@ -4,20 +4,100 @@ API Flask para sincronizar automaticamente o Dashboard com GitHub Pages
 Permite que o botão no HTML busque URLs e domínios personalizados em tempo real
 """
 
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, Response, jsonify, redirect, request, send_from_directory, stream_with_context
 from flask_cors import CORS
-import requests
+import asyncio
 import json
+import os
+import threading
 import time
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from check_dashboard_urls import TEST_URLS as DASHBOARD_URLS
+from circuit_breaker import HostDownError, get_circuit_breaker
+from generate_previews import MANIFEST_NAME, PREVIEWS_DIR, load_manifest
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from page_fingerprint import fingerprint_page, head_signature, save_validators
+from probe_engine import get_engine
+from refresh_scheduler import RefreshScheduler
+from result_cache import CACHE_TTL, ResultCache
+from screenshot_cache import DEFAULT_HEIGHT, DEFAULT_WIDTH, ScreenshotError, get_screenshot_store
+from static_assets import StaticAssets, compress_response, variant_etag
+from visual_diff import summarize as summarize_visuals
 
 app = Flask(__name__)
-CORS(app)  # Permite requisições do frontend
+CORS(app, expose_headers=['ETag'])  # Permite requisições do frontend
 
 # Configurações
 GITHUB_USERNAME = "mediagrowthmkt-debug"
 TIMEOUT = 10
 
+# Arquivos do dashboard servidos pela própria API (pré-comprimidos, com ETag)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC = StaticAssets(BASE_DIR)
+DATA_FILES = (
+    'projects_data.json',
+    'github_pages_verification.json',
+    'github_pages_scan.json',
+    'github_repos_analysis.json',
+    'url_check_results.json',
+)
+
+# Cache dos resultados por repositório (stale-while-revalidate)
+RESULT_CACHE = ResultCache(CACHE_TTL)
+
+# Último snapshot gravado em disco: restaurado na inicialização para que a
+# primeira requisição seja respondida na hora
+SNAPSHOT_FILE = os.environ.get(
+    'DASHBOARD_SNAPSHOT',
+    os.path.join(BASE_DIR, 'dashboard_snapshot.json')
+)
+SNAPSHOT_STATE = {'saved_at': None, 'restored': False}
+
+# Atualização em segundo plano (segundos; 0 desativa). Fica abaixo do CACHE_TTL
+# para que os endpoints encontrem sempre resultados atuais no cache
+REFRESH_INTERVAL = float(os.environ.get('DASHBOARD_REFRESH_INTERVAL', CACHE_TTL * 0.8))
+SCHEDULER = RefreshScheduler(REFRESH_INTERVAL)
+# start_services() roda uma única vez por processo
+SERVICES_STATE = {'started': False}
+SERVICES_LOCK = threading.Lock()
+
+# Redirecionamento /api/screenshot?url= -> imagem: curto, para que uma
+# recaptura apareça logo (a imagem em si é imutável)
+SCREENSHOT_REDIRECT_MAX_AGE = 300
+# Hosts lidos dos relatórios JSON, por arquivo: {caminho: (mtime, hosts)}
+REPORT_HOSTS: Dict[str, Tuple[float, Set[str]]] = {}
+
+# Status de verificação com falha (re-verificados com mais frequência)
+FAILING_STATUS = ('error', 'timeout', 'host_down')
+
+# Versão dos resultados: incrementada sempre que o status, a URL final ou o
+# domínio de algum repositório muda. Cada resultado guarda em 'version' a
+# versão da sua última mudança (usado por /api/sync-github?since=)
+SYNC_STATE = {'version': 0}
+VERSION_LOCK = threading.Lock()
+
+# Métricas exportadas em /api/metrics (as do motor ficam em metrics.py)
+REPO_LATENCY = REGISTRY.histogram(
+    'repo_probe_duration_seconds', 'Duração da verificação de cada repositório', ['repo'])
+REPO_RESULTS = REGISTRY.counter(
+    'repo_probe_results_total', 'Resultados das verificações por status', ['status'])
+CACHE_LOOKUPS = REGISTRY.counter(
+    'result_cache_lookups_total', 'Consultas ao cache de resultados (fresh, stale, miss)', ['result'])
+SYNC_DURATION = REGISTRY.histogram(
+    'sync_duration_seconds', 'Duração das sincronizações por origem', ['source'])
+REGISTRY.gauge('result_cache_hit_ratio', 'Fração das consultas respondidas pelo cache',
+               collect=lambda: cache_hit_ratio())
+REGISTRY.gauge('result_cache_refreshing', 'Repositórios sendo revalidados em segundo plano',
+               collect=lambda: {(): RESULT_CACHE.refreshing})
+REGISTRY.gauge('sync_version', 'Versão atual dos resultados (delta sync)',
+               collect=lambda: {(): current_version()})
+REGISTRY.gauge('snapshot_age_seconds', 'Idade do último snapshot gravado em disco',
+               collect=lambda: {(): snapshot_info()['age']} if SNAPSHOT_STATE['saved_at'] else {})
+REGISTRY.gauge('refresh_scheduler_urgent', 'Repositórios na fila rápida do agendador (falha ou mudança recente)',
+               collect=lambda: {(): SCHEDULER.snapshot()['urgent']})
+
 # Lista de repositórios conhecidos
 KNOWN_REPOS = [
     # INNOV
@@ -59,15 +139,31 @@ KNOWN_REPOS = [
     "LP-PROTEC-QUARTZ",
 ]
 
-def check_github_pages_url(repo_name: str) -> Dict:
-    """Verifica se a URL do GitHub Pages está ativa"""
+async def check_github_pages_url(repo_name: str, previous: Optional[Dict] = None) -> Dict:
+    """
+    Verifica se a URL do GitHub Pages está ativa. Com o resultado anterior
+    (`previous`), a impressão digital é reaproveitada enquanto o HEAD devolver
+    os mesmos validadores; a página só é baixada quando eles mudam.
+    """
     url = f"https://{GITHUB_USERNAME}.github.io/{repo_name}/"
     
     try:
-        response = requests.get(url, timeout=TIMEOUT, allow_redirects=True)
+        response = await get_engine().probe(url, timeout=TIMEOUT, allow_redirects=True)
         
         if response.status_code == 200:
             final_url = response.url
+            # Muda só quando o conteúdo da página muda (decide quando recapturar o preview).
+            # O GitHub Pages troca ETag/Last-Modified a cada deploy.
+            signature = head_signature(response)
+            if (previous and previous.get('fingerprint') and signature is not None
+                    and previous.get('page_signature') == signature and previous.get('final_url') == final_url):
+                fingerprint = previous['fingerprint']
+            else:
+                page = await fingerprint_page(final_url)
+                fingerprint = page['fingerprint'] if page else None
+                if fingerprint is None:
+                    # Sem impressão digital nova: tenta de novo na próxima verificação
+                    signature = None
             if final_url != url and not final_url.startswith(f"https://{GITHUB_USERNAME}.github.io"):
                 # Domínio personalizado detectado
                 custom_domain = final_url.replace('https://', '').replace('http://', '').split('/')[0]
@@ -76,6 +172,8 @@ def check_github_pages_url(repo_name: str) -> Dict:
                     'github_pages_url': url,
                     'custom_domain': custom_domain,
                     'final_url': final_url,
+                    'fingerprint': fingerprint,
+                    'page_signature': signature,
                     'status': 'active',
                     'status_code': response.status_code
                 }
@@ -85,6 +183,8 @@ def check_github_pages_url(repo_name: str) -> Dict:
                     'github_pages_url': url,
                     'custom_domain': None,
                     'final_url': url,
+                    'fingerprint': fingerprint,
+                    'page_signature': signature,
                     'status': 'active',
                     'status_code': response.status_code
                 }
@@ -96,6 +196,14 @@ def check_github_pages_url(repo_name: str) -> Dict:
                 'status_code': response.status_code
             }
             
+    except HostDownError as e:
+        # Host bloqueado pelo circuit breaker: nenhuma requisição foi feita
+        return {
+            'repo_name': repo_name,
+            'github_pages_url': url,
+            'status': 'host_down',
+            'error': str(e)
+        }
     except Exception as e:
         return {
             'repo_name': repo_name,
@@ -104,56 +212,339 @@ def check_github_pages_url(repo_name: str) -> Dict:
             'error': str(e)
         }
 
-@app.route('/api/sync-github', methods=['GET'])
-def sync_github():
-    """Endpoint para sincronizar com GitHub Pages"""
-    print("🔄 Iniciando sincronização com GitHub...")
+def sync_fields(result: Dict) -> Tuple:
+    """Campos que o dashboard usa de cada resultado"""
+    return (result.get('status'), result.get('final_url'), result.get('custom_domain'), result.get('fingerprint'))
+
+def bump_version() -> int:
+    with VERSION_LOCK:
+        SYNC_STATE['version'] += 1
+        return SYNC_STATE['version']
+
+def current_version() -> int:
+    with VERSION_LOCK:
+        return SYNC_STATE['version']
+
+async def probe_and_cache(repo_name: str) -> Dict:
+    """
+    Verifica o repositório e guarda o resultado no cache.
+    Requisições simultâneas (de qualquer endpoint) para o mesmo repositório
+    reaproveitam a verificação que já está em andamento.
+    """
+    async def probe() -> Dict:
+        previous = RESULT_CACHE.get(repo_name)
+        started = time.monotonic()
+        result = await check_github_pages_url(repo_name, previous[0] if previous else None)
+        REPO_LATENCY.observe(time.monotonic() - started, repo=repo_name)
+        REPO_RESULTS.inc(status=result['status'])
+        if result['status'] == 'active' and result['fingerprint'] is None and previous is not None:
+            # Página não baixou desta vez: mantém a impressão digital anterior
+            result['fingerprint'] = previous[0].get('fingerprint')
+        
+        changed = previous is not None and sync_fields(previous[0]) != sync_fields(result)
+        if previous is None or changed or 'version' not in previous[0]:
+            result['version'] = bump_version()
+        else:
+            result['version'] = previous[0]['version']
+        RESULT_CACHE.set(repo_name, result)
+        
+        # Repositórios que falharam ou acabaram de mudar voltam antes para a fila
+        SCHEDULER.reschedule(repo_name, urgent=changed or result['status'] in FAILING_STATUS)
+        return result
     
+    return await get_engine().single_flight(('repo', repo_name), probe)
+
+async def revalidate(repos: List[str]) -> None:
+    """Atualiza em segundo plano as entradas vencidas do cache"""
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*(probe_and_cache(repo) for repo in repos))
+        SYNC_DURATION.observe(time.monotonic() - started, source='background')
+        save_snapshot()
+    finally:
+        RESULT_CACHE.release_refresh(repos)
+
+def save_snapshot() -> None:
+    """Grava o cache atual em SNAPSHOT_FILE (escrita atômica)"""
+    RESULT_CACHE.save(SNAPSHOT_FILE)
+    SNAPSHOT_STATE['saved_at'] = time.time()
+    save_validators()
+
+def restore_snapshot() -> None:
+    """
+    Carrega o último snapshot gravado e começa a revalidar em segundo plano
+    as entradas vencidas; até lá elas são servidas como 'stale'.
+    """
+    saved_at = RESULT_CACHE.load(SNAPSHOT_FILE)
+    if saved_at is None:
+        return
+    SNAPSHOT_STATE.update(saved_at=saved_at, restored=True)
+    
+    # A numeração de versões continua de onde parou
+    versions = [entry[0].get('version', 0) for entry in map(RESULT_CACHE.get, KNOWN_REPOS) if entry]
+    with VERSION_LOCK:
+        SYNC_STATE['version'] = max(versions, default=0)
+    print(f"💾 Snapshot restaurado ({time.time() - saved_at:.0f}s atrás): {SNAPSHOT_FILE}")
+    
+    to_refresh = RESULT_CACHE.claim_refresh(RESULT_CACHE.classify(KNOWN_REPOS)['stale'])
+    if to_refresh:
+        get_engine().submit(revalidate(to_refresh))
+
+async def refresh_due(repos: List[str]) -> None:
+    """Chamado pelo agendador: revalida os repositórios vencidos que ninguém está verificando"""
+    to_refresh = RESULT_CACHE.claim_refresh(repos)
+    if to_refresh:
+        await revalidate(to_refresh)
+
+def start_background_refresh() -> None:
+    """Inicia o agendador; entradas restauradas do snapshot mantêm o horário original"""
+    if REFRESH_INTERVAL <= 0:
+        return
+    now = time.time()
+    last_update = {}
+    for repo in KNOWN_REPOS:
+        entry = RESULT_CACHE.get(repo)
+        if entry is not None:
+            last_update[repo] = now - entry[1]
+    SCHEDULER.track(KNOWN_REPOS, last_update)
+    SCHEDULER.start(get_engine(), refresh_due)
+    print(f"⏰ Atualização em segundo plano a cada ~{REFRESH_INTERVAL:.0f}s")
+
+def cache_hit_ratio() -> Dict[Tuple, float]:
+    """Fração das consultas ao cache respondidas sem verificar na hora (fresh + stale)"""
+    lookups = {key[0]: value for key, value in CACHE_LOOKUPS.values().items()}
+    total = sum(lookups.values())
+    return {(): round((lookups.get('fresh', 0) + lookups.get('stale', 0)) / total, 4)} if total else {}
+
+def snapshot_info() -> Dict:
+    """Origem e idade do último snapshot em disco"""
+    saved_at = SNAPSHOT_STATE['saved_at']
+    return {
+        'restored': SNAPSHOT_STATE['restored'],
+        'saved_at': saved_at,
+        'age': round(time.time() - saved_at, 1) if saved_at else None
+    }
+
+def plan_cache(repos: List[str], max_age: float, force: bool) -> Dict[str, List[str]]:
+    """
+    Separa os repositórios em 'fresh', 'stale' e 'miss'.
+    Com force, todos são tratados como ausentes; os vencidos começam a ser
+    revalidados em segundo plano imediatamente.
+    """
+    if force:
+        CACHE_LOOKUPS.inc(len(repos), result='miss')
+        return {'fresh': [], 'stale': [], 'miss': list(repos)}
+    
+    groups = RESULT_CACHE.classify(repos, max_age)
+    for status, keys in groups.items():
+        CACHE_LOOKUPS.inc(len(keys), result=status)
+    to_refresh = RESULT_CACHE.claim_refresh(groups['stale'])
+    if to_refresh:
+        get_engine().submit(revalidate(to_refresh))
+    return groups
+
+def cached_result(repo_name: str, cache_status: str) -> Dict:
+    """Resultado do cache acrescido da idade e da origem"""
+    result, age = RESULT_CACHE.get(repo_name)
+    return {**result, 'cache_age': round(age, 1), 'cache_status': cache_status}
+
+def cache_summary(groups: Dict[str, List[str]], max_age: float, results: List[Dict]) -> Dict:
+    return {
+        'max_age': max_age,
+        'fresh': len(groups['fresh']),
+        'stale': len(groups['stale']),
+        'miss': len(groups['miss']),
+        'refreshing': RESULT_CACHE.refreshing,
+        'oldest_age': max((r['cache_age'] for r in results), default=0),
+        'snapshot': snapshot_info()
+    }
+
+def get_repo_results(repos: List[str], max_age: float = CACHE_TTL, force: bool = False) -> Tuple[List[Dict], Dict]:
+    """
+    Retorna os resultados dos repositórios usando o cache.
+    Entradas ausentes (ou todas, com force) são verificadas na hora;
+    entradas vencidas são devolvidas como estão e revalidadas em segundo plano.
+    """
+    groups = plan_cache(repos, max_age, force)
+    if groups['miss']:
+        get_engine().map(probe_and_cache, groups['miss'])
+        save_snapshot()
+    
+    cache_status = {repo: status for status, keys in groups.items() for repo in keys}
+    results = [cached_result(repo, cache_status[repo]) for repo in repos]
+    return results, cache_summary(groups, max_age, results)
+
+def iter_repo_results(repos: List[str], max_age: float, force: bool, cache_info: Dict) -> Iterator[Dict]:
+    """
+    Igual a get_repo_results, mas entrega cada resultado assim que fica pronto:
+    primeiro os que estão em cache, depois cada verificação conforme termina.
+    O resumo do cache é preenchido em `cache_info` ao final.
+    """
+    groups = plan_cache(repos, max_age, force)
+    results = []
+    
+    for status in ('fresh', 'stale'):
+        for repo in groups[status]:
+            results.append(cached_result(repo, status))
+            yield results[-1]
+    
+    for result in get_engine().iter_completed(probe_and_cache, groups['miss']):
+        results.append(cached_result(result['repo_name'], 'miss'))
+        yield results[-1]
+    if groups['miss']:
+        save_snapshot()
+    
+    cache_info.update(cache_summary(groups, max_age, results))
+
+def summarize(repositories: List[Dict], cache_info: Dict, version: int) -> Dict:
+    """
+    Monta o resumo da sincronização a partir dos resultados por repositório.
+    `version` deve ser lida antes dos resultados: uma mudança feita em segundo
+    plano no meio da leitura fica acima dela e volta no próximo delta.
+    """
     results = {
-        'total_checked': len(KNOWN_REPOS),
+        'total_checked': len(repositories),
         'active': 0,
         'with_custom_domain': 0,
         'not_found': 0,
-        'repositories': [],
-        'custom_domains': {}
+        'host_down': 0,
+        'repositories': repositories,
+        'custom_domains': {},
+        'cache': cache_info,
+        'version': version
     }
     
-    for repo in KNOWN_REPOS:
-        result = check_github_pages_url(repo)
-        results['repositories'].append(result)
-        
+    for result in repositories:
         if result['status'] == 'active':
             results['active'] += 1
             if result.get('custom_domain'):
                 results['with_custom_domain'] += 1
-                results['custom_domains'][repo] = result['custom_domain']
+                results['custom_domains'][result['repo_name']] = result['custom_domain']
         elif result['status'] == 'not_found':
             results['not_found'] += 1
-        
-        time.sleep(0.3)  # Rate limiting
+        elif result['status'] == 'host_down':
+            results['host_down'] += 1
     
-    print(f"✅ Sincronização completa: {results['active']} ativos, {results['with_custom_domain']} com domínio personalizado")
+    return results
+
+def cache_params() -> Tuple[float, bool]:
+    """Lê os parâmetros max_age (segundos) e force da query string"""
+    max_age = request.args.get('max_age', default=CACHE_TTL, type=float)
+    force = request.args.get('force', '').lower() in ('1', 'true', 'yes')
+    return max_age, force
+
+def versioned_response(payload: Dict, etag: str) -> Response:
+    """
+    Resposta JSON com ETag da versão atual. Se o cliente já tem essa versão
+    (If-None-Match, na forma original ou comprimida por compress_response),
+    responde 304 sem corpo com o mesmo ETag que ele enviou.
+    """
+    matched = next((tag for tag in (etag, variant_etag(etag, 'gzip')) if request.if_none_match.contains(tag)), None)
+    if matched:
+        response = Response(status=304)
+        response.set_etag(matched)
+    else:
+        response = jsonify(payload)
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+def sse_event(event: str, data: Dict) -> str:
+    """Formata um evento Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/api/sync-github', methods=['GET'])
+def sync_github():
+    """
+    Endpoint para sincronizar com GitHub Pages.
+    Com ?since=<versão>, `repositories` e `custom_domains` trazem apenas os
+    repositórios que mudaram depois dessa versão (os totais continuam completos).
+    """
+    print("🔄 Iniciando sincronização com GitHub...")
+    
+    max_age, force = cache_params()
+    since = request.args.get('since', type=int)
+    version = current_version()
+    started = time.monotonic()
+    repositories, cache_info = get_repo_results(KNOWN_REPOS, max_age, force)
+    SYNC_DURATION.observe(time.monotonic() - started, source='sync-github')
+    results = summarize(repositories, cache_info, version)
+    
+    # Versão maior que a atual: o cliente veio de outro histórico, recebe tudo
+    if since is not None and since <= results['version']:
+        changed = [result for result in repositories if result.get('version', 0) > since]
+        results.update(
+            delta=True,
+            since=since,
+            repositories=changed,
+            custom_domains={
+                result['repo_name']: result['custom_domain']
+                for result in changed if result['status'] == 'active' and result.get('custom_domain')
+            }
+        )
+        print(f"✅ Sincronização (delta desde v{since}): {len(changed)} repositórios alterados")
+    else:
+        print(f"✅ Sincronização completa: {results['active']} ativos, {results['with_custom_domain']} com domínio personalizado")
+    
+    # O delta é outra representação: o ETag inclui a versão de origem
+    etag = f"sync-{results['version']}-since-{since}" if results.get('delta') else f"sync-{results['version']}"
+    return versioned_response(results, etag)
+
+@app.route('/api/sync-github/stream', methods=['GET'])
+def sync_github_stream():
+    """
+    Sincronização em streaming (Server-Sent Events): um evento `repo` por
+    repositório, assim que a verificação termina, e um evento `summary` no final
+    """
+    print("🔄 Iniciando sincronização (streaming) com GitHub...")
+    
+    max_age, force = cache_params()
+    
+    def generate():
+        cache_info = {}
+        repositories = []
+        version = current_version()
+        started = time.monotonic()
+        for result in iter_repo_results(KNOWN_REPOS, max_age, force, cache_info):
+            repositories.append(result)
+            yield sse_event('repo', result)
+        SYNC_DURATION.observe(time.monotonic() - started, source='sync-github-stream')
+        
+        summary = summarize(repositories, cache_info, version)
+        del summary['repositories']
+        print(f"✅ Sincronização completa: {summary['active']} ativos, {summary['with_custom_domain']} com domínio personalizado")
+        yield sse_event('summary', summary)
     
-    return jsonify(results)
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @app.route('/api/custom-domains', methods=['GET'])
 def get_custom_domains():
     """Retorna apenas os domínios personalizados em formato pronto para usar"""
     print("📋 Buscando domínios personalizados...")
     
+    max_age, force = cache_params()
+    version = current_version()
+    started = time.monotonic()
+    repositories, cache_info = get_repo_results(KNOWN_REPOS, max_age, force)
+    SYNC_DURATION.observe(time.monotonic() - started, source='custom-domains')
+    
     custom_domains = {}
     
-    for repo in KNOWN_REPOS:
-        result = check_github_pages_url(repo)
+    for repo, result in zip(KNOWN_REPOS, repositories):
         if result['status'] == 'active' and result.get('custom_domain'):
             custom_domains[repo] = result['custom_domain']
-        time.sleep(0.3)
     
-    return jsonify({
+    return versioned_response({
         'success': True,
         'count': len(custom_domains),
-        'domains': custom_domains
-    })
+        'domains': custom_domains,
+        'cache': cache_info,
+        'version': version
+    }, f"domains-{version}")
 
 @app.route('/api/health', methods=['GET'])
 def health():
@@ -161,10 +552,176 @@ def health():
     return jsonify({
         'status': 'ok',
         'message': 'Dashboard API está funcionando',
-        'github_username': GITHUB_USERNAME
+        'github_username': GITHUB_USERNAME,
+        'hosts_down': get_circuit_breaker().snapshot(),
+        'snapshot': snapshot_info(),
+        'refresh': SCHEDULER.snapshot(),
+        'screenshots': get_screenshot_store().snapshot()
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Métricas no formato texto do Prometheus"""
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+
+def url_host(url: str) -> Optional[str]:
+    """Host da URL (com ou sem esquema), em minúsculas"""
+    try:
+        return urlsplit(url if '://' in url else f"https://{url}").hostname
+    except ValueError:
+        return None
+
+def report_hosts(path: str) -> Set[str]:
+    """
+    Hosts das URLs e domínios de um relatório JSON (projects_data.json,
+    github_repos_analysis.json ou o manifesto das previews), relido só
+    quando o arquivo muda.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return set()
+    cached = REPORT_HOSTS.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    if isinstance(data, dict) and 'projects' in data:
+        # Manifesto das previews: chaves são as URLs (e aliases, as URLs finais)
+        values = list(data['projects']) + list(data.get('aliases', {}))
+    elif isinstance(data, dict):
+        values = [repo.get('custom_domain') for repo in data.get('repos_with_domains', [])]
+    else:
+        values = [project.get('websiteUrl') for project in data]
+    hosts = {host for host in map(url_host, filter(None, values)) if host}
+    REPORT_HOSTS[path] = (mtime, hosts)
+    return hosts
+
+def screenshot_hosts() -> Set[str]:
+    """
+    Hosts aceitos por /api/screenshot: os dos projetos e URLs do dashboard,
+    os domínios conhecidos (resultados das verificações e do scan da API) e
+    os que já estão no manifesto das previews.
+    """
+    hosts = {f"{GITHUB_USERNAME.lower()}.github.io"}
+    hosts.update(filter(None, (url_host(url) for _, url in DASHBOARD_URLS)))
+    hosts |= report_hosts(os.path.join(BASE_DIR, 'projects_data.json'))
+    hosts |= report_hosts(os.path.join(BASE_DIR, 'github_repos_analysis.json'))
+    hosts |= report_hosts(os.path.join(PREVIEWS_DIR, MANIFEST_NAME))
+    for repo in KNOWN_REPOS:
+        entry = RESULT_CACHE.get(repo)
+        if entry:
+            hosts.update(filter(None, (url_host(entry[0].get('final_url') or ''),
+                                       url_host(entry[0].get('custom_domain') or ''))))
+    return hosts
+
+def screenshot_allowed(url: str) -> bool:
+    """URL de um host conhecido ou de um subdomínio dele (ex.: lp.cliente.com.br)"""
+    host = url_host(url)
+    if not host:
+        return False
+    hosts = screenshot_hosts()
+    return host in hosts or any(host.endswith(f".{known}") for known in hosts)
+
+@app.route('/api/screenshot', methods=['GET'])
+def screenshot():
+    """
+    Screenshot de ?url= (tamanho opcional ?w=&h=) buscado uma única vez nos
+    serviços externos. Redireciona para /api/screenshot/<sha256>, que nunca
+    muda e pode ficar no cache do navegador para sempre. ?refresh=1 recaptura;
+    ?fp=<impressão digital da página> recaptura quando a página mudou.
+    Só aceita URLs dos projetos e domínios conhecidos (screenshot_hosts).
+    """
+    url = request.args.get('url', '')
+    width = request.args.get('w', default=DEFAULT_WIDTH, type=int)
+    height = request.args.get('h', default=DEFAULT_HEIGHT, type=int)
+    refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+    fingerprint = request.args.get('fp') or None
+    if url and not screenshot_allowed(url):
+        return jsonify({'error': 'url fora dos projetos conhecidos'}), 403
+    try:
+        entry = get_screenshot_store().get(url, width, height, refresh, fingerprint)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except ScreenshotError as e:
+        response = jsonify({'error': 'nenhum serviço de screenshot respondeu', 'details': str(e)})
+        response.status_code = 502
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    response = redirect(f"/api/screenshot/{entry['digest']}", code=302)
+    response.headers['Cache-Control'] = f"public, max-age={SCREENSHOT_REDIRECT_MAX_AGE}"
+    return response
+
+@app.route('/api/screenshot/<digest>', methods=['GET'])
+def screenshot_blob(digest: str):
+    """Imagem pelo hash do conteúdo (ETag = hash, cache imutável)"""
+    store = get_screenshot_store()
+    blob = store.blob(digest) if len(digest) == 64 and all(c in '0123456789abcdef' for c in digest) else None
+    if blob is None:
+        return jsonify({'error': 'screenshot não encontrado'}), 404
+
+    if request.if_none_match.contains(digest):
+        response = Response(status=304)
+    else:
+        try:
+            with open(store.blob_path(digest), 'rb') as f:
+                response = Response(f.read(), content_type=blob['content_type'])
+        except OSError:
+            return jsonify({'error': 'screenshot não encontrado'}), 404
+    response.set_etag(digest)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.after_request
+def compress(response: Response) -> Response:
+    return compress_response(response, request)
+
 @app.route('/')
+@app.route('/index.html')
+def dashboard():
+    """Dashboard (index.html) servido pela própria API"""
+    return STATIC.response('index.html', request) or ('index.html não encontrado', 404)
+
+@app.route('/<name>.json')
+def data_file(name: str):
+    """Relatórios JSON gerados pelos scanners"""
+    filename = f"{name}.json"
+    if filename not in DATA_FILES:
+        return jsonify({'error': 'arquivo não encontrado'}), 404
+    return STATIC.response(filename, request) or (jsonify({'error': 'arquivo ainda não gerado'}), 404)
+
+@app.route('/previews/<path:filename>')
+def preview_file(filename: str):
+    """Miniaturas geradas por generate_previews.py (nome com hash do conteúdo)"""
+    response = send_from_directory(PREVIEWS_DIR, filename)
+    if filename == MANIFEST_NAME:
+        response.headers['Cache-Control'] = 'no-cache'
+    else:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.route('/api/visual-diff', methods=['GET'])
+def visual_diff():
+    """
+    Análise visual da última geração de previews: capturas em branco e
+    páginas que mudaram visualmente (hashes perceptuais, visual_diff.py).
+    ?status=blank ou ?status=changed filtra a lista.
+    """
+    manifest = load_manifest(PREVIEWS_DIR)
+    if not manifest:
+        return jsonify({'error': 'previews ainda não gerados (generate_previews.py)'}), 404
+    summary = summarize_visuals(manifest)
+    status = request.args.get('status')
+    if status in ('blank', 'changed'):
+        summary['flagged'] = [item for item in summary['flagged'] if item[status]]
+    return jsonify(summary)
+
+@app.route('/api')
 def index():
     """Página inicial da API"""
     return '''
@@ -212,23 +769,66 @@ def index():
         <div class="endpoint">
             <h3>GET /api/sync-github</h3>
             <p>Sincroniza com GitHub Pages e retorna todas as informações</p>
+            <p>Parâmetros: <code>max_age</code> (segundos) e <code>force=1</code> para ignorar o cache</p>
+            <p><code>since=&lt;versão&gt;</code> retorna só os repositórios alterados; envie <code>If-None-Match</code> para receber 304 quando nada mudou</p>
+        </div>
+        
+        <div class="endpoint">
+            <h3>GET /api/metrics</h3>
+            <p>Métricas no formato Prometheus: latência por repositório e por host, status HTTP, timeouts/erros, cache, duração das sincronizações e cota da API do GitHub</p>
         </div>
         
-        <p><a href="/api/health" style="color: #6366f1;">Testar API</a></p>
+        <div class="endpoint">
+            <h3>GET /api/sync-github/stream</h3>
+            <p>Mesma sincronização via Server-Sent Events: um evento <code>repo</code> por repositório e um <code>summary</code> no final</p>
+        </div>
+        
+        <div class="endpoint">
+            <h3>GET /api/screenshot?url=&lt;site&gt;&amp;w=1200&amp;h=800</h3>
+            <p>Screenshot do site buscado uma única vez (cache em disco, com failover entre serviços); redireciona para <code>/api/screenshot/&lt;sha256&gt;</code>, servido com ETag e cache imutável. <code>refresh=1</code> recaptura; <code>fp=</code> (impressão digital da página) recaptura quando a página mudou. Só sites dos projetos e domínios conhecidos (403 para os demais)</p>
+        </div>
+        
+        <div class="endpoint">
+            <h3>GET /api/visual-diff</h3>
+            <p>Previews em branco ou que mudaram visualmente na última execução de <code>generate_previews.py</code> (hashes perceptuais); <code>status=blank</code> ou <code>status=changed</code> filtra</p>
+        </div>
+        
+        <p><a href="/api/health" style="color: #6366f1;">Testar API</a> · <a href="/" style="color: #6366f1;">Abrir dashboard</a></p>
     </body>
     </html>
     '''
 
+def start_services() -> None:
+    """
+    Restaura o snapshot e inicia a atualização em segundo plano (uma vez por
+    processo). Chamado por `python3 dashboard_api.py` e pelo hook
+    post_worker_init do gunicorn; importar o módulo não inicia nenhuma verificação.
+    """
+    with SERVICES_LOCK:
+        if SERVICES_STATE['started']:
+            return
+        SERVICES_STATE['started'] = True
+    restore_snapshot()
+    start_background_refresh()
+
 if __name__ == '__main__':
     print("="*70)
     print("🚀 DASHBOARD API SERVER")
     print("="*70)
     print("📡 Servidor iniciando em: http://localhost:5000")
+    print("📊 Dashboard: http://localhost:5000/")
     print("🔗 Endpoints disponíveis:")
     print("   - GET /api/health - Status da API")
     print("   - GET /api/custom-domains - Domínios personalizados")
     print("   - GET /api/sync-github - Sincronização completa")
+    print("   - GET /api/sync-github/stream - Sincronização em streaming (SSE)")
+    print("   - GET /api/metrics - Métricas (Prometheus)")
+    print("   - GET /api/screenshot?url= - Screenshot em cache (proxy)")
+    print("   - GET /api/visual-diff - Previews em branco ou com mudança visual")
     print("="*70 + "\n")
     
-    # Debug mode desativado para segurança
-    app.run(debug=False, port=5000, host='127.0.0.1')
+    start_services()
+    
+    # Debug mode desativado para segurança.
+    # Em produção use gunicorn (configuração em gunicorn.conf.py): gunicorn dashboard_api:app
+    app.run(debug=False, port=5000, host='127.0.0.1', threaded=True)
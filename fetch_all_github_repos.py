@@ -2,14 +2,40 @@
 """
 Script para buscar TODOS os repositórios públicos do GitHub
 e detectar domínios personalizados configurados.
+
+Por padrão o scan é incremental: repositórios cujo pushed_at/updated_at
+não mudou desde o último github_repos_analysis.json reaproveitam o
+resultado anterior. Use --full para verificar tudo novamente.
+
+Uso:
+    python3 fetch_all_github_repos.py [--full]
 """
 
+import asyncio
+import os
+import sys
+import time
 import requests
 import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+from http_cache import CACHE_DIR, conditional_get
+from probe_engine import get_engine
+from rate_limiter import get_rate_limiter, host_of
 
 GITHUB_USERNAME = "mediagrowthmkt-debug"
 GITHUB_API_URL = "https://api.github.com"
+OUTPUT_FILE = 'github_repos_analysis.json'
+
+# Branches onde o CNAME é procurado (em ordem de prioridade) quando a
+# configuração do Pages não está disponível
+CNAME_BRANCHES = ['gh-pages', 'main', 'master']
+# Cota da API guardada para a listagem: abaixo dela /pages não é consultado
+PAGES_API_RESERVE = int(os.environ.get('PAGES_API_RESERVE', 10))
+
+# Repositórios confirmados sem CNAME não são consultados de novo por 24h
+NEGATIVE_CACHE_FILE = os.path.join(CACHE_DIR, 'cname_negative.json')
+NEGATIVE_CACHE_TTL = 24 * 3600
 
 def fetch_all_public_repos() -> List[Dict]:
     """
@@ -18,6 +44,7 @@ def fetch_all_public_repos() -> List[Dict]:
     all_repos = []
     page = 1
     per_page = 100
+    unchanged_pages = 0
     
     print(f"🔍 Buscando repositórios de {GITHUB_USERNAME}...\n")
     
@@ -30,8 +57,10 @@ def fetch_all_public_repos() -> List[Dict]:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = conditional_get(url, params=params, timeout=10)
             response.raise_for_status()
+            if response.from_cache:
+                unchanged_pages += 1
             
             repos = response.json()
             
@@ -49,6 +78,8 @@ def fetch_all_public_repos() -> List[Dict]:
                         'html_url': repo['html_url'],
                         'created_at': repo['created_at'],
                         'updated_at': repo['updated_at'],
+                        'pushed_at': repo.get('pushed_at'),
+                        'default_branch': repo.get('default_branch'),
                         'has_pages': True
                     })
             
@@ -61,65 +92,282 @@ def fetch_all_public_repos() -> List[Dict]:
             print(f"❌ Erro ao buscar página {page}: {e}")
             break
     
+    if unchanged_pages:
+        print(f"♻️  {unchanged_pages} página(s) sem alteração (304, servidas do cache local)\n")
+    
     return all_repos
 
-def detect_custom_domain(repo_name: str) -> Optional[str]:
+class NegativeCache:
     """
-    Detecta domínio personalizado verificando arquivo CNAME no repositório.
+    Repositórios confirmados sem CNAME, com validade (TTL).
+    Uma entrada também deixa de valer se o repositório recebeu push depois dela.
     """
-    # Tenta branch gh-pages primeiro
-    branches = ['gh-pages', 'main', 'master']
     
-    for branch in branches:
-        cname_url = f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{repo_name}/{branch}/CNAME"
-        
+    def __init__(self, path: str = NEGATIVE_CACHE_FILE, ttl: float = NEGATIVE_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
         try:
-            response = requests.get(cname_url, timeout=5)
-            if response.status_code == 200:
-                custom_domain = response.text.strip()
-                if custom_domain and 'github.io' not in custom_domain:
-                    return custom_domain
-        except requests.RequestException:
-            continue
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+    
+    def is_negative(self, repo_name: str, pushed_at: Optional[str] = None) -> bool:
+        entry = self.entries.get(repo_name)
+        if not entry or time.time() - entry['checked_at'] > self.ttl:
+            return False
+        if pushed_at and entry.get('pushed_at') != pushed_at:
+            return False
+        self.hits += 1
+        return True
+    
+    def add(self, repo_name: str, pushed_at: Optional[str] = None) -> None:
+        self.entries[repo_name] = {'checked_at': time.time(), 'pushed_at': pushed_at}
+    
+    def discard(self, repo_name: str) -> None:
+        self.entries.pop(repo_name, None)
+    
+    def save(self) -> None:
+        """Grava de forma atômica (arquivo temporário + rename)"""
+        now = time.time()
+        entries = {name: e for name, e in self.entries.items() if now - e['checked_at'] <= self.ttl}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+NEGATIVE_CACHE = NegativeCache()
+
+async def fetch_cname(repo_name: str, branch: str) -> Tuple[Optional[str], bool]:
+    """
+    Lê o arquivo CNAME de uma branch.
+    Retorna (domínio ou None, confirmado); confirmado é False em erro de rede.
+    """
+    cname_url = f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{repo_name}/{branch}/CNAME"
+    
+    try:
+        response = await get_engine().get(cname_url, timeout=5)
+    except requests.RequestException:
+        return None, False
+    
+    if response.status_code == 200:
+        custom_domain = response.text.strip()
+        if custom_domain and 'github.io' not in custom_domain:
+            return custom_domain, True
+    return None, response.status_code in (200, 404)
+
+async def first_cname(repo_name: str, branches: List[str]) -> Tuple[Optional[str], Optional[str], bool]:
+    """
+    Consulta as branches em paralelo, mas o resultado segue a ordem da lista:
+    vence a primeira branch (em prioridade) que tiver CNAME, não a que
+    responder primeiro. Retorna (domínio, branch, confirmado).
+    """
+    tasks = [asyncio.ensure_future(fetch_cname(repo_name, branch)) for branch in branches]
+    confirmed = True
+    try:
+        for branch, task in zip(branches, tasks):
+            custom_domain, ok = await task
+            confirmed = confirmed and ok
+            if custom_domain:
+                return custom_domain, branch, True
+    finally:
+        for task in tasks:
+            task.cancel()
+    return None, None, confirmed
+
+def fetch_pages_source(repo_name: str) -> Optional[Dict]:
+    """
+    Configuração do GitHub Pages do repositório (GET /repos/{owner}/{repo}/pages).
+    Retorna {'branch', 'path', 'cname'} ou None (sem Pages, erro ou cota da API
+    perto do fim - nesse caso o CNAME é procurado nas branches candidatas).
+    """
+    quota = get_rate_limiter().snapshot().get(host_of(GITHUB_API_URL), {}).get('remaining')
+    if quota is not None and quota <= PAGES_API_RESERVE:
+        return None
+    
+    url = f"{GITHUB_API_URL}/repos/{GITHUB_USERNAME}/{repo_name}/pages"
+    try:
+        response = conditional_get(url, timeout=10)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    
+    data = response.json()
+    source = data.get('source') or {}
+    return {'branch': source.get('branch'), 'path': source.get('path') or '/', 'cname': data.get('cname')}
+
+def discover_custom_domain(repo_name: str, default_branch: Optional[str] = None,
+                           pages_source: Optional[Dict] = None,
+                           pushed_at: Optional[str] = None) -> Tuple[Optional[str], Optional[str], bool]:
+    """
+    Usa o domínio configurado no GitHub Pages (`pages_source`, de
+    fetch_pages_source) quando disponível. Sem ele, procura o arquivo CNAME
+    nas branches candidatas em paralelo, respeitando a prioridade
+    gh-pages > main > master > branch padrão. Retorna (domínio, branch,
+    confirmado); confirmado é False se alguma branch falhou por erro de rede.
+    """
+    if NEGATIVE_CACHE.is_negative(repo_name, pushed_at):
+        return None, None, True
     
-    return None
+    if pages_source is not None:
+        # Configuração do próprio Pages: não precisa ler o CNAME das branches
+        cname = (pages_source.get('cname') or '').strip()
+        custom_domain = cname if cname and 'github.io' not in cname else None
+        branch = pages_source.get('branch') if custom_domain else None
+        confirmed = True
+    else:
+        branches = list(dict.fromkeys(CNAME_BRANCHES + ([default_branch] if default_branch else [])))
+        custom_domain, branch, confirmed = get_engine().run(first_cname(repo_name, branches))
+    
+    if custom_domain:
+        NEGATIVE_CACHE.discard(repo_name)
+    elif confirmed:
+        NEGATIVE_CACHE.add(repo_name, pushed_at)
+    return custom_domain, branch, confirmed
+
+def detect_custom_domain(repo_name: str, default_branch: Optional[str] = None) -> Optional[str]:
+    """
+    Detecta domínio personalizado verificando arquivo CNAME no repositório.
+    """
+    if NEGATIVE_CACHE.is_negative(repo_name):
+        return None
+    return discover_custom_domain(repo_name, default_branch, fetch_pages_source(repo_name))[0]
+
+def load_previous_analysis(path: str = OUTPUT_FILE) -> Dict[str, Dict]:
+    """
+    Carrega o resultado do último scan, indexado pelo nome do repositório.
+    """
+    if not os.path.exists(path):
+        return {}
+    
+    try:
+        with open(path, encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    repos = previous.get('repos_with_domains', []) + previous.get('repos_without_domains', [])
+    return {repo['name']: repo for repo in repos}
+
+def is_unchanged(previous: Optional[Dict], repo: Dict) -> bool:
+    """
+    Um repositório não mudou se pushed_at e updated_at são os mesmos do último scan.
+    Resultados sem CNAME confirmado (erro de rede no scan anterior) são verificados de novo.
+    """
+    if not previous or not repo.get('pushed_at') or not previous.get('cname_confirmed'):
+        return False
+    return (previous.get('pushed_at'), previous.get('updated_at')) == (repo['pushed_at'], repo['updated_at'])
+
+def analyze_repo(repo: Dict) -> Tuple[Optional[str], str]:
+    """
+    Detecta o domínio personalizado de um repositório.
+    Retorna (domínio ou None, origem) e marca repo['cname_confirmed'].
+    """
+    # Verifica homepage
+    if repo['homepage'] and 'github.io' not in repo['homepage']:
+        custom_domain = repo['homepage'].replace('https://', '').replace('http://', '').rstrip('/')
+        repo['cname_confirmed'] = True
+        return custom_domain, 'Homepage'
+    
+    # Confirmado sem CNAME recentemente: nem /pages é consultado
+    if NEGATIVE_CACHE.is_negative(repo['name'], repo.get('pushed_at')):
+        repo['cname_confirmed'] = True
+        return None, 'CNAME'
+    
+    # Domínio configurado no Pages; sem ele, o arquivo CNAME das branches candidatas
+    pages_source = fetch_pages_source(repo['name'])
+    custom_domain, branch, confirmed = discover_custom_domain(repo['name'], repo.get('default_branch'),
+                                                              pages_source, repo.get('pushed_at'))
+    repo['cname_confirmed'] = confirmed
+    if branch:
+        repo['cname_branch'] = branch
+    return custom_domain, 'Pages' if pages_source is not None else 'CNAME'
 
 def main():
     """
     Função principal.
     """
+    full_scan = '--full' in sys.argv[1:]
+    
     # Busca todos os repositórios
     repos = fetch_all_public_repos()
     
     print(f"📦 Total de repositórios com GitHub Pages: {len(repos)}\n")
+    
+    previous = {} if full_scan else load_previous_analysis()
+    if previous:
+        print(f"♻️  Scan incremental: {len(previous)} repositórios no scan anterior (use --full para verificar tudo)\n")
     print("=" * 80)
     
     # Detecta domínios personalizados
     repos_with_domains = []
     repos_without_domains = []
+    changes = {
+        'new': [],
+        'removed': sorted(set(previous) - {repo['name'] for repo in repos}),
+        'rescanned': [],
+        'reused': [],
+        'domain_changed': []
+    }
     
     for repo in repos:
         repo_name = repo['name']
-        print(f"\n🔍 Verificando: {repo_name}")
+        prev = previous.get(repo_name)
         
-        # Verifica homepage
-        if repo['homepage'] and 'github.io' not in repo['homepage']:
-            custom_domain = repo['homepage'].replace('https://', '').replace('http://', '').rstrip('/')
-            print(f"  ✅ Homepage: {custom_domain}")
+        if is_unchanged(prev, repo):
+            # Sem push desde o último scan: reaproveita o resultado
+            custom_domain = prev.get('custom_domain')
+            if prev.get('cname_branch'):
+                repo['cname_branch'] = prev['cname_branch']
+            repo['cname_confirmed'] = True
+            changes['reused'].append(repo_name)
+        else:
+            print(f"\n🔍 Verificando: {repo_name}")
+            custom_domain, source = analyze_repo(repo)
+            changes['rescanned'].append(repo_name)
+            if prev is None and previous:
+                changes['new'].append(repo_name)
+            
+            if custom_domain:
+                print(f"  ✅ {source}: {custom_domain}")
+            elif not repo['cname_confirmed']:
+                print("  ⚠️ CNAME não confirmado (erro de rede) - será verificado no próximo scan")
+            
+            if prev is not None and prev.get('custom_domain') != custom_domain:
+                changes['domain_changed'].append({
+                    'name': repo_name,
+                    'before': prev.get('custom_domain'),
+                    'after': custom_domain
+                })
+        
+        if custom_domain:
             repo['custom_domain'] = custom_domain
             repos_with_domains.append(repo)
         else:
-            # Tenta detectar CNAME
-            custom_domain = detect_custom_domain(repo_name)
-            if custom_domain:
-                print(f"  ✅ CNAME: {custom_domain}")
-                repo['custom_domain'] = custom_domain
-                repos_with_domains.append(repo)
-            else:
-                github_pages_url = f"https://{GITHUB_USERNAME}.github.io/{repo_name}/"
+            github_pages_url = f"https://{GITHUB_USERNAME}.github.io/{repo_name}/"
+            if repo_name in changes['rescanned']:
                 print(f"  📄 GitHub Pages: {github_pages_url}")
-                repo['github_pages_url'] = github_pages_url
-                repos_without_domains.append(repo)
+            repo['github_pages_url'] = github_pages_url
+            repos_without_domains.append(repo)
+    
+    if previous:
+        print("\n" + "=" * 80)
+        print(f"\n♻️  MUDANÇAS DESDE O ÚLTIMO SCAN:")
+        print(f"  • Reaproveitados (sem push): {len(changes['reused'])}")
+        print(f"  • Verificados novamente: {len(changes['rescanned'])}")
+        for name in changes['new']:
+            print(f"  ➕ Novo: {name}")
+        for name in changes['removed']:
+            print(f"  ➖ Removido: {name}")
+        for change in changes['domain_changed']:
+            print(f"  🔀 {change['name']}: {change['before'] or '—'} → {change['after'] or '—'}")
+    
+    NEGATIVE_CACHE.save()
+    if NEGATIVE_CACHE.hits:
+        print(f"\n🚫 {NEGATIVE_CACHE.hits} repositório(s) confirmados sem CNAME pulados (cache negativo)")
     
     # Relatório final
     print("\n" + "=" * 80)
@@ -140,14 +388,17 @@ def main():
         'with_custom_domain': len(repos_with_domains),
         'github_pages_only': len(repos_without_domains),
         'repos_with_domains': repos_with_domains,
-        'repos_without_domains': repos_without_domains
+        'repos_without_domains': repos_without_domains,
+        'scan': {
+            'mode': 'incremental' if previous else 'full',
+            'changes': changes
+        }
     }
     
-    output_file = 'github_repos_analysis.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
     
-    print(f"\n💾 Resultado salvo em: {output_file}")
+    print(f"\n💾 Resultado salvo em: {OUTPUT_FILE}")
     
     # Gera código JavaScript para CUSTOM_DOMAINS
     if repos_with_domains:
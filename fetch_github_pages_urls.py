@@ -12,12 +12,28 @@ Requer:
 
 import requests
 import json
-import time
 from typing import Dict, List, Optional
 
+from http_cache import conditional_get
+from rate_limiter import throttled_request
+
 # Configurações
 GITHUB_USERNAME = "mediagrowthmkt-debug"
 GITHUB_TOKEN = None  # Opcional: adicione um token para mais requisições
+GRAPHQL_BATCH_SIZE = 100  # Repositórios por consulta GraphQL
+
+# Estados do último deploy do ambiente github-pages → status equivalente da API REST /pages
+DEPLOYMENT_STATUS = {
+    'SUCCESS': 'built',
+    'ACTIVE': 'built',
+    'INACTIVE': 'built',
+    'PENDING': 'building',
+    'QUEUED': 'building',
+    'IN_PROGRESS': 'building',
+    'WAITING': 'building',
+    'ERROR': 'errored',
+    'FAILURE': 'errored',
+}
 
 class GitHubPagesScanner:
     def __init__(self, username: str, token: Optional[str] = None):
@@ -28,12 +44,14 @@ class GitHubPagesScanner:
         if token:
             self.headers['Authorization'] = f'token {token}'
         
+        self.token = token
         self.base_url = "https://api.github.com"
     
     def get_all_repos(self) -> List[Dict]:
         """Busca todos os repositórios do usuário"""
         repos = []
         page = 1
+        unchanged_pages = 0
         
         print(f"🔍 Buscando repositórios de {self.username}...")
         
@@ -41,7 +59,7 @@ class GitHubPagesScanner:
             url = f"{self.base_url}/users/{self.username}/repos"
             params = {'page': page, 'per_page': 100}
             
-            response = requests.get(url, headers=self.headers, params=params)
+            response = conditional_get(url, headers=self.headers, params=params)
             
             if response.status_code != 200:
                 print(f"❌ Erro ao buscar repositórios: {response.status_code}")
@@ -53,16 +71,18 @@ class GitHubPagesScanner:
             
             repos.extend(data)
             page += 1
-            time.sleep(0.5)  # Rate limiting
+            if response.from_cache:
+                unchanged_pages += 1
         
-        print(f"✅ Encontrados {len(repos)} repositórios\n")
+        cache_note = f" ({unchanged_pages} página(s) sem alteração, servidas do cache local)" if unchanged_pages else ""
+        print(f"✅ Encontrados {len(repos)} repositórios{cache_note}\n")
         return repos
     
     def get_pages_info(self, repo_name: str) -> Optional[Dict]:
         """Busca informações do GitHub Pages de um repositório"""
         url = f"{self.base_url}/repos/{self.username}/{repo_name}/pages"
         
-        response = requests.get(url, headers=self.headers)
+        response = throttled_request('GET', url, headers=self.headers)
         
         if response.status_code == 200:
             return response.json()
@@ -77,7 +97,7 @@ class GitHubPagesScanner:
         """Verifica se existe arquivo CNAME (domínio personalizado)"""
         url = f"{self.base_url}/repos/{self.username}/{repo_name}/contents/CNAME"
         
-        response = requests.get(url, headers=self.headers)
+        response = throttled_request('GET', url, headers=self.headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -88,9 +108,28 @@ class GitHubPagesScanner:
         
         return None
     
-    def scan_all_pages(self) -> Dict:
-        """Escaneia todos os repositórios e retorna informações do GitHub Pages"""
+    def scan_all_pages(self, batched: Optional[bool] = None) -> Dict:
+        """
+        Escaneia todos os repositórios e retorna informações do GitHub Pages.
+        
+        Por padrão usa o modo em lote (GraphQL) quando há token, já que a API
+        GraphQL exige autenticação; se a consulta falhar, volta para a API REST.
+        """
         repos = self.get_all_repos()
+        
+        if batched is None:
+            batched = self.token is not None
+        
+        if batched:
+            try:
+                return self.scan_all_pages_batched(repos)
+            except (requests.RequestException, RuntimeError) as e:
+                print(f"⚠️  Consulta GraphQL falhou ({e}), usando API REST...\n")
+        
+        return self.scan_all_pages_rest(repos)
+    
+    def scan_all_pages_rest(self, repos: List[Dict]) -> Dict:
+        """Modo REST: uma chamada /pages e uma /contents/CNAME por repositório"""
         results = {
             'total_repos': len(repos),
             'pages_enabled': 0,
@@ -113,6 +152,8 @@ class GitHubPagesScanner:
                     'name': repo_name,
                     'full_name': repo['full_name'],
                     'description': repo.get('description', ''),
+                    'homepage': repo.get('homepage') or '',
+                    'default_branch': repo.get('default_branch', ''),
                     'pages_url': pages_info.get('html_url', ''),
                     'custom_domain': custom_domain,
                     'status': pages_info.get('status', ''),
@@ -131,8 +172,119 @@ class GitHubPagesScanner:
                     print(f"✅ Pages ATIVO | 🌐 URL: {pages_info.get('html_url', '')}")
             else:
                 print("⚪ Pages não configurado")
+        
+        return results
+    
+    def _graphql_repo_fields(self, alias: str, repo_name: str) -> str:
+        """Trecho da consulta GraphQL para um repositório"""
+        return f"""
+  {alias}: repository(owner: {json.dumps(self.username)}, name: {json.dumps(repo_name)}) {{
+    name
+    homepageUrl
+    defaultBranchRef {{ name }}
+    ghPagesCname: object(expression: "gh-pages:CNAME") {{ ... on Blob {{ text }} }}
+    rootCname: object(expression: "HEAD:CNAME") {{ ... on Blob {{ text }} }}
+    docsCname: object(expression: "HEAD:docs/CNAME") {{ ... on Blob {{ text }} }}
+    deployments(environments: ["github-pages"], last: 1) {{
+      nodes {{ latestStatus {{ state }} }}
+    }}
+  }}"""
+    
+    def fetch_pages_batch(self, repo_names: List[str]) -> Dict[str, Dict]:
+        """Busca homepage, branch padrão, CNAME e status do Pages de até GRAPHQL_BATCH_SIZE repositórios em uma consulta"""
+        aliases = {f"r{i}": name for i, name in enumerate(repo_names)}
+        query = "query {" + "".join(
+            self._graphql_repo_fields(alias, name) for alias, name in aliases.items()
+        ) + "\n}"
+        
+        response = throttled_request('POST', f"{self.base_url}/graphql", headers=self.headers,
+                                     json={'query': query}, timeout=30)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        
+        payload = response.json()
+        data = payload.get('data')
+        if not data:
+            errors = payload.get('errors') or [{}]
+            raise RuntimeError(errors[0].get('message', 'resposta vazia'))
+        
+        return {name: data.get(alias) for alias, name in aliases.items() if data.get(alias)}
+    
+    def _pages_data_from_graphql(self, repo: Dict, node: Dict) -> Dict:
+        """Monta o mesmo formato do modo REST a partir do resultado GraphQL"""
+        default_branch = (node.get('defaultBranchRef') or {}).get('name') or repo.get('default_branch', 'main')
+        
+        # A branch gh-pages tem prioridade; depois raiz e /docs da branch padrão
+        candidates = [
+            (node.get('ghPagesCname'), 'gh-pages', '/'),
+            (node.get('rootCname'), default_branch, '/'),
+            (node.get('docsCname'), default_branch, '/docs'),
+        ]
+        custom_domain, branch, path = None, default_branch, '/'
+        for blob, blob_branch, blob_path in candidates:
+            text = (blob or {}).get('text', '').strip()
+            if text:
+                custom_domain, branch, path = text, blob_branch, blob_path
+                break
+        
+        # Sem histórico de deploy não há status: has_pages já indica que está publicado
+        deployments = (node.get('deployments') or {}).get('nodes') or []
+        state = ((deployments[-1] if deployments else {}).get('latestStatus') or {}).get('state')
+        status = DEPLOYMENT_STATUS.get(state, 'built' if state is None else state.lower())
+        
+        if custom_domain:
+            pages_url = f"https://{custom_domain}/"
+        else:
+            pages_url = f"https://{self.username}.github.io/{repo['name']}/"
+        
+        return {
+            'name': repo['name'],
+            'full_name': repo['full_name'],
+            'description': repo.get('description', ''),
+            'homepage': node.get('homepageUrl') or repo.get('homepage') or '',
+            'default_branch': default_branch,
+            'pages_url': pages_url,
+            'custom_domain': custom_domain,
+            'status': status,
+            'branch': branch,
+            'path': path,
+            'is_active': status == 'built'
+        }
+    
+    def scan_all_pages_batched(self, repos: List[Dict]) -> Dict:
+        """
+        Modo em lote: usa o campo has_pages da listagem e uma consulta GraphQL
+        a cada GRAPHQL_BATCH_SIZE repositórios com Pages
+        """
+        results = {
+            'total_repos': len(repos),
+            'pages_enabled': 0,
+            'custom_domains': 0,
+            'repositories': []
+        }
+        
+        pages_repos = [repo for repo in repos if repo.get('has_pages')]
+        print(f"🌐 Consultando {len(pages_repos)} repositórios com GitHub Pages via GraphQL...\n")
+        
+        for start in range(0, len(pages_repos), GRAPHQL_BATCH_SIZE):
+            batch = pages_repos[start:start + GRAPHQL_BATCH_SIZE]
+            nodes = self.fetch_pages_batch([repo['name'] for repo in batch])
             
-            time.sleep(0.3)  # Rate limiting
+            for repo in batch:
+                node = nodes.get(repo['name'])
+                if node is None:
+                    print(f"📦 {repo['name']}... ⚪ Não retornado pela consulta")
+                    continue
+                
+                repo_data = self._pages_data_from_graphql(repo, node)
+                results['repositories'].append(repo_data)
+                results['pages_enabled'] += 1
+                
+                if repo_data['custom_domain']:
+                    results['custom_domains'] += 1
+                    print(f"📦 {repo['name']}... ✅ Pages ATIVO | 🌟 Domínio: {repo_data['custom_domain']}")
+                else:
+                    print(f"📦 {repo['name']}... ✅ Pages ATIVO | 🌐 URL: {repo_data['pages_url']}")
         
         return results
     
@@ -193,7 +345,7 @@ def main():
         token = None
         print("⚠️  Continuando sem token (limite: 60 requisições/hora)\n")
     else:
-        print("✅ Token configurado (limite: 5000 requisições/hora)\n")
+        print("✅ Token configurado (limite: 5000 requisições/hora, modo em lote via GraphQL)\n")
     
     # Cria scanner e executa
     scanner = GitHubPagesScanner(GITHUB_USERNAME, token)
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Gera as miniaturas (previews) de todos os projetos em lote.
+
+Etapas:
+1. lê projects_data.json e calcula a impressão digital de cada websiteUrl
+   (page_fingerprint.py: HTML normalizado + CSS/JS da página), em paralelo;
+2. projetos cuja impressão digital não mudou desde a última execução são
+   pulados (o manifesto anterior é reaproveitado);
+3. os demais são capturados pelo proxy de screenshots (screenshot_cache.py,
+   com failover entre serviços e cache em disco) ou por um Chrome/Chromium
+   local em modo headless (--renderer chrome);
+4. cada captura é redimensionada em vários tamanhos (WebP e JPEG) em um pool
+   de processos e gravada em previews/ com o hash do conteúdo no nome;
+5. previews/manifest.json lista as imagens de cada projeto; o dashboard usa
+   essas miniaturas locais antes de recorrer aos serviços de screenshot.
+
+Sem o Pillow instalado (pip install Pillow) as capturas são gravadas sem
+redimensionar.
+
+Uso:
+    python3 generate_previews.py [--full] [--renderer api|chrome] [--workers N]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+import requests
+
+from page_fingerprint import fingerprint_page, save_validators
+from probe_engine import get_engine
+from screenshot_cache import ScreenshotError, get_screenshot_store
+import visual_diff
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = ImageOps = None
+    PIL_AVAILABLE = False
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECTS_FILE = os.path.join(BASE_DIR, 'projects_data.json')
+PREVIEWS_DIR = os.environ.get('PREVIEWS_DIR', os.path.join(BASE_DIR, 'previews'))
+MANIFEST_NAME = 'manifest.json'
+
+# Captura em alta resolução; os tamanhos menores saem dela
+CAPTURE_WIDTH, CAPTURE_HEIGHT = 1200, 800
+# Tamanhos gerados: grade (cards), lista e miniatura
+PREVIEW_SIZES = {
+    'grid': (1200, 800),
+    'list': (600, 400),
+    'thumb': (300, 200),
+}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+# Arquivos gerados: {slug}-{hash do projeto}-{tamanho}-{hash do conteúdo}.{formato}
+GENERATED_FILE_PATTERN = re.compile(
+    r'[a-z0-9-]+-[0-9a-f]{6}-(?:%s|original)-[0-9a-f]{10}\.(?:webp|jpg|png|gif)' % '|'.join(PREVIEW_SIZES))
+
+CAPTURE_WORKERS = int(os.environ.get('PREVIEW_CAPTURE_WORKERS', 4))
+CHROME_TIMEOUT = 60
+CHROME_BINARIES = ('chromium', 'chromium-browser', 'google-chrome', 'google-chrome-stable')
+
+
+def manifest_key(url: str) -> str:
+    """Chave das URLs no manifesto (o dashboard aplica a mesma transformação)"""
+    return unquote(url).strip().rstrip('/').lower()
+
+
+def slugify(text: str) -> str:
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')[:40] or 'preview'
+
+
+def sizes_signature() -> str:
+    """Muda quando os tamanhos ou a qualidade mudam: força gerar tudo de novo"""
+    config = [PREVIEW_SIZES, WEBP_QUALITY, JPEG_QUALITY, PIL_AVAILABLE, CAPTURE_WIDTH, CAPTURE_HEIGHT]
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def load_targets(path: str = PROJECTS_FILE) -> List[Dict]:
+    """Projetos com websiteUrl (uma entrada por URL distinta)"""
+    with open(path, encoding='utf-8') as f:
+        projects = json.load(f)
+
+    targets: Dict[str, Dict] = {}
+    for project in projects:
+        url = (project.get('websiteUrl') or '').strip()
+        if not url.startswith('http'):
+            continue
+        key = manifest_key(url)
+        if key not in targets:
+            label = f"{project.get('company', '')} {project.get('name', '')}"
+            targets[key] = {
+                'key': key,
+                'url': url,
+                'name': project.get('name', ''),
+                'company': project.get('company', ''),
+                'slug': f"{slugify(label)}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:6]}"
+            }
+    return list(targets.values())
+
+
+def load_manifest(output_dir: str) -> Dict:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir: str, manifest: Dict) -> None:
+    """Grava de forma atômica (arquivo temporário + rename)"""
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+
+
+# ----------------------------------------------------------------------
+# Etapa 1: impressão digital das páginas
+# ----------------------------------------------------------------------
+
+def fetch_fingerprints(targets: List[Dict]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """(impressão digital, URL final após redirects) de cada alvo; (None, None) em erro"""
+    async def fetch(target: Dict) -> Tuple[str, Tuple[Optional[str], Optional[str]]]:
+        page = await fingerprint_page(target['url'])
+        if page is None:
+            return target['key'], (None, None)
+        return target['key'], (page['fingerprint'], page['final_url'])
+
+    fingerprints = dict(get_engine().map(fetch, targets))
+    save_validators()
+    return fingerprints
+
+
+# ----------------------------------------------------------------------
+# Etapa 2: captura
+# ----------------------------------------------------------------------
+
+def find_chrome() -> Optional[str]:
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def capture_with_chrome(chrome: str, url: str) -> Tuple[bytes, str]:
+    """Screenshot PNG com o Chrome/Chromium local em modo headless"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'capture.png')
+        subprocess.run(
+            [chrome, '--headless=new', '--disable-gpu', '--hide-scrollbars', '--no-sandbox',
+             f'--window-size={CAPTURE_WIDTH},{CAPTURE_HEIGHT}', f'--screenshot={output}', url],
+            capture_output=True, timeout=CHROME_TIMEOUT, check=False
+        )
+        if not os.path.exists(output):
+            raise ScreenshotError('Chrome não gerou a captura')
+        with open(output, 'rb') as f:
+            return f.read(), 'chrome'
+
+
+def capture_with_api(url: str, fingerprint: Optional[str]) -> Tuple[bytes, str]:
+    """
+    Screenshot pelo proxy de screenshots (cache em disco compartilhado com a API).
+    A captura guardada é reaproveitada enquanto a impressão digital não mudar.
+    """
+    store = get_screenshot_store()
+    entry = store.get(url, CAPTURE_WIDTH, CAPTURE_HEIGHT, fingerprint=fingerprint)
+    with open(store.blob_path(entry['digest']), 'rb') as f:
+        return f.read(), entry['provider']
+
+
+# ----------------------------------------------------------------------
+# Etapa 3: redimensionamento (roda nos processos do pool)
+# ----------------------------------------------------------------------
+
+def _write_file(output_dir: str, stem: str, extension: str, data: bytes) -> str:
+    name = f"{stem}-{hashlib.sha256(data).hexdigest()[:10]}.{extension}"
+    path = os.path.join(output_dir, name)
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return name
+
+
+def render_variants(source: bytes, slug: str, output_dir: str) -> Tuple[Dict[str, Dict], Optional[bytes]]:
+    """
+    Gera os tamanhos de PREVIEW_SIZES em WebP e JPEG.
+    Retorna ({tamanho: {formato: arquivo}}, amostra para visual_diff ou None).
+    """
+    if not PIL_AVAILABLE:
+        image_type = next((ext for sig, ext in ((b'\x89PNG', 'png'), (b'\xff\xd8', 'jpg'), (b'RIFF', 'webp'),
+                                                 (b'GIF8', 'gif')) if source.startswith(sig)), 'png')
+        name = _write_file(output_dir, f"{slug}-original", image_type, source)
+        return {'original': {image_type: name, 'width': CAPTURE_WIDTH, 'height': CAPTURE_HEIGHT}}, None
+
+    image = Image.open(io.BytesIO(source)).convert('RGB')
+    variants = {}
+    for size_name, (width, height) in PREVIEW_SIZES.items():
+        # Corta a partir do topo (a dobra da página é o que interessa no preview)
+        resized = ImageOps.fit(image, (width, height), Image.LANCZOS, centering=(0.5, 0.0))
+        files = {'width': width, 'height': height}
+        for extension, options in (('webp', {'format': 'WEBP', 'quality': WEBP_QUALITY, 'method': 6}),
+                                   ('jpg', {'format': 'JPEG', 'quality': JPEG_QUALITY,
+                                            'optimize': True, 'progressive': True})):
+            buffer = io.BytesIO()
+            resized.save(buffer, **options)
+            files[extension] = _write_file(output_dir, f"{slug}-{size_name}", extension, buffer.getvalue())
+        variants[size_name] = files
+    if not visual_diff.VISUAL_DIFF_AVAILABLE:
+        return variants, None
+    # Mesma variante que analyze_visuals lê do disco para projetos sem amostra:
+    # hashes de variantes diferentes apontariam mudança visual onde não há
+    return variants, visual_diff.load_sample(smallest_image(output_dir, {'images': variants}))
+
+
+# ----------------------------------------------------------------------
+# Pipeline
+# ----------------------------------------------------------------------
+
+def remove_orphans(output_dir: str, manifest: Dict) -> int:
+    """
+    Apaga imagens geradas que não estão mais no manifesto. Só arquivos com o
+    nome no formato gerado por render_variants são considerados: o resto do
+    diretório (ex.: --output apontando para uma pasta existente) fica intacto.
+    """
+    referenced = {MANIFEST_NAME}
+    for entry in manifest['projects'].values():
+        for files in entry['images'].values():
+            referenced.update(value for key, value in files.items() if key not in ('width', 'height'))
+    removed = 0
+    for name in os.listdir(output_dir):
+        path = os.path.join(output_dir, name)
+        if name in referenced or not GENERATED_FILE_PATTERN.fullmatch(name) or not os.path.isfile(path):
+            continue
+        os.remove(path)
+        removed += 1
+    return removed
+
+
+def images_exist(output_dir: str, entry: Dict) -> bool:
+    return all(os.path.exists(os.path.join(output_dir, value))
+               for files in entry.get('images', {}).values()
+               for key, value in files.items() if key not in ('width', 'height'))
+
+
+def smallest_image(output_dir: str, entry: Dict) -> Optional[str]:
+    """Caminho da menor variante do projeto (a mais rápida de decodificar)"""
+    variants = sorted(entry.get('images', {}).values(), key=lambda files: files['width'])
+    for files in variants:
+        for extension in ('jpg', 'webp', 'png', 'gif'):
+            if extension in files:
+                return os.path.join(output_dir, files[extension])
+    return None
+
+
+def analyze_visuals(projects: Dict[str, Dict], samples: Dict[str, bytes], previous_projects: Dict[str, Dict],
+                    output_dir: str) -> Dict[str, int]:
+    """
+    Hashes perceptuais (visual_diff.py) das capturas novas, comparados com a
+    geração anterior; projetos ainda sem análise são lidos do disco. Projetos
+    não analisados de novo mantêm os hashes, mas deixam de contar como mudança.
+    """
+    for key, entry in projects.items():
+        if key not in samples and 'visual' not in entry:
+            path = smallest_image(output_dir, entry)
+            sample = visual_diff.load_sample(path) if path else None
+            if sample is not None:
+                samples[key] = sample
+
+    previous = {key: previous_projects.get(key, {}).get('visual') for key in samples}
+    results = visual_diff.analyze(samples, previous)
+    for key, entry in projects.items():
+        if key not in results and entry.get('visual', {}).get('changed'):
+            projects[key] = {**entry, 'visual': {**entry['visual'], 'changed': False}}
+    for key, visual in results.items():
+        projects[key]['visual'] = visual
+        entry = projects[key]
+        if visual['blank']:
+            print(f"⬜ Captura em branco: {entry['company']} - {entry['name']}")
+        if visual['changed']:
+            print(f"🔄 Mudança visual: {entry['company']} - {entry['name']} ({visual['distance']} bits)")
+    return {
+        'blank': sum(1 for visual in results.values() if visual['blank']),
+        'visual_changes': sum(1 for visual in results.values() if visual['changed'])
+    }
+
+
+def build_previews(full: bool = False, renderer: str = 'api', workers: Optional[int] = None,
+                   output_dir: str = PREVIEWS_DIR) -> Dict:
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.time()
+    targets = load_targets()
+    previous = load_manifest(output_dir)
+    signature = sizes_signature()
+    if previous.get('signature') != signature:
+        full = True
+    previous_projects = previous.get('projects', {})
+
+    chrome = None
+    if renderer == 'chrome':
+        chrome = find_chrome()
+        if chrome is None:
+            print("⚠️  Chrome/Chromium não encontrado, usando o proxy de screenshots")
+    if not PIL_AVAILABLE:
+        print("⚠️  Pillow não instalado: as capturas serão gravadas sem redimensionar (pip install Pillow)")
+    elif not visual_diff.VISUAL_DIFF_AVAILABLE:
+        print("⚠️  NumPy não instalado: comparação visual desativada (pip install numpy)")
+
+    print(f"🔍 Calculando a impressão digital de {len(targets)} páginas...")
+    fingerprints = fetch_fingerprints(targets)
+
+    projects: Dict[str, Dict] = {}
+    to_build: List[Dict] = []
+    stats = {'total': len(targets), 'built': 0, 'skipped': 0, 'failed': 0, 'kept_stale': 0,
+             'blank': 0, 'visual_changes': 0}
+    for target in targets:
+        fingerprint, final_url = fingerprints[target['key']]
+        prev = previous_projects.get(target['key'])
+        unchanged = prev is not None and (fingerprint is None or prev.get('fingerprint') == fingerprint)
+        if not full and unchanged and images_exist(output_dir, prev):
+            projects[target['key']] = prev
+            stats['skipped'] += 1
+        else:
+            target['fingerprint'] = fingerprint
+            target['final_url'] = final_url
+            to_build.append(target)
+
+    print(f"♻️  {stats['skipped']} sem alteração, 📸 {len(to_build)} para capturar\n")
+
+    def capture(target: Dict) -> Tuple[bytes, str]:
+        if chrome:
+            return capture_with_chrome(chrome, target['url'])
+        return capture_with_api(target['url'], target['fingerprint'])
+
+    def keep_previous(target: Dict) -> None:
+        # Falha na captura ou na imagem: mantém a miniatura anterior até a próxima execução
+        stats['failed'] += 1
+        prev = previous_projects.get(target['key'])
+        if prev and images_exist(output_dir, prev):
+            projects[target['key']] = prev
+            stats['kept_stale'] += 1
+
+    # Capturas (I/O) em threads; cada captura concluída vai direto para o pool de processos
+    with ThreadPoolExecutor(max_workers=CAPTURE_WORKERS) as capture_pool, \
+            ProcessPoolExecutor(max_workers=workers) as render_pool:
+        captures = {capture_pool.submit(capture, target): target for target in to_build}
+        renders = {}
+        samples: Dict[str, bytes] = {}
+        for future in as_completed(captures):
+            target = captures[future]
+            try:
+                source, provider = future.result()
+            except (ScreenshotError, ValueError, requests.RequestException, OSError, subprocess.SubprocessError) as e:
+                keep_previous(target)
+                print(f"❌ {target['company']} - {target['name']}: {str(e)[:80]}")
+                continue
+            target['provider'] = provider
+            target['source_digest'] = hashlib.sha256(source).hexdigest()
+            renders[render_pool.submit(render_variants, source, target['slug'], output_dir)] = target
+
+        for future in as_completed(renders):
+            target = renders[future]
+            try:
+                images, sample = future.result()
+            except Exception as e:
+                keep_previous(target)
+                print(f"❌ {target['company']} - {target['name']}: imagem inválida ({str(e)[:60]})")
+                continue
+            projects[target['key']] = {
+                'url': target['url'],
+                'final_url': target['final_url'],
+                'name': target['name'],
+                'company': target['company'],
+                'fingerprint': target['fingerprint'],
+                'provider': target['provider'],
+                'source_digest': target['source_digest'],
+                'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'images': images
+            }
+            if sample is not None:
+                samples[target['key']] = sample
+            stats['built'] += 1
+            print(f"✅ {target['company']} - {target['name']} ({target['provider']})")
+
+    if visual_diff.VISUAL_DIFF_AVAILABLE:
+        stats.update(analyze_visuals(projects, samples, previous_projects, output_dir))
+
+    # O dashboard procura pela URL do projeto ou pela URL final (domínio personalizado)
+    aliases = {}
+    for key, entry in projects.items():
+        if entry.get('final_url'):
+            final_key = manifest_key(entry['final_url'])
+            if final_key != key:
+                aliases[final_key] = key
+
+    manifest = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'signature': signature,
+        'sizes': {name: {'width': w, 'height': h} for name, (w, h) in PREVIEW_SIZES.items()} if PIL_AVAILABLE else {},
+        'projects': projects,
+        'aliases': aliases
+    }
+    save_manifest(output_dir, manifest)
+    stats['removed_files'] = remove_orphans(output_dir, manifest)
+    stats['seconds'] = round(time.time() - started, 1)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera as miniaturas dos projetos (previews/)")
+    parser.add_argument('--full', action='store_true', help="gera tudo de novo, mesmo sem alteração nas páginas")
+    parser.add_argument('--renderer', choices=('api', 'chrome'), default='api',
+                        help="api = proxy de screenshots (padrão); chrome = Chrome/Chromium local")
+    parser.add_argument('--workers', type=int, default=None, help="processos para redimensionar (padrão: nº de CPUs)")
+    parser.add_argument('--output', default=PREVIEWS_DIR, help="diretório de saída")
+    args = parser.parse_args()
+
+    print("="*70)
+    print("🖼️  GERADOR DE PREVIEWS")
+    print("="*70 + "\n")
+
+    stats = build_previews(full=args.full, renderer=args.renderer, workers=args.workers, output_dir=args.output)
+
+    print("\n" + "="*70)
+    print("📊 RESUMO")
+    print("="*70)
+    print(f"Projetos: {stats['total']}")
+    print(f"Gerados: {stats['built']}")
+    print(f"Sem alteração (pulados): {stats['skipped']}")
+    print(f"Falhas: {stats['failed']} ({stats['kept_stale']} com a miniatura anterior mantida)")
+    print(f"Capturas em branco: {stats['blank']}")
+    print(f"Mudanças visuais: {stats['visual_changes']}")
+    print(f"Arquivos antigos removidos: {stats['removed_files']}")
+    print(f"Tempo total: {stats['seconds']}s")
+    print(f"💾 Manifesto: {os.path.join(args.output, MANIFEST_NAME)}")
+    print("="*70)
+    sys.exit(1 if stats['failed'] and not stats['built'] and not stats['skipped'] else 0)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Geração interrompida")
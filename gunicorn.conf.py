@@ -0,0 +1,32 @@
+"""
+Configuração do gunicorn para o modo produção do dashboard_api.
+
+    gunicorn dashboard_api:app
+
+Um único processo com várias threads: o cache de resultados, o agendador de
+atualização e a numeração de versões ficam em memória e precisam ser
+compartilhados por todas as requisições. Vários processos multiplicariam as
+verificações e cada um teria a sua própria versão (quebrando ETag/delta).
+"""
+
+import os
+
+bind = f"{os.environ.get('DASHBOARD_HOST', '127.0.0.1')}:{os.environ.get('DASHBOARD_PORT', 5000)}"
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('DASHBOARD_THREADS', 32))
+
+# Conexões SSE (/api/sync-github/stream) ficam abertas durante a sincronização
+timeout = 120
+keepalive = 5
+
+# Não usar preload_app: a thread do motor de verificação precisa nascer no worker
+preload_app = False
+
+accesslog = '-'
+
+
+def post_worker_init(worker):
+    """Restaura o snapshot e inicia a atualização em segundo plano dentro do worker"""
+    import dashboard_api
+    dashboard_api.start_services()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Cache HTTP persistente com requisições condicionais (ETag / Last-Modified).
+
+Cada resposta 200 é guardada em disco junto com seus validadores. Nas
+próximas execuções a requisição é enviada com If-None-Match /
+If-Modified-Since; uma resposta 304 é servida da cópia local e não conta
+no limite de requisições da API do GitHub.
+
+Uso:
+    response = conditional_get(url, params={'page': 1}, headers=headers)
+    response.from_cache  # True quando veio de um 304
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+import requests
+
+from rate_limiter import throttled_request
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.http_cache')
+TIMEOUT = 10
+
+# Cabeçalhos da resposta original que são preservados na cópia local
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link')
+
+
+class ConditionalCache:
+    """Guarda respostas e validadores em disco, um arquivo JSON por URL"""
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def cache_key(url: str, params: Optional[Dict] = None) -> str:
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return url
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def load(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, response: requests.Response) -> None:
+        """Grava a resposta de forma atômica (arquivo temporário + rename)"""
+        entry = {
+            'url': key,
+            'stored_at': time.time(),
+            'headers': {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            'body': response.text
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _replay(entry: Dict, response: requests.Response) -> requests.Response:
+        """Transforma a resposta 304 em uma resposta 200 com o corpo guardado"""
+        cached = requests.Response()
+        cached.status_code = 200
+        cached.url = response.url
+        cached.request = response.request
+        cached.headers.update(entry['headers'])
+        # Cabeçalhos atuais (ex.: X-RateLimit-*) prevalecem sobre os guardados
+        cached.headers.update(response.headers)
+        cached.encoding = 'utf-8'
+        cached._content = entry['body'].encode('utf-8')
+        return cached
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            timeout: float = TIMEOUT, **kwargs) -> requests.Response:
+        """GET condicional; o atributo `from_cache` indica se o corpo veio do disco"""
+        key = self.cache_key(url, params)
+        entry = self.load(key)
+
+        request_headers = dict(headers or {})
+        if entry:
+            if 'ETag' in entry['headers']:
+                request_headers['If-None-Match'] = entry['headers']['ETag']
+            if 'Last-Modified' in entry['headers']:
+                request_headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+
+        response = throttled_request('GET', url, params=params, headers=request_headers, timeout=timeout, **kwargs)
+
+        if response.status_code == 304 and entry:
+            response = self._replay(entry, response)
+            response.from_cache = True
+            return response
+
+        if response.status_code == 200 and ('ETag' in response.headers or 'Last-Modified' in response.headers):
+            self.store(key, response)
+        response.from_cache = False
+        return response
+
+
+_cache = ConditionalCache()
+
+
+def conditional_get(url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                    timeout: float = TIMEOUT, **kwargs) -> requests.Response:
+    """GET condicional usando o cache compartilhado em .http_cache/"""
+    return _cache.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Cliente HTTP compartilhado (pool de conexões) usado por todos os scanners e pela API.
+
+Sem isso, cada requests.get abre uma nova conexão TCP+TLS. Aqui as conexões
+são reaproveitadas (keep-alive), então um scan completo paga um handshake
+por host em vez de um por URL.
+
+Se `httpx` e `h2` estiverem instalados (pip install "httpx[http2]"), as
+requisições usam HTTP/2 e várias verificações ao mesmo host
+(ex.: mediagrowthmkt-debug.github.io) são multiplexadas em uma única
+conexão. Caso contrário, é usado um requests.Session com pool. Nos dois
+casos as funções retornam requests.Response e levantam exceções de
+`requests`, então o código chamador não muda. Defina HTTP_CLIENT_HTTP2=0
+para forçar o requests.Session.
+
+O benchmark (benchmark.py) usa set_url_rewriter() para enviar todas as
+requisições a um servidor simulado local e add_observer() para medir cada
+requisição; em uso normal nenhum dos dois está ativo.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+    import h2  # noqa: F401 - necessário para http2=True no httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTP2_AVAILABLE = False
+
+USE_HTTP2 = HTTP2_AVAILABLE and os.environ.get('HTTP_CLIENT_HTTP2', '1') != '0'
+
+# Conexões mantidas por host (acompanha o limite global de concorrência)
+POOL_SIZE = int(os.environ.get('PROBE_CONCURRENCY', 32))
+TIMEOUT = 10
+
+_session: Optional[requests.Session] = None
+_httpx_client = None
+_lock = threading.Lock()
+
+# (URL pública -> URL enviada, URL recebida -> URL pública)
+_url_rewriter: Optional[Tuple[Callable[[str], str], Callable[[str], str]]] = None
+# observer(método, URL pública, segundos, status ou None em exceção)
+_observers: List[Callable[[str, str, float, Optional[int]], None]] = []
+
+
+def set_url_rewriter(to_target: Optional[Callable[[str], str]],
+                     to_public: Optional[Callable[[str], str]] = None) -> None:
+    """
+    Reescreve as URLs antes do envio e restaura a URL pública nas respostas
+    (response.url, redirects) e exceções. set_url_rewriter(None) desativa.
+    """
+    global _url_rewriter
+    _url_rewriter = (to_target, to_public or (lambda url: url)) if to_target else None
+
+
+def add_observer(observer: Callable[[str, str, float, Optional[int]], None]) -> None:
+    """Registra uma função chamada ao fim de cada requisição"""
+    _observers.append(observer)
+
+
+def get_session() -> requests.Session:
+    """requests.Session compartilhado com pool de conexões"""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+    return _session
+
+
+def _get_httpx_client():
+    global _httpx_client
+    with _lock:
+        if _httpx_client is None:
+            _httpx_client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE)
+            )
+    return _httpx_client
+
+
+def _httpx_kwargs(kwargs: dict) -> dict:
+    """Converte os argumentos do estilo requests para httpx"""
+    kwargs = dict(kwargs)
+    kwargs['follow_redirects'] = kwargs.pop('allow_redirects', True)
+    kwargs.setdefault('timeout', TIMEOUT)
+    kwargs.pop('stream', None)
+    return kwargs
+
+
+def _to_requests_response(response, content: bytes) -> requests.Response:
+    """Converte uma resposta httpx em requests.Response"""
+    converted = requests.Response()
+    converted.status_code = response.status_code
+    converted.url = str(response.url)
+    converted.reason = response.reason_phrase
+    converted.headers = CaseInsensitiveDict(response.headers.multi_items())
+    converted.encoding = response.encoding
+    converted._content = content
+    converted.http_version = response.http_version
+    return converted
+
+
+def _failed_request(error):
+    """Requisição (URL do salto que falhou) associada a uma exceção do httpx"""
+    try:
+        return requests.Request('GET', str(error.request.url))
+    except RuntimeError:
+        return None
+
+
+def _httpx_call(func):
+    """Traduz as exceções do httpx para as equivalentes do requests"""
+    try:
+        return func()
+    except httpx.TimeoutException as e:
+        raise requests.exceptions.Timeout(str(e), request=_failed_request(e)) from e
+    except httpx.ConnectError as e:
+        raise requests.exceptions.ConnectionError(str(e), request=_failed_request(e)) from e
+    except httpx.TooManyRedirects as e:
+        raise requests.exceptions.TooManyRedirects(str(e)) from e
+    except httpx.HTTPError as e:
+        raise requests.exceptions.RequestException(str(e)) from e
+
+
+def _dispatch(method: str, url: str, send: Callable[[str], requests.Response]) -> requests.Response:
+    """Aplica a reescrita de URLs e avisa os observadores"""
+    if _url_rewriter is None and not _observers:
+        return send(url)
+
+    to_target, to_public = _url_rewriter or (None, None)
+    started = time.monotonic()
+    status = None
+    try:
+        response = send(to_target(url) if to_target else url)
+        status = response.status_code
+    except requests.RequestException as e:
+        # O circuit breaker culpa o host da URL da exceção: precisa ser o público
+        if to_public and getattr(e.request, 'url', None):
+            e.request.url = to_public(e.request.url)
+        raise
+    finally:
+        for observer in _observers:
+            observer(method, url, time.monotonic() - started, status)
+
+    if to_public:
+        response.url = to_public(response.url)
+        for previous in response.history:
+            previous.url = to_public(previous.url)
+    return response
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Requisição HTTP usando o cliente compartilhado"""
+    return _dispatch(method, url, lambda target: _request(method, target, **kwargs))
+
+
+def _request(method: str, url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault('timeout', TIMEOUT)
+    if not USE_HTTP2:
+        return get_session().request(method, url, **kwargs)
+
+    client = _get_httpx_client()
+
+    def call():
+        response = client.request(method, url, **_httpx_kwargs(kwargs))
+        return _to_requests_response(response, response.content)
+
+    return _httpx_call(call)
+
+
+def bounded_get(url: str, max_bytes: int = 0, **kwargs) -> requests.Response:
+    """
+    GET em streaming que para após os cabeçalhos ou após `max_bytes` do corpo.
+    O corpo lido (possivelmente truncado) fica em `response.content`.
+    """
+    return _dispatch('GET', url, lambda target: _bounded_get(target, max_bytes, **kwargs))
+
+
+def _bounded_get(url: str, max_bytes: int, **kwargs) -> requests.Response:
+    kwargs.setdefault('timeout', TIMEOUT)
+    if USE_HTTP2:
+        client = _get_httpx_client()
+
+        def call():
+            with client.stream('GET', url, **_httpx_kwargs(kwargs)) as response:
+                body = b''
+                if max_bytes > 0:
+                    for chunk in response.iter_bytes():
+                        body += chunk
+                        if len(body) >= max_bytes:
+                            break
+                return _to_requests_response(response, body[:max_bytes])
+
+        return _httpx_call(call)
+
+    response = get_session().get(url, stream=True, **kwargs)
+    try:
+        body = b''
+        if max_bytes > 0:
+            for chunk in response.iter_content(chunk_size=min(max_bytes, 16384)):
+                body += chunk
+                if len(body) >= max_bytes:
+                    break
+        response._content = body[:max_bytes]
+    finally:
+        response.close()
+    return response
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Histórico de latência por host (janela móvel) para timeouts adaptativos e
+requisições "hedged".
+
+Em vez de esperar sempre o TIMEOUT fixo, o motor de verificação usa:
+- timeout do host = p99 observado × TIMEOUT_FACTOR (entre MIN_TIMEOUT e o
+  timeout pedido pelo chamador, que continua sendo o teto);
+- hedge: se a resposta não chegou depois do p95 do host, uma segunda
+  requisição idêntica é enviada e vale a que responder primeiro.
+
+Enquanto um host tem menos de MIN_SAMPLES medições, o timeout do chamador é
+usado sem hedge.
+
+Estourar o timeout adaptativo não conta como falha do host: o motor repete a
+requisição uma vez com o timeout do chamador (stats['timeout_retries']).
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+LATENCY_WINDOW = 200  # Medições guardadas por host
+MIN_SAMPLES = int(os.environ.get('LATENCY_MIN_SAMPLES', 10))
+TIMEOUT_FACTOR = 2.0  # Margem sobre o p99
+MIN_TIMEOUT = 1.0
+HEDGE_ENABLED = os.environ.get('PROBE_HEDGE', '1') != '0'
+MIN_HEDGE_DELAY = 0.05
+
+
+def percentile(samples, q: float) -> float:
+    """Percentil (0-100) por ordenação, sem interpolação"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LatencyTracker:
+    """Guarda as últimas latências de cada host e deriva timeout e atraso de hedge"""
+
+    def __init__(self, window: int = LATENCY_WINDOW, min_samples: int = MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hedged': 0, 'hedge_wins': 0, 'timeout_retries': 0}
+
+    def record(self, host: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(host)
+            if samples is None:
+                samples = self._samples[host] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def _percentile(self, host: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = self._samples.get(host)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            samples = list(samples)
+        return percentile(samples, q)
+
+    def timeout_for(self, host: str, ceiling: float) -> float:
+        """Timeout do host a partir do p99 (nunca acima do timeout do chamador)"""
+        p99 = self._percentile(host, 99)
+        if p99 is None:
+            return ceiling
+        return min(ceiling, max(MIN_TIMEOUT, p99 * TIMEOUT_FACTOR))
+
+    def hedge_delay(self, host: str) -> Optional[float]:
+        """Espera (p95) antes de enviar a requisição duplicada; None = sem hedge"""
+        if not HEDGE_ENABLED:
+            return None
+        p95 = self._percentile(host, 95)
+        return None if p95 is None else max(MIN_HEDGE_DELAY, p95)
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """p50/p95/p99 e número de medições de cada host"""
+        with self._lock:
+            hosts = {host: list(samples) for host, samples in self._samples.items()}
+        return {
+            host: {
+                'samples': len(samples),
+                'p50': round(percentile(samples, 50), 3),
+                'p95': round(percentile(samples, 95), 3),
+                'p99': round(percentile(samples, 99), 3)
+            }
+            for host, samples in hosts.items() if samples
+        }
+
+
+_tracker = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Retorna o histórico de latência compartilhado"""
+    return _tracker
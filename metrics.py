@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Métricas no formato texto do Prometheus (sem dependências externas).
+
+Contadores e histogramas são atualizados pelo motor de verificação e pela
+API; métricas com `collect` são lidas na hora da exportação (ex.: cota
+restante da API do GitHub, via GET /rate_limit, que não consome a cota).
+GET /api/metrics devolve `REGISTRY.render()`.
+
+Uso:
+    LATENCY = REGISTRY.histogram('probe_request_duration_seconds', 'Duração', ['host'])
+    LATENCY.observe(0.42, host='exemplo.com')
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+import http_client
+from circuit_breaker import get_circuit_breaker
+from latency_tracker import get_latency_tracker
+from rate_limiter import get_rate_limiter
+
+# Limites (segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Cota da API do GitHub: consultada na exportação, no máximo a cada 30s
+GITHUB_RATE_LIMIT_URL = 'https://api.github.com/rate_limit'
+GITHUB_RATE_LIMIT_TTL = float(os.environ.get('METRICS_RATE_LIMIT_TTL', 30))
+GITHUB_RATE_LIMIT_TIMEOUT = 3
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base: nome, descrição, tipo e nomes dos rótulos"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 collect: Optional[Callable[[], Dict[Labels, float]]] = None):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.collect = collect
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple(str(labels.get(name, '')) for name in self.labels)
+
+    def values(self) -> Dict[Labels, float]:
+        """Valor atual de cada combinação de rótulos"""
+        if self.collect:
+            return self.collect()
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+                for key, value in sorted(self.values().items())]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return '\n'.join(lines + self.samples())
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # Por combinação de rótulos: [contagem por bucket..., soma, total]
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        lines = []
+        for key, values in sorted(series.items()):
+            for bound, count in zip(self.buckets, values):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, ('le', _format_value(bound)))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {values[-2]!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {values[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas exportadas por /api/metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            # Registrar de novo (ex.: módulo recarregado) devolve a mesma métrica
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = (), collect=None) -> Counter:
+        return self._register(Counter(name, help_text, labels, collect))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = (), collect=None) -> Gauge:
+        return self._register(Gauge(name, help_text, labels, collect))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# Métricas do motor de verificação (probe_engine)
+PROBE_LATENCY = REGISTRY.histogram(
+    'probe_request_duration_seconds', 'Duração das requisições HTTP por host', ['host'])
+PROBE_RESPONSES = REGISTRY.counter(
+    'probe_responses_total', 'Respostas HTTP por host e status', ['host', 'code'])
+PROBE_ERRORS = REGISTRY.counter(
+    'probe_errors_total', 'Falhas por host (timeout, adaptive_timeout, connection, host_down)', ['host', 'kind'])
+
+
+def _rate_limiter_values(field: str) -> Dict[Labels, float]:
+    return {(host,): state[field] for host, state in get_rate_limiter().snapshot().items()
+            if state[field] is not None}
+
+
+_github_quota = {'checked_at': 0.0, 'resources': {}}
+_github_quota_lock = threading.Lock()
+
+
+def _github_rate_limit(field: str) -> Dict[Labels, float]:
+    """Cota da API do GitHub por recurso (core, search, graphql...), de GET /rate_limit"""
+    with _github_quota_lock:
+        if time.time() - _github_quota['checked_at'] >= GITHUB_RATE_LIMIT_TTL:
+            try:
+                response = http_client.request('GET', GITHUB_RATE_LIMIT_URL, timeout=GITHUB_RATE_LIMIT_TIMEOUT)
+                response.raise_for_status()
+                resources = response.json().get('resources', {})
+            except (requests.RequestException, ValueError):
+                resources = {}
+            _github_quota.update(checked_at=time.time(), resources=resources)
+        resources = _github_quota['resources']
+    return {(name,): quota[field] for name, quota in resources.items() if field in quota}
+
+
+REGISTRY.gauge(
+    'github_rate_limit_remaining', 'Requisições restantes na cota da API do GitHub (GET /rate_limit)', ['resource'],
+    collect=lambda: _github_rate_limit('remaining'))
+REGISTRY.gauge(
+    'github_rate_limit_limit', 'Tamanho da cota da API do GitHub por recurso', ['resource'],
+    collect=lambda: _github_rate_limit('limit'))
+REGISTRY.gauge(
+    'rate_limit_remaining', 'Cota restante informada pelo host (X-RateLimit-Remaining) nas requisições deste processo',
+    ['host'], collect=lambda: _rate_limiter_values('remaining'))
+REGISTRY.gauge(
+    'rate_limiter_rate', 'Taxa atual do agendador por host (requisições/s)', ['host'],
+    collect=lambda: _rate_limiter_values('rate'))
+REGISTRY.gauge(
+    'rate_limiter_blocked_seconds', 'Segundos até o host ser liberado (cota esgotada / Retry-After)', ['host'],
+    collect=lambda: _rate_limiter_values('blocked_for'))
+REGISTRY.gauge(
+    'circuit_breaker_open', 'Hosts marcados como fora do ar pelo circuit breaker', ['host', 'state'],
+    collect=lambda: {(host, state['state']): 1 for host, state in get_circuit_breaker().snapshot().items()})
+REGISTRY.counter(
+    'probe_hedged_requests_total', 'Requisições duplicadas (hedge) enviadas',
+    collect=lambda: {(): get_latency_tracker().stats['hedged']})
+REGISTRY.counter(
+    'probe_hedge_wins_total', 'Requisições duplicadas que responderam antes da original',
+    collect=lambda: {(): get_latency_tracker().stats['hedge_wins']})
+REGISTRY.counter(
+    'probe_timeout_retries_total', 'Requisições repetidas com o timeout do chamador após estourar o timeout adaptativo',
+    collect=lambda: {(): get_latency_tracker().stats['timeout_retries']})
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita o GitHub para o benchmark (benchmark.py), sem
+acessar a rede.
+
+Todas as URLs públicas são enviadas ao servidor com o host no início do
+caminho (https://api.github.com/users/x/repos -> http://127.0.0.1:PORTA/api.github.com/users/x/repos);
+MockGitHub.local_url / public_url fazem a conversão e são passadas para
+http_client.set_url_rewriter().
+
+Hosts imitados:
+- api.github.com: /users/{user}/repos (paginado, Link, ETag/304,
+  X-RateLimit-*), /repos/{user}/{repo}/pages e /repos/{user}/{repo}/contents/CNAME;
+- raw.githubusercontent.com: /{user}/{repo}/{branch}/CNAME;
+- {user}.github.io: /{repo}/ (200, 404 sem Pages ou 301 para o domínio personalizado);
+- domínios personalizados ({repo}.example.test): página 200.
+
+Latência (base + jitter, com uma fração de respostas lentas), erros 500 e
+conexões encerradas sem resposta são configuráveis.
+
+Uso:
+    with MockGitHub(repos=300, latency=0.02, error_rate=0.01) as mock:
+        http_client.set_url_rewriter(mock.local_url, mock.public_url)
+        ...
+    python3 mock_github.py --repos 300   # servidor avulso para testes manuais
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+MOCK_USERNAME = "mediagrowthmkt-debug"
+CUSTOM_DOMAIN_SUFFIX = "example.test"
+PER_PAGE_MAX = 100
+PAGE_BODY = b"<!DOCTYPE html><html><head><title>Mock</title></head><body>" + b"x" * 2048 + b"</body></html>"
+
+
+def local_url(base_url: str, url: str) -> str:
+    """https://host/caminho -> {base_url}/host/caminho"""
+    if url.startswith('https://'):
+        return f"{base_url}/{url[len('https://'):]}"
+    return url
+
+
+def public_url(base_url: str, url: str) -> str:
+    """Inverso de local_url"""
+    if url.startswith(base_url + '/'):
+        return 'https://' + url[len(base_url) + 1:]
+    return url
+
+
+class MockRepo:
+    """Um repositório simulado; as características são derivadas do índice"""
+
+    def __init__(self, index: int, username: str):
+        self.index = index
+        self.name = f"REPO-{index:05d}"
+        self.username = username
+        # 90% com Pages, 1/4 desses com domínio personalizado (metade também no homepage)
+        self.has_pages = index % 10 != 9
+        self.custom_domain = f"{self.name.lower()}.{CUSTOM_DOMAIN_SUFFIX}" if self.has_pages and index % 4 == 0 else None
+        self.homepage = f"https://{self.custom_domain}" if self.custom_domain and index % 8 == 0 else ""
+        self.cname_branch = 'gh-pages'
+
+    def to_api(self) -> Dict:
+        timestamp = f"2024-01-{self.index % 28 + 1:02d}T12:00:00Z"
+        return {
+            'name': self.name,
+            'full_name': f"{self.username}/{self.name}",
+            'html_url': f"https://github.com/{self.username}/{self.name}",
+            'homepage': self.homepage,
+            'description': f"Repositório simulado {self.index}",
+            'created_at': timestamp,
+            'updated_at': timestamp,
+            'pushed_at': timestamp,
+            'default_branch': 'main',
+            'has_pages': self.has_pages
+        }
+
+    def pages_info(self) -> Dict:
+        url = f"https://{self.custom_domain}/" if self.custom_domain else f"https://{self.username}.github.io/{self.name}/"
+        return {
+            'url': f"https://api.github.com/repos/{self.username}/{self.name}/pages",
+            'html_url': url,
+            'cname': self.custom_domain,
+            'status': 'built',
+            'source': {'branch': self.cname_branch, 'path': '/'}
+        }
+
+
+class MockWorld:
+    """Os repositórios simulados e as respostas de cada host"""
+
+    def __init__(self, repos: int, username: str = MOCK_USERNAME):
+        self.username = username
+        self.repos: List[MockRepo] = [MockRepo(i, username) for i in range(repos)]
+        self.by_name = {repo.name: repo for repo in self.repos}
+        self.by_domain = {repo.custom_domain: repo for repo in self.repos if repo.custom_domain}
+
+    @property
+    def names(self) -> List[str]:
+        return [repo.name for repo in self.repos]
+
+    @property
+    def custom_domains(self) -> Dict[str, str]:
+        return {repo.name: repo.custom_domain for repo in self.repos if repo.custom_domain}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Responde como o host indicado no primeiro segmento do caminho"""
+
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em escritas separadas: sem isso o Nagle + ACK
+    # atrasado somam ~40ms a cada resposta em conexões keep-alive
+    disable_nagle_algorithm = True
+    server: 'MockServer'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def _handle(self, send_body: bool) -> None:
+        mock: MockGitHub = self.server.mock
+        mock.count('requests')
+        if mock.inject_delay_and_faults(self):
+            return
+
+        parts = urlsplit(self.path)
+        host, _, path = parts.path.lstrip('/').partition('/')
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+        if host == 'api.github.com':
+            status, headers, body = self._api(path, query)
+        elif host == 'raw.githubusercontent.com':
+            status, headers, body = self._raw(path)
+        elif host == f"{mock.world.username}.github.io":
+            status, headers, body = self._pages(path)
+        elif host in mock.world.by_domain:
+            status, headers, body = 200, {'Content-Type': 'text/html; charset=utf-8'}, PAGE_BODY
+        else:
+            status, headers, body = 404, {'Content-Type': 'text/plain'}, b'not found'
+        self._send(status, headers, body, send_body)
+
+    def _send(self, status: int, headers: Dict[str, str], body: bytes, send_body: bool) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _json(self, status: int, payload, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode('utf-8')
+        return status, {'Content-Type': 'application/json; charset=utf-8', **self._rate_headers(), **(headers or {})}, body
+
+    @staticmethod
+    def _rate_headers() -> Dict[str, str]:
+        return {'X-RateLimit-Limit': '5000', 'X-RateLimit-Remaining': '4999',
+                'X-RateLimit-Reset': str(int(time.time()) + 3600)}
+
+    def _api(self, path: str, query: Dict[str, str]):
+        world = self.server.mock.world
+        segments = path.strip('/').split('/')
+
+        if len(segments) == 3 and segments[0] == 'users' and segments[2] == 'repos':
+            per_page = min(PER_PAGE_MAX, int(query.get('per_page', 30)))
+            page = max(1, int(query.get('page', 1)))
+            items = [repo.to_api() for repo in world.repos[(page - 1) * per_page:page * per_page]]
+            body = json.dumps(items).encode('utf-8')
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if self.headers.get('If-None-Match') == etag:
+                return 304, {'ETag': etag, **self._rate_headers()}, b''
+            headers = {'ETag': etag}
+            if page * per_page < len(world.repos):
+                base = f"https://api.github.com/{path}"
+                headers['Link'] = f'<{base}?per_page={per_page}&page={page + 1}>; rel="next"'
+            return 200, {'Content-Type': 'application/json; charset=utf-8', **self._rate_headers(), **headers}, body
+
+        if len(segments) >= 4 and segments[0] == 'repos':
+            repo = world.by_name.get(segments[2])
+            tail = '/'.join(segments[3:])
+            if repo and tail == 'pages' and repo.has_pages:
+                return self._json(200, repo.pages_info())
+            if repo and tail == 'contents/CNAME' and repo.custom_domain:
+                content = base64.b64encode(f"{repo.custom_domain}\n".encode('utf-8')).decode('ascii')
+                return self._json(200, {'name': 'CNAME', 'path': 'CNAME', 'encoding': 'base64', 'content': content})
+
+        return self._json(404, {'message': 'Not Found'})
+
+    def _raw(self, path: str):
+        segments = path.strip('/').split('/')
+        if len(segments) == 4 and segments[3] == 'CNAME':
+            repo = self.server.mock.world.by_name.get(segments[1])
+            if repo and repo.custom_domain and segments[2] == repo.cname_branch:
+                return 200, {'Content-Type': 'text/plain; charset=utf-8'}, f"{repo.custom_domain}\n".encode('utf-8')
+        return 404, {'Content-Type': 'text/plain'}, b'404: Not Found'
+
+    def _pages(self, path: str):
+        repo = self.server.mock.world.by_name.get(path.strip('/').split('/')[0])
+        if repo is None or not repo.has_pages:
+            return 404, {'Content-Type': 'text/html'}, b'<h1>404</h1>'
+        if repo.custom_domain:
+            location = self.server.mock.local_url(f"https://{repo.custom_domain}/")
+            return 301, {'Location': location, 'Content-Type': 'text/html'}, b''
+        return 200, {'Content-Type': 'text/html; charset=utf-8'}, PAGE_BODY
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+    mock: 'MockGitHub'
+
+
+class MockGitHub:
+    """Servidor simulado em uma thread; use como context manager"""
+
+    def __init__(self, repos: int = 30, latency: float = 0.0, jitter: float = 0.0,
+                 slow_rate: float = 0.0, slow_latency: float = 1.0,
+                 error_rate: float = 0.0, reset_rate: float = 0.0,
+                 port: int = 0, seed: Optional[int] = None):
+        self.world = MockWorld(repos)
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'resets': 0, 'slow': 0}
+        self._server = MockServer(('127.0.0.1', port), MockHandler)
+        self._server.mock = self
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'MockGitHub':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-github', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def local_url(self, url: str) -> str:
+        return local_url(self.base_url, url)
+
+    def public_url(self, url: str) -> str:
+        return public_url(self.base_url, url)
+
+    def inject_delay_and_faults(self, handler: MockHandler) -> bool:
+        """Aplica latência e falhas; True se a requisição já foi respondida/encerrada"""
+        with self._lock:
+            roll = self._random.random()
+            slow = self._random.random() < self.slow_rate
+            delay = self.latency + self._random.uniform(0, self.jitter)
+
+        if slow:
+            self.count('slow')
+            delay += self.slow_latency
+        if delay > 0:
+            time.sleep(delay)
+
+        if roll < self.reset_rate:
+            # Conexão encerrada sem resposta (requests.ConnectionError no cliente)
+            self.count('resets')
+            handler.close_connection = True
+            handler.connection.close()
+            return True
+        if roll < self.reset_rate + self.error_rate:
+            self.count('errors')
+            handler._send(500, {'Content-Type': 'text/plain'}, b'injected error', handler.command != 'HEAD')
+            return True
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor simulado do GitHub (API, Pages e domínios)")
+    parser.add_argument('--repos', type=int, default=30)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    with MockGitHub(repos=args.repos, latency=args.latency, error_rate=args.error_rate, port=args.port) as mock:
+        print(f"🧪 Servidor simulado com {args.repos} repositórios em {mock.base_url}")
+        print(f"   Ex.: {mock.local_url(f'https://api.github.com/users/{MOCK_USERNAME}/repos?per_page=5')}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("\n⏹️  Servidor encerrado")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Impressão digital do conteúdo das landing pages.
+
+Hash do HTML normalizado (sem nonces, tokens, carimbos de data/hora e
+parâmetros anti-cache) combinado com o hash dos principais recursos da
+própria página (CSS e JS do mesmo domínio). A impressão digital só muda
+quando o conteúdo muda, então os previews e os screenshots em cache são
+invalidados apenas nesse caso.
+
+As requisições são condicionais (ETag / Last-Modified): uma página que não
+mudou custa uma resposta 304 sem corpo. Os validadores e hashes ficam em
+disco (VALIDATORS_FILE, em .http_cache/) e valem entre execuções; quem usa o
+módulo chama save_validators() ao terminar um lote.
+
+Uso:
+    page = await fingerprint_page('https://exemplo.com/')
+    page['fingerprint']  # None se a página não pôde ser baixada
+    save_validators()
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import requests
+
+from circuit_breaker import HostDownError
+from http_cache import CACHE_DIR
+from probe_engine import get_engine
+
+FINGERPRINT_TIMEOUT = 10
+FINGERPRINT_LENGTH = 16        # caracteres hexadecimais (64 bits)
+MAX_ASSETS = 8                 # recursos (CSS/JS) considerados por página
+MAX_KNOWN_URLS = 5000          # validadores e hashes mantidos em memória
+VALIDATORS_FILE = os.environ.get('PAGE_VALIDATORS_FILE', os.path.join(CACHE_DIR, 'page_fingerprints.json'))
+
+FINGERPRINT_PATTERN = re.compile(r'[0-9a-f]{8,64}')
+
+# Parâmetros de query usados só para furar o cache
+CACHE_BUST_PARAMS = ('v', 'ver', 'version', 't', 'ts', '_', 'cb', 'cachebust', 'rev', 'timestamp')
+
+# Trechos que mudam a cada requisição sem que o conteúdo mude
+VOLATILE_PATTERNS = [
+    # Comentários HTML (carimbos de build, "gerado em ...")
+    (re.compile(r'<!--.*?-->', re.S), ''),
+    # Nonces de CSP e hashes de integridade
+    (re.compile(r'\s(?:nonce|integrity)\s*=\s*(["\']).*?\1', re.I), ''),
+    # Tokens CSRF em meta tags e em scripts
+    (re.compile(r'<meta[^>]+name\s*=\s*["\']?csrf[^>]*>', re.I), ''),
+    (re.compile(r'(["\']?(?:csrf[\w-]*|_token|nonce|authenticity_token)["\']?\s*[:=]\s*)(["\']).*?\2', re.I), r'\1""'),
+    # Parâmetros anti-cache em URLs de recursos (?v=123, &t=...)
+    (re.compile(r'([?&](?:%s)=)[^"\'&\s>)]*' % '|'.join(CACHE_BUST_PARAMS), re.I), r'\1'),
+    # Datas/horas ISO e timestamps Unix (10 ou 13 dígitos)
+    (re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?'), ''),
+    (re.compile(r'\b1\d{9}(?:\d{3})?(?:\.\d+)?\b'), ''),
+    # Espaços em branco
+    (re.compile(r'\s+'), ' '),
+]
+
+TAG_PATTERN = re.compile(r'<(link|script)\b([^>]*)>', re.I)
+ATTR_PATTERN = re.compile(r'([\w-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+
+# url_key(url) -> {'digest', 'final_url', 'etag', 'last_modified', 'assets'}
+_known: 'OrderedDict[str, Dict]' = OrderedDict()
+_known_lock = threading.Lock()
+_known_state = {'loaded': False, 'dirty': False}
+
+
+def normalize_content(text: str) -> str:
+    """Remove os trechos voláteis do HTML (ou CSS/JS)"""
+    for pattern, replacement in VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def url_key(url: str) -> str:
+    """Chave de cache da URL: a própria URL sem os parâmetros anti-cache e sem fragmento"""
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if name.lower() not in CACHE_BUST_PARAMS]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ''))
+
+
+def key_assets(html: str, base_url: str) -> List[str]:
+    """CSS e JS do mesmo domínio da página, na ordem em que aparecem"""
+    host = urlsplit(base_url).netloc
+    assets: List[str] = []
+    for tag, attrs in TAG_PATTERN.findall(html):
+        values = {name.lower(): dq or sq or bare for name, dq, sq, bare in ATTR_PATTERN.findall(attrs)}
+        if tag.lower() == 'link':
+            if 'stylesheet' not in values.get('rel', '').lower():
+                continue
+            src = values.get('href')
+        else:
+            src = values.get('src')
+        if not src:
+            continue
+        url = urljoin(base_url, src).split('#')[0]
+        if urlsplit(url).netloc == host and url not in assets:
+            assets.append(url)
+            if len(assets) >= MAX_ASSETS:
+                break
+    return assets
+
+
+def is_fingerprint(value: str) -> bool:
+    return bool(FINGERPRINT_PATTERN.fullmatch(value))
+
+
+def head_signature(response: requests.Response) -> Optional[str]:
+    """
+    Validadores da resposta do HEAD (ETag, Last-Modified, Content-Length).
+    Enquanto não mudarem, a impressão digital anterior continua valendo e a
+    página não precisa ser baixada. None se o servidor não manda nenhum.
+    """
+    values = [response.headers.get(name) for name in ('ETag', 'Last-Modified', 'Content-Length')]
+    return '|'.join(value or '' for value in values) if any(values) else None
+
+
+def _load_validators() -> None:
+    """Carrega os validadores gravados na primeira utilização (chamar com _known_lock)"""
+    if _known_state['loaded']:
+        return
+    _known_state['loaded'] = True
+    try:
+        with open(VALIDATORS_FILE, encoding='utf-8') as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return
+    for key, entry in stored.items():
+        _known.setdefault(key, entry)
+
+
+def save_validators(path: Optional[str] = None) -> None:
+    """Grava os validadores e hashes conhecidos de forma atômica (só se mudaram)"""
+    path = path or VALIDATORS_FILE
+    with _known_lock:
+        if not _known_state['dirty']:
+            return
+        data = json.dumps(_known, ensure_ascii=False)
+        _known_state['dirty'] = False
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    except OSError as e:
+        print(f"⚠️  Não foi possível gravar {path}: {e}")
+
+
+def _remember(url: str, entry: Dict) -> None:
+    with _known_lock:
+        _known_state['dirty'] = True
+        _known[url] = entry
+        _known.move_to_end(url)
+        while len(_known) > MAX_KNOWN_URLS:
+            _known.popitem(last=False)
+
+
+async def _fetch(url: str, with_assets: bool = False) -> Optional[Dict]:
+    """
+    Baixa a URL e guarda o hash do conteúdo normalizado.
+    Com os validadores da última vez, uma resposta 304 reaproveita o hash
+    (também quando só o parâmetro anti-cache da URL mudou).
+    """
+    key = url_key(url)
+    with _known_lock:
+        _load_validators()
+        known = _known.get(key)
+    headers = {}
+    if known is not None:
+        if known['etag']:
+            headers['If-None-Match'] = known['etag']
+        if known['last_modified']:
+            headers['If-Modified-Since'] = known['last_modified']
+
+    response = await get_engine().get(url, timeout=FINGERPRINT_TIMEOUT, headers=headers)
+    if response.status_code == 304 and known is not None:
+        return known
+    if response.status_code != 200:
+        return None
+
+    entry = {
+        'digest': hashlib.sha256(normalize_content(response.text).encode('utf-8')).hexdigest(),
+        'final_url': response.url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'assets': key_assets(response.text, response.url) if with_assets else []
+    }
+    _remember(key, entry)
+    return entry
+
+
+async def _asset_digest(url: str) -> Optional[str]:
+    """Hash do recurso; em erro, o último hash conhecido (falha passageira não muda a impressão digital)"""
+    try:
+        entry = await _fetch(url)
+    except (requests.RequestException, HostDownError):
+        entry = None
+    if entry is None:
+        with _known_lock:
+            entry = _known.get(url_key(url))
+    return entry['digest'] if entry else None
+
+
+async def fingerprint_page(url: str) -> Optional[Dict]:
+    """
+    Impressão digital da página: {'fingerprint', 'final_url', 'assets'}.
+    Retorna None se a página não respondeu 200.
+    """
+    try:
+        page = await _fetch(url, with_assets=True)
+    except (requests.RequestException, HostDownError):
+        return None
+    if page is None:
+        return None
+
+    asset_digests = await asyncio.gather(*(_asset_digest(asset) for asset in page['assets']))
+    digest = hashlib.sha256(page['digest'].encode('ascii'))
+    for asset_digest in asset_digests:
+        if asset_digest:
+            digest.update(asset_digest.encode('ascii'))
+    return {
+        'fingerprint': digest.hexdigest()[:FINGERPRINT_LENGTH],
+        'final_url': page['final_url'],
+        'assets': sum(1 for d in asset_digests if d)
+    }
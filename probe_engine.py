@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Motor assíncrono de verificação de URLs compartilhado pelos scanners e pela API.
+
+Todas as requisições passam por um único event loop (executado em uma
+thread própria), com limite global de concorrência e limite por host,
+e são espaçadas pelo agendador por host de `rate_limiter`. Hosts que
+param de responder são bloqueados pelo circuit breaker (`circuit_breaker`)
+e as verificações seguintes falham na hora com HostDownError. O timeout de
+cada host acompanha a latência observada e respostas lentas recebem uma
+requisição duplicada (hedge) - veja `latency_tracker`.
+As chamadas HTTP usam o cliente compartilhado de `http_client` (pool de
+conexões, HTTP/2 quando disponível); cada uma roda em um pool de threads.
+
+Uso:
+    engine = get_engine()
+    results = engine.map(check_url, urls)
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, TypeVar
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+import http_client
+from circuit_breaker import HostDownError, get_circuit_breaker
+from http_client import bounded_get
+from latency_tracker import get_latency_tracker
+from metrics import PROBE_ERRORS, PROBE_LATENCY, PROBE_RESPONSES
+from rate_limiter import get_rate_limiter, host_of
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# Configurações (podem ser sobrescritas por variáveis de ambiente)
+TIMEOUT = 10
+CONCURRENCY = int(os.environ.get('PROBE_CONCURRENCY', 32))
+PER_HOST_LIMIT = int(os.environ.get('PROBE_PER_HOST', 8))
+
+# Status com que alguns servidores recusam HEAD (usa GET limitado em seguida)
+HEAD_REJECTED = (400, 403, 405, 501)
+# Bytes do corpo lidos no GET de fallback (0 = apenas cabeçalhos)
+PROBE_BYTE_CAP = 0
+# Métodos que podem ser duplicados com segurança (hedge)
+IDEMPOTENT_METHODS = ('GET', 'HEAD')
+
+
+def normalize_url(url: str) -> str:
+    """Chave de comparação de URLs: esquema/host em minúsculas e sem barra final"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
+
+
+class ProbeEngine:
+    """Executa requisições HTTP em paralelo respeitando limites globais e por host"""
+
+    def __init__(self, concurrency: int = CONCURRENCY, per_host: int = PER_HOST_LIMIT,
+                 timeout: float = TIMEOUT):
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                            thread_name_prefix='probe')
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        # Semáforos só podem ser criados dentro do loop
+        self._global_sem: Optional[asyncio.Semaphore] = None
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+
+        # Tarefas em andamento por chave (single-flight)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+        # Host que falhou (ex.: domínio personalizado após o redirect) por URL normalizada
+        self._failed_routes: Dict[str, str] = {}
+
+        # Resultados de probe() reaproveitados dentro de shared_probes()
+        self._probe_memo: Optional[Dict[str, asyncio.Future]] = None
+        self.probe_stats = {'distinct': 0, 'reused': 0}
+
+    # ------------------------------------------------------------------
+    # Event loop
+    # ------------------------------------------------------------------
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop dedicado, iniciado na primeira utilização"""
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name='probe-engine', daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def submit(self, coro: Awaitable[T]):
+        """Agenda uma corrotina no loop do motor e retorna um Future thread-safe"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """Executa uma corrotina no loop do motor e espera o resultado"""
+        return self.submit(coro).result()
+
+    def map(self, func: Callable[[T], Awaitable[R]], items: Iterable[T]) -> List[R]:
+        """Aplica `func` a todos os itens em paralelo, preservando a ordem"""
+        items = list(items)
+
+        async def _gather():
+            return await asyncio.gather(*(func(item) for item in items))
+
+        return self.run(_gather())
+
+    def iter_completed(self, func: Callable[[T], Awaitable[R]], items: Iterable[T]) -> Iterator[R]:
+        """Aplica `func` a todos os itens em paralelo, entregando cada resultado assim que termina"""
+        items = list(items)
+        done: queue.Queue = queue.Queue()
+
+        async def _one(item):
+            try:
+                done.put((True, await func(item)))
+            except Exception as e:
+                done.put((False, e))
+
+        async def _gather():
+            await asyncio.gather(*(_one(item) for item in items))
+
+        self.submit(_gather())
+        for _ in items:
+            ok, value = done.get()
+            if not ok:
+                raise value
+            yield value
+
+    async def single_flight(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Executa `factory()` uma única vez por chave enquanto estiver em andamento.
+        Chamadas concorrentes com a mesma chave aguardam a mesma tarefa e
+        recebem o mesmo resultado.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: cancelar um dos chamadores não cancela a tarefa compartilhada
+        return await asyncio.shield(task)
+
+    # ------------------------------------------------------------------
+    # Requisições
+    # ------------------------------------------------------------------
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        sem = self._host_sems.get(host)
+        if sem is None:
+            sem = self._host_sems[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def _call(self, url: str, func: Callable[..., requests.Response], *args,
+                    hedge: bool = False, **kwargs) -> requests.Response:
+        """
+        Executa `func` no pool de threads respeitando o agendamento e os limites
+        de concorrência. O timeout é ajustado pela latência observada do host e,
+        com `hedge=True` (somente requisições idempotentes), uma cópia da
+        requisição é enviada se a primeira passar do p95 do host.
+        Um timeout abaixo do teto do chamador não derruba o host: a requisição
+        é repetida uma vez com o timeout do chamador, e só esse timeout (ou um
+        erro de conexão) conta para o circuit breaker.
+        """
+        if self._global_sem is None:
+            self._global_sem = asyncio.Semaphore(self.concurrency)
+        kwargs.setdefault('timeout', self.timeout)
+        host = host_of(url)
+        tracker = get_latency_tracker()
+        ceiling = kwargs['timeout']
+        hedge_delay = None
+        if isinstance(ceiling, (int, float)):
+            kwargs['timeout'] = tracker.timeout_for(host, ceiling)
+            if hedge:
+                hedge_delay = tracker.hedge_delay(host)
+        if not isinstance(ceiling, (int, float)) or kwargs['timeout'] >= ceiling:
+            return await self._send(url, host, func, args, kwargs, hedge_delay)
+
+        try:
+            return await self._send(url, host, func, args, kwargs, hedge_delay, ceiling)
+        except requests.exceptions.Timeout:
+            # Host mais lento que o próprio histórico: nova tentativa com o teto do chamador
+            tracker.count('timeout_retries')
+            return await self._send(url, host, func, args, {**kwargs, 'timeout': ceiling}, None)
+
+    async def _send(self, url: str, host: str, func: Callable[..., requests.Response], args: tuple,
+                    kwargs: dict, hedge_delay: Optional[float], ceiling: Optional[float] = None) -> requests.Response:
+        """Uma requisição, com a cópia (hedge) se passar de `hedge_delay`"""
+        if hedge_delay is None:
+            return await self._attempt(url, host, func, args, kwargs, ceiling=ceiling)
+
+        tracker = get_latency_tracker()
+        # O atraso do hedge conta a partir do envio, não do tempo na fila
+        sent = asyncio.Event()
+        tasks = [asyncio.ensure_future(self._attempt(url, host, func, args, kwargs, sent, ceiling))]
+        try:
+            waiter = asyncio.ensure_future(sent.wait())
+            await asyncio.wait([tasks[0], waiter], return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if not tasks[0].done():
+                await asyncio.wait(tasks, timeout=hedge_delay)
+            if tasks[0].done():
+                return tasks[0].result()
+
+            tracker.count('hedged')
+            tasks.append(asyncio.ensure_future(self._attempt(url, host, func, args, kwargs, ceiling=ceiling)))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is tasks[1]:
+                            tracker.count('hedge_wins')
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            # A requisição perdedora é descartada (a thread termina sozinha)
+            for task in tasks:
+                task.cancel()
+
+    async def _attempt(self, url: str, host: str, func: Callable[..., requests.Response],
+                       args: tuple, kwargs: dict, sent: Optional[asyncio.Event] = None,
+                       ceiling: Optional[float] = None) -> requests.Response:
+        """
+        Uma tentativa: agendamento, circuit breaker, semáforos e registro da latência.
+        Uma requisição de teste (half-open) é sempre encerrada: se não terminar
+        com resposta do host testado (outra exceção, cancelamento do hedge,
+        redirect para outro host), o circuito dele volta a abrir.
+        `ceiling` é o teto do chamador quando kwargs['timeout'] é o timeout
+        adaptativo (menor): esse timeout é repassado sem contar como falha.
+        """
+        route = normalize_url(url)
+        limiter = get_rate_limiter()
+        breaker = get_circuit_breaker()
+        tracker = get_latency_tracker()
+        trials: Set[str] = set()
+
+        def check_hosts() -> None:
+            nonlocal kwargs, ceiling
+            try:
+                if breaker.check(host):
+                    trials.add(host)
+                failed_host = self._failed_routes.get(route)
+                if failed_host and failed_host != host and breaker.check(failed_host):
+                    trials.add(failed_host)
+            except HostDownError as e:
+                PROBE_ERRORS.inc(host=e.host, kind='host_down')
+                raise
+            if trials and ceiling is not None:
+                # A requisição de teste tem o timeout inteiro do chamador
+                kwargs = {**kwargs, 'timeout': ceiling}
+                ceiling = None
+
+        try:
+            check_hosts()
+            delay = limiter.reserve(host)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            async with self._global_sem, self._host_semaphore(host):
+                # O host pode ter caído enquanto esta requisição esperava na fila
+                if not trials:
+                    check_hosts()
+                loop = asyncio.get_running_loop()
+                started = time.monotonic()
+                if sent is not None:
+                    sent.set()
+                try:
+                    response = await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    if isinstance(e, requests.exceptions.Timeout):
+                        # Um timeout conta como latência mínima para não encolher o timeout do host
+                        tracker.record(host, time.monotonic() - started)
+                        if ceiling is not None:
+                            # Só o timeout adaptativo estourou: o chamador tenta de novo com o teto
+                            PROBE_ERRORS.inc(host=host, kind='adaptive_timeout')
+                            raise
+                    failed_host = host_of(str(e.request.url)) if getattr(e, 'request', None) is not None else host
+                    kind = 'timeout' if isinstance(e, requests.exceptions.Timeout) else 'connection'
+                    PROBE_ERRORS.inc(host=failed_host or host, kind=kind)
+                    breaker.failure(failed_host or host)
+                    trials.discard(failed_host or host)
+                    if failed_host and failed_host != host:
+                        self._failed_routes[route] = failed_host
+                    raise
+            elapsed = time.monotonic() - started
+            tracker.record(host, elapsed)
+            PROBE_LATENCY.observe(elapsed, host=host)
+            PROBE_RESPONSES.inc(host=host, code=str(response.status_code))
+            breaker.success(host)
+            trials.discard(host)
+            final_host = host_of(response.url or url)
+            if final_host != host:
+                breaker.success(final_host)
+                trials.discard(final_host)
+            self._failed_routes.pop(route, None)
+            limiter.observe(host, response)
+            return response
+        finally:
+            # Testes que não chegaram a uma resposta do host contam como falha
+            for trial_host in trials:
+                breaker.failure(trial_host)
+
+    async def request(self, method: str, url: str, hedge: Optional[bool] = None, **kwargs) -> requests.Response:
+        """
+        Faz uma requisição HTTP completa (o corpo inteiro é baixado).
+        `hedge=False` desativa a requisição duplicada mesmo para GET/HEAD
+        (ex.: serviços que cobram por requisição).
+        """
+        if hedge is None:
+            hedge = method.upper() in IDEMPOTENT_METHODS
+        return await self._call(url, http_client.request, method, url, hedge=hedge, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def head(self, url: str, **kwargs) -> requests.Response:
+        return await self.request('HEAD', url, **kwargs)
+
+    @contextmanager
+    def shared_probes(self):
+        """
+        Dentro do bloco, cada URL (normalizada) passa por probe() no máximo uma
+        vez; chamadas seguintes recebem a mesma resposta (ou a mesma exceção).
+        Usado pelo scan unificado para que vários scanners dividam as verificações.
+        """
+        self._probe_memo = {}
+        self.probe_stats = {'distinct': 0, 'reused': 0}
+        try:
+            yield self.probe_stats
+        finally:
+            self._probe_memo = None
+
+    async def probe(self, url: str, max_bytes: int = PROBE_BYTE_CAP, **kwargs) -> requests.Response:
+        """
+        Verifica a URL com o mínimo de tráfego: HEAD primeiro e, se o servidor
+        recusar HEAD, um GET em streaming interrompido após os cabeçalhos
+        (ou após `max_bytes`). Use get() quando o corpo inteiro for necessário.
+        """
+        memo = self._probe_memo
+        if memo is None:
+            return await self._probe(url, max_bytes, **kwargs)
+
+        key = normalize_url(url)
+        task = memo.get(key)
+        if task is None:
+            task = memo[key] = asyncio.ensure_future(self._probe(url, max_bytes, **kwargs))
+            self.probe_stats['distinct'] += 1
+        else:
+            self.probe_stats['reused'] += 1
+        return await asyncio.shield(task)
+
+    async def _probe(self, url: str, max_bytes: int, **kwargs) -> requests.Response:
+        kwargs.setdefault('allow_redirects', True)
+        response = await self.head(url, **kwargs)
+        if response.status_code not in HEAD_REJECTED:
+            return response
+        return await self._call(url, bounded_get, url, max_bytes, hedge=True, **kwargs)
+
+
+_engine: Optional[ProbeEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> ProbeEngine:
+    """Retorna a instância compartilhada do motor"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ProbeEngine()
+    return _engine
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Agendador de requisições por host (token bucket adaptativo).
+
+Substitui as pausas fixas (time.sleep) entre requisições. Cada host tem o
+seu próprio balde de fichas:
+- hosts sem cabeçalhos de limite (github.io, domínios personalizados)
+  aceleram a cada resposta bem-sucedida e reduzem pela metade a taxa ao
+  receber 429/503;
+- a API do GitHub é controlada pelos cabeçalhos X-RateLimit-Remaining /
+  X-RateLimit-Reset e Retry-After: quando a cota acaba, o host fica
+  pausado até o reset em vez de receber 403 no meio do scan.
+
+Uso síncrono:
+    response = throttled_request('GET', url, timeout=10)
+
+Uso assíncrono (probe_engine):
+    await asyncio.sleep(get_rate_limiter().reserve(host))
+    ...
+    get_rate_limiter().observe(host, response)
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+import http_client
+
+# Taxas (requisições por segundo) por host
+DEFAULT_RATE = 20.0
+MIN_RATE = 0.5
+MAX_RATE = 50.0
+RATE_INCREASE = 1.0  # Aumento aditivo a cada resposta bem-sucedida
+
+# Taxa inicial para hosts específicos (antes de qualquer cabeçalho ser lido)
+HOST_RATES = {
+    'api.github.com': 10.0,
+    'raw.githubusercontent.com': 20.0,
+}
+
+# Status que indicam sobrecarga/limite no servidor
+THROTTLE_STATUS = (429, 503)
+
+
+class TokenBucket:
+    """Balde de fichas com taxa ajustável e pausa até um instante"""
+
+    def __init__(self, rate: float, adaptive: bool = True):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.adaptive = adaptive
+        # Cota informada pelo servidor (X-RateLimit-Remaining / Reset), quando houver
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """Reserva uma ficha e retorna quantos segundos esperar antes de usar"""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        if self.remaining is not None:
+            # Cota esgotada (contando as requisições ainda sem resposta): espera o reset
+            if self.remaining <= 0:
+                self.blocked_until = max(self.blocked_until, self.reset_at)
+            self.remaining -= 1
+        delay = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(delay, self.blocked_until - now)
+
+    def set_rate(self, rate: float) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = min(MAX_RATE, max(MIN_RATE, rate))
+        self.capacity = max(1.0, self.rate)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def block_for(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Mantém um TokenBucket por host e ajusta as taxas pelas respostas"""
+
+    def __init__(self, default_rate: float = DEFAULT_RATE, host_rates: Optional[Dict[str, float]] = None):
+        self.default_rate = default_rate
+        self.host_rates = dict(HOST_RATES if host_rates is None else host_rates)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.host_rates.get(host, self.default_rate))
+        return bucket
+
+    def reserve(self, host: str) -> float:
+        """Reserva uma requisição para o host; retorna a espera necessária (segundos)"""
+        with self._lock:
+            return self._bucket(host).reserve()
+
+    def wait(self, host: str) -> None:
+        """Versão bloqueante de reserve()"""
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    def observe(self, host: str, response: requests.Response) -> None:
+        """Ajusta a taxa do host a partir do status e dos cabeçalhos da resposta"""
+        headers = response.headers
+        with self._lock:
+            bucket = self._bucket(host)
+
+            retry_after = _parse_float(headers.get('Retry-After'))
+            if retry_after is not None and response.status_code in (403, 429, 503):
+                bucket.block_for(retry_after)
+
+            remaining = _parse_float(headers.get('X-RateLimit-Remaining'))
+            reset = _parse_float(headers.get('X-RateLimit-Reset'))
+            if remaining is not None:
+                # Cota explícita: a taxa fica fixa e o host pausa quando a cota acaba
+                bucket.adaptive = False
+                bucket.remaining = int(remaining)
+                seconds_to_reset = max(1.0, reset - time.time()) if reset else 60.0
+                bucket.reset_at = time.monotonic() + seconds_to_reset
+                if remaining <= 0:
+                    bucket.block_for(seconds_to_reset)
+                return
+
+            if not bucket.adaptive:
+                return
+            if response.status_code in THROTTLE_STATUS:
+                bucket.set_rate(bucket.rate / 2)
+            elif response.status_code < 400:
+                bucket.set_rate(bucket.rate + RATE_INCREASE)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Faz uma requisição síncrona respeitando o agendamento do host"""
+        host = host_of(url)
+        self.wait(host)
+        response = http_client.request(method, url, **kwargs)
+        self.observe(host, response)
+        return response
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Estado atual de cada host (taxa, cota restante e pausa)"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    'rate': round(bucket.rate, 2),
+                    'remaining': bucket.remaining,
+                    'blocked_for': round(max(0.0, bucket.blocked_until - now), 1)
+                }
+                for host, bucket in self._buckets.items()
+            }
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def host_of(url: str) -> str:
+    """Retorna o host (em minúsculas) de uma URL"""
+    return (urlparse(url).hostname or '').lower()
+
+
+_limiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Retorna o agendador compartilhado"""
+    return _limiter
+
+
+def throttled_request(method: str, url: str, **kwargs) -> requests.Response:
+    """Requisição pelo cliente compartilhado com o agendamento por host"""
+    return _limiter.request(method, url, **kwargs)
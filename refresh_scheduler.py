@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Agendador de atualizações em segundo plano.
+
+Cada chave (ex.: um repositório) tem o seu próprio horário da próxima
+atualização. Chaves estáveis são atualizadas a cada `interval` segundos;
+chaves marcadas como urgentes (falharam ou mudaram há pouco) a cada
+`interval × fast_factor`. Um jitter aleatório espalha as atualizações para
+que não caiam todas no mesmo instante.
+
+Uso:
+    scheduler = RefreshScheduler(interval=240)
+    scheduler.track(keys)
+    scheduler.start(engine, refresh)   # refresh(keys) é uma corrotina
+    ...
+    scheduler.reschedule(key, urgent=True)  # depois de cada atualização
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+REFRESH_JITTER = 0.1  # ±10% do intervalo
+FAST_FACTOR = 0.25
+TICK = 5.0  # Intervalo máximo entre verificações da fila
+
+
+class RefreshScheduler:
+    """Mantém o horário da próxima atualização de cada chave e dispara as vencidas"""
+
+    def __init__(self, interval: float, jitter: float = REFRESH_JITTER, fast_factor: float = FAST_FACTOR):
+        self.interval = interval
+        self.jitter = jitter
+        self.fast_factor = fast_factor
+        self._next_due: Dict[str, float] = {}
+        self._urgent = set()
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.running = False
+        # Acorda o laço quando uma chave é reagendada (criado dentro do loop)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _delay(self, urgent: bool) -> float:
+        base = self.interval * (self.fast_factor if urgent else 1.0)
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def track(self, keys: Iterable[str], last_update: Optional[Dict[str, float]] = None) -> None:
+        """
+        Passa a acompanhar as chaves. `last_update` (instante da última
+        atualização de cada chave) evita atualizar de novo o que ainda é recente.
+        """
+        last_update = last_update or {}
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                updated_at = last_update.get(key)
+                self._next_due[key] = now if updated_at is None else updated_at + self._delay(False)
+
+    def reschedule(self, key: str, urgent: bool = False) -> None:
+        """Agenda a próxima atualização da chave a partir de agora"""
+        with self._lock:
+            if key not in self._next_due:
+                return
+            self._next_due[key] = time.time() + self._delay(urgent)
+            if urgent:
+                self._urgent.add(key)
+            else:
+                self._urgent.discard(key)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def due(self) -> List[str]:
+        """Chaves vencidas; ficam fora da fila até o próximo reschedule()"""
+        now = time.time()
+        with self._lock:
+            keys = [key for key, due_at in self._next_due.items() if due_at <= now]
+            for key in keys:
+                self._next_due[key] = float('inf')
+        return keys
+
+    def seconds_to_next(self) -> float:
+        with self._lock:
+            next_due = min(self._next_due.values(), default=float('inf'))
+        return max(0.0, next_due - time.time())
+
+    async def _refresh(self, refresh: Callable[[List[str]], Awaitable[None]], keys: List[str]) -> None:
+        try:
+            await refresh(keys)
+        except Exception as e:
+            print(f"⚠️  Atualização em segundo plano falhou: {e}")
+            for key in keys:
+                self.reschedule(key, urgent=True)
+
+    async def run(self, refresh: Callable[[List[str]], Awaitable[None]]) -> None:
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self.running = True
+        try:
+            while True:
+                self._wakeup.clear()
+                keys = self.due()
+                if keys:
+                    # Cada lote roda em paralelo: uma chave lenta não atrasa as outras
+                    self.runs += 1
+                    asyncio.ensure_future(self._refresh(refresh, keys))
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), min(TICK, self.seconds_to_next()))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.running = False
+            self._loop = None
+
+    def start(self, engine, refresh: Callable[[List[str]], Awaitable[None]]):
+        """Inicia o laço no event loop do motor de verificação"""
+        return engine.submit(self.run(refresh))
+
+    def snapshot(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            scheduled = [due_at for due_at in self._next_due.values() if due_at != float('inf')]
+            urgent = len(self._urgent)
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'runs': self.runs,
+            'tracked': len(self._next_due),
+            'urgent': urgent,
+            'next_refresh_in': round(max(0.0, min(scheduled) - now), 1) if scheduled else None
+        }
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Cache em memória (com TTL) para os resultados de verificação por repositório.
+
+Usado pela API do dashboard para responder com o último resultado conhecido
+e revalidar em segundo plano apenas as entradas vencidas
+(stale-while-revalidate). O conteúdo pode ser gravado em disco (save) e
+restaurado na inicialização (load), mantendo a idade original de cada entrada.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Tempo (segundos) que um resultado é considerado atual
+CACHE_TTL = 300
+
+
+class ResultCache:
+    """Guarda o último resultado de cada chave com o instante da verificação"""
+
+    def __init__(self, ttl: float = CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Retorna (valor, idade em segundos) ou None se não houver entrada"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, fetched_at = entry
+        return value, time.time() - fetched_at
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time())
+
+    def classify(self, keys: Iterable[str], max_age: Optional[float] = None) -> Dict[str, List[str]]:
+        """Separa as chaves em 'fresh', 'stale' e 'miss' de acordo com a idade"""
+        max_age = self.ttl if max_age is None else max_age
+        groups = {'fresh': [], 'stale': [], 'miss': []}
+        for key in keys:
+            entry = self.get(key)
+            if entry is None:
+                groups['miss'].append(key)
+            elif entry[1] > max_age:
+                groups['stale'].append(key)
+            else:
+                groups['fresh'].append(key)
+        return groups
+
+    def claim_refresh(self, keys: Iterable[str]) -> List[str]:
+        """Marca as chaves como em revalidação; retorna só as que ainda não estavam"""
+        with self._lock:
+            claimed = [key for key in keys if key not in self._refreshing]
+            self._refreshing.update(claimed)
+        return claimed
+
+    def release_refresh(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._refreshing.difference_update(keys)
+
+    @property
+    def refreshing(self) -> int:
+        """Quantidade de chaves sendo revalidadas em segundo plano"""
+        with self._lock:
+            return len(self._refreshing)
+
+    def save(self, path: str) -> None:
+        """Grava todas as entradas em JSON de forma atômica (arquivo temporário + rename)"""
+        with self._lock:
+            entries = {key: {'value': value, 'fetched_at': fetched_at}
+                       for key, (value, fetched_at) in self._entries.items()}
+        snapshot = {'saved_at': time.time(), 'entries': entries}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        with self._save_lock:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def load(self, path: str) -> Optional[float]:
+        """
+        Restaura as entradas gravadas por save(), sem sobrescrever entradas mais
+        novas. Retorna o instante em que o arquivo foi gravado, ou None.
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            entries = snapshot['entries']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        with self._lock:
+            for key, entry in entries.items():
+                current = self._entries.get(key)
+                if current is None or current[1] < entry['fetched_at']:
+                    self._entries[key] = (entry['value'], entry['fetched_at'])
+        return snapshot.get('saved_at')
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Proxy de screenshots com cache em disco endereçado por conteúdo.
+
+Em vez de cada navegador chamar os serviços de screenshot (e gastar a cota
+diária deles), a API busca cada preview uma única vez e guarda a imagem em
+SCREENSHOT_CACHE_DIR:
+
+- blobs/<sha256[:2]>/<sha256>: o conteúdo da imagem (imagens iguais são
+  guardadas uma vez só);
+- index.json: (URL, largura, altura) -> sha256, e os blobs em ordem de uso.
+
+Quando o total passa de SCREENSHOT_CACHE_MAX_MB, os blobs usados há mais
+tempo são apagados (LRU). Os serviços são tentados em ordem
+(SCREENSHOT_PROVIDERS ou, sem a variável, o ranking do último benchmark de
+test_screenshot_services.py); um serviço que falhou vai para o fim da fila por
+PROVIDER_BACKOFF segundos, e o circuit breaker e o rate limiter do motor de
+verificação valem para cada serviço, então um serviço fora do ar ou sem
+cota é pulado. Se todos falharem, uma captura antiga continua sendo servida.
+
+Uso:
+    entry = get_screenshot_store().get('https://exemplo.com', 1200, 800)
+    path = get_screenshot_store().blob_path(entry['digest'])
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+import requests
+
+from metrics import REGISTRY
+from page_fingerprint import is_fingerprint
+from probe_engine import get_engine, normalize_url
+
+SCREENSHOT_CACHE_DIR = os.environ.get(
+    'SCREENSHOT_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.screenshot_cache')
+)
+MAX_CACHE_BYTES = int(float(os.environ.get('SCREENSHOT_CACHE_MAX_MB', 200)) * 1024 * 1024)
+SCREENSHOT_TTL = float(os.environ.get('SCREENSHOT_TTL', 7 * 24 * 3600))  # Mesmo prazo do cache do navegador
+FAILURE_TTL = 600  # Não tenta de novo uma URL em que todos os serviços falharam
+REFRESH_MIN_AGE = 60  # refresh=1 não recaptura imagens mais novas que isso
+SCREENSHOT_TIMEOUT = 30
+MIN_IMAGE_BYTES = 1024  # Respostas menores são páginas de erro/placeholders
+PROVIDER_BACKOFF = 300  # Serviço que falhou vai para o fim da fila por esse tempo
+MIN_SIZE, MAX_SIZE = 100, 1920
+DEFAULT_WIDTH, DEFAULT_HEIGHT = 1200, 800
+
+# Serviços de screenshot: {url} = URL alvo, {quoted} = URL alvo codificada
+PROVIDERS = {
+    'thum': 'https://image.thum.io/get/width/{width}/crop/{height}/{url}',
+    'microlink': ('https://api.microlink.io/?url={quoted}&screenshot=true&meta=false&embed=screenshot.url'
+                  '&viewport.width={width}&viewport.height={height}'),
+    'mshots': 'https://s.wordpress.com/mshots/v1/{quoted}?w={width}&h={height}',
+    'screenshotmachine': 'https://api.screenshotmachine.com/?key=demo&url={quoted}&dimension={width}x{height}',
+}
+DEFAULT_PROVIDERS = ['thum', 'microlink', 'mshots', 'screenshotmachine']
+# Relatório de test_screenshot_services.py (ranking medido dos serviços)
+BENCHMARK_REPORT = os.environ.get(
+    'SCREENSHOT_BENCHMARK_REPORT',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'screenshot_benchmark.json')
+)
+
+
+def benchmarked_order(path: str = BENCHMARK_REPORT) -> List[str]:
+    """
+    Serviços na ordem recomendada pelo último benchmark real (relatórios do
+    modo simulado são ignorados); os que ficaram de fora vão para o fim.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return DEFAULT_PROVIDERS
+    if report.get('mock'):
+        return DEFAULT_PROVIDERS
+    ranked = [name for name in report.get('recommended_order', []) if name in PROVIDERS]
+    return ranked + [name for name in DEFAULT_PROVIDERS if name not in ranked]
+
+
+SCREENSHOT_PROVIDERS = [
+    name.strip() for name in os.environ.get('SCREENSHOT_PROVIDERS', ','.join(benchmarked_order())).split(',')
+    if name.strip() in PROVIDERS
+]
+
+SCREENSHOT_LOOKUPS = REGISTRY.counter(
+    'screenshot_requests_total', 'Pedidos ao proxy de screenshots por resultado', ['result'])
+SCREENSHOT_FETCHES = REGISTRY.counter(
+    'screenshot_provider_fetches_total', 'Capturas pedidas a cada serviço por resultado', ['provider', 'outcome'])
+
+
+class ScreenshotError(Exception):
+    """Nenhum serviço conseguiu capturar a URL"""
+
+
+def provider_url(provider: str, url: str, width: int, height: int) -> str:
+    return PROVIDERS[provider].format(url=url, quoted=quote(url, safe=''), width=width, height=height)
+
+
+def validate_request(url: str, width: int, height: int) -> str:
+    """URL alvo normalizada; ValueError se a URL ou o tamanho forem inválidos"""
+    if url and '://' not in url:
+        url = f"https://{url}"
+    parts = urlsplit(url)
+    try:
+        parts.port  # Levanta ValueError para hosts malformados (ex.: "javascript:alert(1)")
+    except ValueError:
+        raise ValueError('url inválida')
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError('url inválida')
+    if not (MIN_SIZE <= width <= MAX_SIZE and MIN_SIZE <= height <= MAX_SIZE):
+        raise ValueError(f'tamanho deve estar entre {MIN_SIZE} e {MAX_SIZE}')
+    return url
+
+
+# Instante da última falha de cada serviço
+_provider_failures: Dict[str, float] = {}
+
+
+def provider_order() -> List[str]:
+    """Serviços na ordem configurada, com os que falharam há pouco no fim"""
+    now = time.time()
+    recent = {name for name, failed_at in _provider_failures.items() if now - failed_at < PROVIDER_BACKOFF}
+    return ([name for name in SCREENSHOT_PROVIDERS if name not in recent]
+            + [name for name in SCREENSHOT_PROVIDERS if name in recent])
+
+
+async def capture(url: str, width: int, height: int) -> Tuple[bytes, str, str]:
+    """Tenta os serviços em ordem; retorna (imagem, content-type, serviço)"""
+    engine = get_engine()
+    errors = []
+    for provider in provider_order():
+        try:
+            # Sem hedge: cada requisição duplicada seria uma captura a mais na cota
+            response = await engine.request('GET', provider_url(provider, url, width, height),
+                                            timeout=SCREENSHOT_TIMEOUT, hedge=False)
+        except requests.RequestException as e:
+            SCREENSHOT_FETCHES.inc(provider=provider, outcome='error')
+            _provider_failures[provider] = time.time()
+            errors.append(f"{provider}: {str(e)[:80]}")
+            continue
+
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if (response.status_code == 200 and content_type.startswith('image/')
+                and len(response.content) >= MIN_IMAGE_BYTES):
+            SCREENSHOT_FETCHES.inc(provider=provider, outcome='ok')
+            _provider_failures.pop(provider, None)
+            return response.content, content_type, provider
+
+        SCREENSHOT_FETCHES.inc(provider=provider, outcome='invalid')
+        _provider_failures[provider] = time.time()
+        errors.append(f"{provider}: HTTP {response.status_code} {content_type or '-'} ({len(response.content)} bytes)")
+    raise ScreenshotError('; '.join(errors) or 'nenhum serviço configurado')
+
+
+class ScreenshotStore:
+    """Índice (URL, tamanho) -> sha256 e blobs em disco com limite de tamanho (LRU)"""
+
+    def __init__(self, root: str = SCREENSHOT_CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES,
+                 ttl: float = SCREENSHOT_TTL):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._keys: Dict[str, Dict] = {}
+        # Blobs do menos para o mais usado recentemente
+        self._blobs: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._failures: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.root, 'index.json')
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'blobs', digest[:2], digest)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(blob['size'] for blob in self._blobs.values())
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        for digest, blob in index.get('blobs', []):
+            if os.path.exists(self.blob_path(digest)):
+                self._blobs[digest] = blob
+        self._keys = {key: entry for key, entry in index.get('keys', {}).items() if entry['digest'] in self._blobs}
+
+    def _save(self) -> None:
+        """Grava o índice de forma atômica (arquivo temporário + rename)"""
+        with self._lock:
+            index = {'keys': dict(self._keys), 'blobs': list(self._blobs.items())}
+        with self._save_lock:
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(index, f, ensure_ascii=False)
+                os.replace(tmp_path, self.index_path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def blob(self, digest: str) -> Optional[Dict]:
+        """Metadados do blob (marcado como usado agora) ou None se não existir"""
+        with self._lock:
+            blob = self._blobs.get(digest)
+            if blob is not None:
+                self._blobs.move_to_end(digest)
+        return blob
+
+    def _put(self, key: str, entry: Dict, body: bytes) -> None:
+        digest = entry['digest']
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        evicted: List[str] = []
+        with self._lock:
+            self._keys[key] = entry
+            self._blobs[digest] = {'size': len(body), 'content_type': entry['content_type']}
+            self._blobs.move_to_end(digest)
+            total = sum(blob['size'] for blob in self._blobs.values())
+            # O blob recém-gravado nunca é removido, mesmo se sozinho passar do limite
+            while total > self.max_bytes and len(self._blobs) > 1:
+                old_digest, old_blob = self._blobs.popitem(last=False)
+                total -= old_blob['size']
+                evicted.append(old_digest)
+            if evicted:
+                gone = set(evicted)
+                self._keys = {k: e for k, e in self._keys.items() if e['digest'] not in gone}
+
+        for old_digest in evicted:
+            try:
+                os.remove(self.blob_path(old_digest))
+            except OSError:
+                pass
+        self._save()
+
+    def get(self, url: str, width: int = DEFAULT_WIDTH, height: int = DEFAULT_HEIGHT,
+            refresh: bool = False, fingerprint: Optional[str] = None) -> Dict:
+        """
+        Entrada do cache para a URL/tamanho, capturando se necessário.
+        Com `fingerprint` (page_fingerprint.py), também recaptura quando a
+        impressão digital da página difere da captura guardada.
+        Levanta ValueError (pedido inválido) ou ScreenshotError (todos os serviços falharam).
+        """
+        url = validate_request(url, width, height)
+        if fingerprint is not None and not is_fingerprint(fingerprint):
+            raise ValueError('impressão digital inválida')
+        key = f"{normalize_url(url)}|{width}x{height}"
+        with self._lock:
+            entry = self._keys.get(key)
+            failure = self._failures.get(key)
+
+        if entry is not None:
+            if fingerprint is not None and entry.get('fingerprint') != fingerprint:
+                refresh = True
+            age = time.time() - entry['fetched_at']
+            if age < self.ttl and not (refresh and age >= REFRESH_MIN_AGE):
+                self.blob(entry['digest'])
+                SCREENSHOT_LOOKUPS.inc(result='hit')
+                return entry
+        elif failure is not None and time.time() - failure[0] < FAILURE_TTL and not refresh:
+            SCREENSHOT_LOOKUPS.inc(result='failed')
+            raise ScreenshotError(failure[1])
+
+        engine = get_engine()
+        try:
+            # Pedidos simultâneos da mesma imagem compartilham uma única captura
+            body, content_type, provider = engine.run(
+                engine.single_flight(('screenshot', key), lambda: capture(url, width, height)))
+        except ScreenshotError as e:
+            now = time.time()
+            with self._lock:
+                self._failures = {k: f for k, f in self._failures.items() if now - f[0] < FAILURE_TTL}
+                self._failures[key] = (now, str(e))
+            if entry is not None:
+                # Captura antiga é melhor que nenhuma
+                SCREENSHOT_LOOKUPS.inc(result='stale')
+                return entry
+            SCREENSHOT_LOOKUPS.inc(result='error')
+            raise
+
+        new_entry = {
+            'url': url,
+            'width': width,
+            'height': height,
+            'digest': hashlib.sha256(body).hexdigest(),
+            'content_type': content_type,
+            'provider': provider,
+            'fingerprint': fingerprint,
+            'fetched_at': time.time()
+        }
+        self._put(key, new_entry, body)
+        with self._lock:
+            self._failures.pop(key, None)
+        SCREENSHOT_LOOKUPS.inc(result='miss')
+        return new_entry
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            providers: Dict[str, int] = {}
+            for entry in self._keys.values():
+                providers[entry['provider']] = providers.get(entry['provider'], 0) + 1
+            return {
+                'entries': len(self._keys),
+                'blobs': len(self._blobs),
+                'bytes': sum(blob['size'] for blob in self._blobs.values()),
+                'max_bytes': self.max_bytes,
+                'providers': providers,
+                'failing': len(self._failures)
+            }
+
+
+_store: Optional[ScreenshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_screenshot_store() -> ScreenshotStore:
+    """Retorna o cache de screenshots compartilhado (criado no primeiro uso)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ScreenshotStore()
+    return _store
+
+
+REGISTRY.gauge(
+    'screenshot_cache_bytes', 'Bytes ocupados pelo cache de screenshots em disco',
+    collect=lambda: {(): get_screenshot_store().total_bytes})
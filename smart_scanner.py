@@ -4,10 +4,11 @@ Scanner inteligente: testa URLs diretas dos repositórios GitHub
 para encontrar GitHub Pages ativos (mesmo sem acesso à API de Pages).
 """
 
-import requests
-import time
+import asyncio
 from typing import List, Tuple
 
+from probe_engine import get_engine
+
 GITHUB_USERNAME = "mediagrowthmkt-debug"
 GITHUB_PAGES_BASE = f"https://{GITHUB_USERNAME}.github.io"
 
@@ -42,18 +43,16 @@ CUSTOM_DOMAINS = {
     "PAINTING": "painting.innovcarpenters.com",
 }
 
-def test_url(url: str, name: str) -> Tuple[bool, int]:
+async def test_url(url: str, name: str) -> Tuple[bool, int]:
     """Testa se uma URL está acessível"""
     try:
-        response = requests.head(url, allow_redirects=True, timeout=10)
+        response = await get_engine().probe(url, allow_redirects=True, timeout=10)
         return (response.status_code == 200, response.status_code)
     except:
         return (False, 0)
 
-def scan_repository(repo_name: str) -> dict:
+async def scan_repository(repo_name: str) -> dict:
     """Escaneia um repositório para URLs GitHub Pages"""
-    print(f"\n📦 {repo_name}")
-    
     result = {
         "repo": repo_name,
         "github_pages_url": None,
@@ -61,35 +60,39 @@ def scan_repository(repo_name: str) -> dict:
         "accessible": False
     }
     
-    # Teste 1: URL GitHub Pages direta
+    # Os dois testes rodam em paralelo; as linhas são impressas juntas no final
     github_url = f"{GITHUB_PAGES_BASE}/{repo_name}/"
-    print(f"   🔗 Testando GitHub Pages: {github_url[:60]}...", end=" ")
-    accessible, status = test_url(github_url, repo_name)
+    custom_url = f"https://{CUSTOM_DOMAINS[repo_name]}" if repo_name in CUSTOM_DOMAINS else None
+    
+    tests = [test_url(github_url, repo_name)]
+    if custom_url:
+        tests.append(test_url(custom_url, repo_name))
+    outcomes = await asyncio.gather(*tests)
+    
+    lines = [f"\n📦 {repo_name}"]
     
+    # Teste 1: URL GitHub Pages direta
+    accessible, status = outcomes[0]
+    line = f"   🔗 Testando GitHub Pages: {github_url[:60]}..."
     if accessible:
-        print(f"✅ {status}")
+        lines.append(f"{line} ✅ {status}")
         result["github_pages_url"] = github_url
         result["accessible"] = True
     else:
-        print(f"❌ {status if status else 'Erro'}")
-    
-    time.sleep(0.3)
+        lines.append(f"{line} ❌ {status if status else 'Erro'}")
     
     # Teste 2: Domínio personalizado
-    if repo_name in CUSTOM_DOMAINS:
-        custom_url = f"https://{CUSTOM_DOMAINS[repo_name]}"
-        print(f"   🌟 Testando domínio personalizado: {custom_url}...", end=" ")
-        accessible, status = test_url(custom_url, repo_name)
-        
+    if custom_url:
+        accessible, status = outcomes[1]
+        line = f"   🌟 Testando domínio personalizado: {custom_url}..."
         if accessible:
-            print(f"✅ {status}")
+            lines.append(f"{line} ✅ {status}")
             result["custom_domain_url"] = custom_url
             result["accessible"] = True
         else:
-            print(f"❌ {status if status else 'Erro'}")
-        
-        time.sleep(0.3)
+            lines.append(f"{line} ❌ {status if status else 'Erro'}")
     
+    print("\n".join(lines))
     return result
 
 def main():
@@ -102,8 +105,7 @@ def main():
     results = []
     accessible_count = 0
     
-    for repo in REPOS:
-        result = scan_repository(repo)
+    for result in get_engine().map(scan_repository, REPOS):
         results.append(result)
         if result["accessible"]:
             accessible_count += 1
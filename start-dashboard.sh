@@ -1,7 +1,8 @@
 #!/bin/bash
 
 # 🚀 Script de Inicialização do Dashboard
-# Inicia tanto a API quanto o servidor HTTP automaticamente
+# Inicia a API, que também serve o dashboard (index.html) já comprimido
+# Com gunicorn instalado roda em modo produção (gunicorn.conf.py)
 
 echo "======================================================================"
 echo "🚀 INICIANDO SISTEMA DE DASHBOARD"
@@ -48,6 +49,19 @@ $PYTHON_CMD -c "import flask" 2>/dev/null || {
     $PYTHON_CMD -m pip install flask flask-cors requests
 }
 
+# Servidor de produção e compressão brotli são opcionais (não instala nada)
+if ! $PYTHON_CMD -c "import gunicorn" 2>/dev/null; then
+    echo -e "${YELLOW}💡 gunicorn não encontrado: usando o servidor do Flask (modo produção: $PYTHON_CMD -m pip install gunicorn)${NC}"
+fi
+if ! $PYTHON_CMD -c "import brotli" 2>/dev/null; then
+    echo -e "${YELLOW}💡 Opcional (compressão brotli): $PYTHON_CMD -m pip install brotli${NC}"
+fi
+
+# Previews redimensionados e comparação visual são opcionais
+if ! $PYTHON_CMD -c "import numpy, PIL" 2>/dev/null; then
+    echo -e "${YELLOW}💡 Opcional (previews e comparação visual): $PYTHON_CMD -m pip install numpy Pillow${NC}"
+fi
+
 echo -e "${GREEN}✅ Dependências OK${NC}"
 echo ""
 
@@ -56,55 +70,40 @@ cleanup() {
     echo ""
     echo -e "${YELLOW}🛑 Encerrando servidores...${NC}"
     kill $API_PID 2>/dev/null
-    kill $HTTP_PID 2>/dev/null
     echo -e "${GREEN}✅ Servidores encerrados${NC}"
     exit 0
 }
 
 trap cleanup EXIT INT TERM
 
-# Iniciar API Flask
-echo -e "${BLUE}🚀 Iniciando API Flask na porta 5000...${NC}"
-$PYTHON_CMD dashboard_api.py > /tmp/dashboard-api.log 2>&1 &
+# Iniciar API (serve também o dashboard)
+if $PYTHON_CMD -c "import gunicorn" 2>/dev/null; then
+    echo -e "${BLUE}🚀 Iniciando API (gunicorn, modo produção) na porta 5000...${NC}"
+    $PYTHON_CMD -m gunicorn dashboard_api:app > /tmp/dashboard-api.log 2>&1 &
+else
+    echo -e "${BLUE}🚀 Iniciando API Flask na porta 5000...${NC}"
+    $PYTHON_CMD dashboard_api.py > /tmp/dashboard-api.log 2>&1 &
+fi
 API_PID=$!
 
 sleep 2
 
 # Verificar se API iniciou
 if ps -p $API_PID > /dev/null; then
-    echo -e "${GREEN}✅ API Flask rodando (PID: $API_PID)${NC}"
+    echo -e "${GREEN}✅ API rodando (PID: $API_PID)${NC}"
 else
-    echo -e "${YELLOW}❌ Erro ao iniciar API Flask${NC}"
+    echo -e "${YELLOW}❌ Erro ao iniciar a API${NC}"
     echo "Verifique o log: /tmp/dashboard-api.log"
     exit 1
 fi
 
-echo ""
-
-# Iniciar servidor HTTP
-echo -e "${BLUE}🌐 Iniciando servidor HTTP na porta 8080...${NC}"
-$PYTHON_CMD -m http.server 8080 > /tmp/dashboard-http.log 2>&1 &
-HTTP_PID=$!
-
-sleep 2
-
-# Verificar se servidor HTTP iniciou
-if ps -p $HTTP_PID > /dev/null; then
-    echo -e "${GREEN}✅ Servidor HTTP rodando (PID: $HTTP_PID)${NC}"
-else
-    echo -e "${YELLOW}❌ Erro ao iniciar servidor HTTP${NC}"
-    echo "Verifique o log: /tmp/dashboard-http.log"
-    kill $API_PID 2>/dev/null
-    exit 1
-fi
-
 echo ""
 echo "======================================================================"
 echo -e "${GREEN}✨ SISTEMA INICIADO COM SUCESSO!${NC}"
 echo "======================================================================"
 echo ""
-echo -e "${BLUE}📊 Dashboard:${NC}  http://localhost:8080/index.html"
-echo -e "${BLUE}🔧 API:${NC}        http://localhost:5000"
+echo -e "${BLUE}📊 Dashboard:${NC}  http://localhost:5000/"
+echo -e "${BLUE}🔧 API:${NC}        http://localhost:5000/api"
 echo ""
 echo -e "${YELLOW}💡 Dicas:${NC}"
 echo "   • Clique em 'Sincronizar GitHub' para buscar domínios"
@@ -113,7 +112,6 @@ echo "   • Pressione Ctrl+C para encerrar"
 echo ""
 echo -e "${BLUE}📋 Logs:${NC}"
 echo "   • API:  /tmp/dashboard-api.log"
-echo "   • HTTP: /tmp/dashboard-http.log"
 echo ""
 echo "======================================================================"
 echo -e "${GREEN}Aguardando... (Ctrl+C para encerrar)${NC}"
@@ -124,10 +122,10 @@ echo ""
 sleep 2
 if command -v open &> /dev/null; then
     # macOS
-    open "http://localhost:8080/index.html"
+    open "http://localhost:5000/"
 elif command -v xdg-open &> /dev/null; then
     # Linux
-    xdg-open "http://localhost:8080/index.html"
+    xdg-open "http://localhost:5000/"
 fi
 
 # Manter script rodando
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Arquivos estáticos (index.html e JSONs de dados) servidos pela própria API.
+
+Cada arquivo é lido e comprimido uma única vez (gzip e, se o módulo `brotli`
+estiver instalado, brotli) e recarregado só quando muda no disco. As
+respostas escolhem a variante pelo Accept-Encoding e levam ETag forte
+(hash do conteúdo) e Cache-Control; com If-None-Match o navegador recebe 304.
+
+Respostas JSON da API maiores que MIN_COMPRESS_SIZE também são comprimidas
+com gzip (compress_response); o ETag da resposta ganha o sufixo da
+codificação, como nas variantes dos arquivos estáticos (variant_etag).
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from typing import Dict, Optional
+
+from flask import Request, Response
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Sempre revalida (ETag torna a revalidação barata)
+STATIC_CACHE_CONTROL = 'public, no-cache'
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 9
+DYNAMIC_GZIP_LEVEL = 5
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag de uma variante comprimida: cada representação tem o seu validador forte"""
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+class StaticAsset:
+    """Conteúdo de um arquivo com as variantes comprimidas e o ETag"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        with open(path, 'rb') as f:
+            self.body = f.read()
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type == 'application/json':
+            self.content_type += '; charset=utf-8'
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+        self.variants: Dict[str, bytes] = {'gzip': gzip.compress(self.body, GZIP_LEVEL, mtime=0)}
+        if BROTLI_AVAILABLE:
+            self.variants['br'] = brotli.compress(self.body, quality=11)
+
+
+class StaticAssets:
+    """Cache em memória dos arquivos estáticos, recarregados quando o mtime muda"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._assets: Dict[str, StaticAsset] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[StaticAsset]:
+        path = os.path.join(self.root, name)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        with self._lock:
+            asset = self._assets.get(name)
+            if asset is None or asset.mtime != mtime:
+                asset = self._assets[name] = StaticAsset(path)
+        return asset
+
+    def response(self, name: str, request: Request) -> Optional[Response]:
+        """Resposta para o arquivo (variante comprimida, ETag, 304); None se não existir"""
+        asset = self.get(name)
+        if asset is None:
+            return None
+
+        encoding = None
+        for candidate in ('br', 'gzip'):
+            if candidate in asset.variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+
+        # Cada variante tem o seu próprio ETag forte
+        etag = variant_etag(asset.etag, encoding)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            body = asset.variants[encoding] if encoding else asset.body
+            response = Response(body, content_type=asset.content_type)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = STATIC_CACHE_CONTROL
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+
+def compress_response(response: Response, request: Request) -> Response:
+    """Comprime com gzip respostas JSON (não streaming) quando o cliente aceita"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers
+            or not request.accept_encodings['gzip']):
+        return response
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+    response.set_data(gzip.compress(body, DYNAMIC_GZIP_LEVEL, mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(variant_etag(etag, 'gzip'), weak)
+    response.vary.add('Accept-Encoding')
+    return response
@@ -1,146 +1,452 @@
 #!/usr/bin/env python3
 """
-Testa diferentes serviços de screenshot GRATUITOS
+Benchmark dos serviços de screenshot GRATUITOS
 para encontrar o melhor para o dashboard.
+
+Cada serviço captura todas as URLs de projects_data.json (com concorrência
+configurável) e é medido em latência (p50/p90/p99), bytes retornados,
+dimensões da imagem, taxa de sucesso, vazão e sinais de cota (HTTP 429,
+X-RateLimit-Remaining). O relatório screenshot_benchmark.json traz o ranking
+dos serviços; o proxy de screenshots (screenshot_cache.py) usa essa ordem
+quando SCREENSHOT_PROVIDERS não está definido.
+
+Com --mock os serviços são substituídos por servidores locais com latência
+e erros simulados (não gasta a cota diária dos serviços; o relatório vai
+para screenshot_benchmark_mock.json e não altera a ordem do proxy).
+
+Uso:
+    python3 test_screenshot_services.py                       # todos os serviços, todas as URLs
+    python3 test_screenshot_services.py --limit 10 --concurrency 2 --providers thum,mshots
+    python3 test_screenshot_services.py --mock --latency 0.2 --error-rate 0.05
 """
 
-import requests
+import argparse
+import contextlib
+import json
+import os
+import random
+import re
+import struct
+import sys
+import threading
 import time
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import quote
 
-# URL de teste
+import requests
+
+import http_client
+from latency_tracker import percentile
+from mock_github import local_url, public_url
+from screenshot_cache import BENCHMARK_REPORT, MIN_IMAGE_BYTES, PROVIDERS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECTS_FILE = os.path.join(BASE_DIR, 'projects_data.json')
+MOCK_REPORT = os.path.join(BASE_DIR, 'screenshot_benchmark_mock.json')
+
+# URL usada quando projects_data.json não existe
 TEST_URL = "https://bathroom.wolfcarpenters.com"
 
-# Serviços de screenshot gratuitos
+WIDTH, HEIGHT = 1200, 800
+TIMEOUT = 30
+DEFAULT_CONCURRENCY = 4
+MIN_SUCCESS_RATE = 0.5  # Serviços abaixo disso ficam fora da ordem recomendada
+
+# Serviços de screenshot gratuitos: {url} = URL alvo, {quoted} = URL alvo codificada.
+# Os que existem em screenshot_cache.PROVIDERS usam o mesmo nome e endereço do proxy.
 SERVICES = {
-    "Screenshot Machine (Demo)": {
-        "url": f"https://api.screenshotmachine.com/?key=demo&url={quote(TEST_URL)}&dimension=1200x800",
+    "thum": {
+        "url": PROVIDERS['thum'],
+        "description": "thum.io - grátis, rápido, boa qualidade"
+    },
+    "microlink": {
+        "url": PROVIDERS['microlink'],
+        "description": "Grátis com limite de 50 requisições/dia"
+    },
+    "mshots": {
+        "url": PROVIDERS['mshots'],
+        "description": "WordPress mShots - grátis, a primeira captura pode demorar"
+    },
+    "screenshotmachine": {
+        "url": PROVIDERS['screenshotmachine'],
         "description": "Grátis com chave demo, mas com watermark"
     },
-    "Screenshot.rocks": {
-        "url": f"https://screenshot.rocks/api/screenshot?url={quote(TEST_URL)}&width=1200&height=800",
+    "screenshot.rocks": {
+        "url": "https://screenshot.rocks/api/screenshot?url={quoted}&width={width}&height={height}",
         "description": "Totalmente grátis, sem watermark"
     },
-    "Microlink": {
-        "url": f"https://api.microlink.io/?url={quote(TEST_URL)}&screenshot=true&meta=false&embed=screenshot.url",
-        "description": "Grátis com limite de 50 requisições/dia"
-    },
-    "ApiFlash (Demo)": {
-        "url": f"https://api.apiflash.com/v1/urltoimage?access_key=demo&url={quote(TEST_URL)}&width=1200&height=800",
+    "apiflash": {
+        "url": "https://api.apiflash.com/v1/urltoimage?access_key=demo&url={quoted}&width={width}&height={height}",
         "description": "Grátis com chave demo"
     },
-    "URLBox.io (Trial)": {
-        "url": f"https://api.urlbox.io/v1/demo/png?url={quote(TEST_URL)}&width=1200&height=800",
+    "urlbox": {
+        "url": "https://api.urlbox.io/v1/demo/png?url={quoted}&width={width}&height={height}",
         "description": "Grátis com versão trial"
     },
-    "PagePeeker": {
-        "url": f"https://api.pagepeeker.com/v2/thumbs.php?size=l&url={quote(TEST_URL)}",
+    "pagepeeker": {
+        "url": "https://api.pagepeeker.com/v2/thumbs.php?size=l&url={quoted}",
         "description": "Grátis, mas tamanho limitado"
     },
-    "ShrinkTheWeb": {
-        "url": f"https://images.shrinktheweb.com/xino.php?stwembed=1&stwaccesskeyid=demo&stwsize=xlg&stwurl={quote(TEST_URL)}",
+    "shrinktheweb": {
+        "url": "https://images.shrinktheweb.com/xino.php?stwembed=1&stwaccesskeyid=demo&stwsize=xlg&stwurl={quoted}",
         "description": "Grátis com chave demo"
     }
 }
 
-def test_service(name, service):
-    """Testa se um serviço está funcionando"""
-    print(f"\n🧪 Testando: {name}")
-    print(f"   📝 {service['description']}")
-    print(f"   🔗 {service['url'][:100]}...")
-    
+
+def load_urls(path: str = PROJECTS_FILE) -> List[str]:
+    """websiteUrl distintas de projects_data.json"""
     try:
-        response = requests.get(service['url'], timeout=15, allow_redirects=True)
-        
-        # Verifica o Content-Type
-        content_type = response.headers.get('Content-Type', '')
-        
-        if response.status_code == 200:
-            if 'image' in content_type:
-                size_kb = len(response.content) / 1024
-                print(f"   ✅ FUNCIONANDO!")
-                print(f"   📊 Tamanho: {size_kb:.1f} KB")
-                print(f"   🖼️  Tipo: {content_type}")
-                return True
-            elif 'json' in content_type:
-                # Pode ser um JSON com URL da imagem
-                print(f"   ⚠️  Retornou JSON (pode ter URL da imagem)")
-                print(f"   📄 {response.text[:200]}")
-                return True
-            else:
-                print(f"   ⚠️  Resposta não é imagem: {content_type}")
-                return False
-        else:
-            print(f"   ❌ Erro {response.status_code}")
-            return False
-            
+        with open(path, encoding='utf-8') as f:
+            projects = json.load(f)
+    except (OSError, ValueError):
+        return [TEST_URL]
+    urls = []
+    for project in projects:
+        url = (project.get('websiteUrl') or '').strip()
+        if url.startswith('http') and url not in urls:
+            urls.append(url)
+    return urls or [TEST_URL]
+
+
+def image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(largura, altura) lidas do cabeçalho PNG, JPEG, GIF ou WebP"""
+    if data.startswith(b'\x89PNG\r\n\x1a\n') and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        return struct.unpack('<HH', data[6:10])
+    if data.startswith(b'RIFF') and data[8:12] == b'WEBP' and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b'VP8 ':
+            width, height = struct.unpack('<HH', data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b'VP8L':
+            bits = int.from_bytes(data[21:25], 'little')
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b'VP8X':
+            return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+    if data.startswith(b'\xff\xd8'):
+        # Procura o marcador SOF (início do quadro), que traz as dimensões
+        offset = 2
+        while offset + 9 < len(data):
+            if data[offset] != 0xFF:
+                offset += 1
+                continue
+            marker = data[offset + 1]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+                return width, height
+            offset += 2 + struct.unpack('>H', data[offset + 2:offset + 4])[0]
+    return None
+
+
+def measure(template: str, url: str, width: int, height: int, timeout: float) -> Dict:
+    """Uma captura: resultado, latência, bytes, dimensões e sinais de cota"""
+    request_url = template.format(url=url, quoted=quote(url, safe=''), width=width, height=height)
+    started = time.monotonic()
+    sample = {'url': url, 'outcome': 'ok', 'bytes': 0, 'size': None, 'quota_remaining': None}
+    try:
+        response = http_client.request('GET', request_url, timeout=timeout, allow_redirects=True)
     except requests.exceptions.Timeout:
-        print(f"   ⏱️  TIMEOUT (muito lento)")
-        return False
-    except Exception as e:
-        print(f"   ❌ Erro: {str(e)[:100]}")
-        return False
+        sample.update(outcome='timeout', seconds=time.monotonic() - started)
+        return sample
+    except requests.RequestException:
+        sample.update(outcome='connection_error', seconds=time.monotonic() - started)
+        return sample
+    sample['seconds'] = time.monotonic() - started
+
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    if remaining and remaining.isdigit():
+        sample['quota_remaining'] = int(remaining)
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    sample['bytes'] = len(response.content)
+    size = image_size(response.content) if content_type.startswith('image/') else None
+    sample['size'] = list(size) if size else None
+
+    if response.status_code == 429:
+        sample['outcome'] = 'quota'
+    elif response.status_code != 200:
+        sample['outcome'] = f"http_{response.status_code}"
+    elif not content_type.startswith('image/'):
+        sample['outcome'] = 'not_image'
+    elif len(response.content) < MIN_IMAGE_BYTES or size is None:
+        sample['outcome'] = 'invalid_image'
+    return sample
+
+
+def distribution(values: List[float], scale: float = 1.0, digits: int = 1) -> Optional[Dict]:
+    if not values:
+        return None
+    return {
+        'p50': round(percentile(values, 50) * scale, digits),
+        'p90': round(percentile(values, 90) * scale, digits),
+        'p99': round(percentile(values, 99) * scale, digits),
+        'mean': round(sum(values) / len(values) * scale, digits),
+        'max': round(max(values) * scale, digits)
+    }
+
+
+def summarize(name: str, samples: List[Dict], wall: float, width: int, height: int) -> Dict:
+    ok = [s for s in samples if s['outcome'] == 'ok']
+    quota = [s['quota_remaining'] for s in samples if s['quota_remaining'] is not None]
+    return {
+        'provider': name,
+        'description': SERVICES[name]['description'],
+        'proxy_provider': name in PROVIDERS,
+        'attempts': len(samples),
+        'ok': len(ok),
+        'success_rate': round(len(ok) / len(samples), 3) if samples else 0.0,
+        # Tempo gasto (com as tentativas que falharam) por captura bem-sucedida
+        'ms_per_success': round(sum(s['seconds'] for s in samples) / len(ok) * 1000, 1) if ok else None,
+        'outcomes': dict(Counter(s['outcome'] for s in samples)),
+        'latency_ms': distribution([s['seconds'] for s in samples], 1000),
+        'ok_latency_ms': distribution([s['seconds'] for s in ok], 1000),
+        'bytes': distribution([s['bytes'] for s in ok], digits=0),
+        'dimensions': dict(Counter(f"{s['size'][0]}x{s['size'][1]}" for s in ok)),
+        'requested_size_rate': round(sum(1 for s in ok if s['size'] == [width, height]) / len(ok), 3) if ok else 0.0,
+        'throughput_rps': round(len(ok) / wall, 2) if wall > 0 else 0.0,
+        'wall_s': round(wall, 2),
+        'quota': {
+            'rate_limited': sum(1 for s in samples if s['outcome'] == 'quota'),
+            'min_remaining': min(quota) if quota else None
+        },
+        'failures': [{'url': s['url'], 'outcome': s['outcome']} for s in samples if s['outcome'] != 'ok'][:20]
+    }
+
+
+def rank(summaries: List[Dict]) -> List[Dict]:
+    """
+    Menor tempo por captura bem-sucedida primeiro: é o custo real de usar o
+    serviço no proxy, onde cada falha é uma tentativa perdida antes do próximo.
+    """
+    ranked = sorted(summaries, key=lambda summary: (summary['ms_per_success'] is None,
+                                                    summary['ms_per_success'] or 0.0))
+    for position, summary in enumerate(ranked, 1):
+        summary['rank'] = position
+    return ranked
+
+
+def benchmark_provider(name: str, urls: List[str], concurrency: int, timeout: float,
+                       width: int, height: int) -> Dict:
+    template = SERVICES[name]['url']
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(lambda url: measure(template, url, width, height, timeout), urls))
+    return summarize(name, samples, time.monotonic() - started, width, height)
+
+
+# ----------------------------------------------------------------------
+# Modo simulado: servidores locais no lugar dos serviços
+# ----------------------------------------------------------------------
+
+def make_png(width: int, height: int) -> bytes:
+    """PNG válido (faixas horizontais) com as dimensões pedidas"""
+    rows = b''.join(b'\x00' + bytes([(y * 7) % 256, 120, 200]) * width for y in range(height))
+
+    def chunk(kind: bytes, payload: bytes) -> bytes:
+        return struct.pack('>I', len(payload)) + kind + payload + struct.pack('>I', zlib.crc32(kind + payload))
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows, 6)) + chunk(b'IEND', b''))
+
+
+def requested_size(path: str) -> Tuple[int, int]:
+    """Tamanho pedido ao serviço (cada um usa um formato de parâmetro)"""
+    dimension = re.search(r'dimension=(\d+)x(\d+)', path)
+    if dimension:
+        return int(dimension.group(1)), int(dimension.group(2))
+    width = re.search(r'[/?&.](?:width|w)[=/](\d+)', path)
+    height = re.search(r'[/?&.](?:height|h|crop)[=/](\d+)', path)
+    return (min(int(width.group(1)), 1920) if width else WIDTH,
+            min(int(height.group(1)), 1920) if height else HEIGHT)
+
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    """Responde como o serviço indicado no primeiro segmento do caminho"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server: 'MockProviderServer'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        host = self.path.lstrip('/').split('/', 1)[0]
+        status, delay = self.server.mock.plan(host)
+        time.sleep(delay)
+        if status == 200:
+            body, content_type = self.server.mock.image(*requested_size(self.path)), 'image/png'
+        else:
+            body, content_type = b'<html><body>Service unavailable</body></html>', 'text/html'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if status == 429:
+            self.send_header('X-RateLimit-Remaining', '0')
+            self.send_header('Retry-After', '60')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+    mock: 'MockProviders'
+
+
+class MockProviders:
+    """
+    Servidor simulado em uma thread; use como context manager.
+    Cada serviço (host) tem uma latência base própria, derivada do nome,
+    para que o ranking tenha diferenças a medir.
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.1, error_rate: float = 0.0,
+                 quota_rate: float = 0.0, port: int = 0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.quota_rate = quota_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._images: Dict[Tuple[int, int], bytes] = {}
+        self.stats = {'requests': 0, 'errors': 0, 'quota': 0}
+        self._server = MockProviderServer(('127.0.0.1', port), MockProviderHandler)
+        self._server.mock = self
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self) -> 'MockProviders':
+        threading.Thread(target=self._server.serve_forever, name='mock-providers', daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def plan(self, host: str) -> Tuple[int, float]:
+        """(status, atraso) da próxima resposta do serviço"""
+        factor = random.Random(host).uniform(0.5, 2.0)
+        with self._lock:
+            self.stats['requests'] += 1
+            roll = self._random.random()
+            delay = self.latency * factor + self._random.uniform(0, self.jitter)
+            if roll < self.error_rate:
+                self.stats['errors'] += 1
+                return 503, delay
+            if roll < self.error_rate + self.quota_rate:
+                self.stats['quota'] += 1
+                return 429, delay
+        return 200, delay
+
+    def image(self, width: int, height: int) -> bytes:
+        with self._lock:
+            if (width, height) not in self._images:
+                self._images[(width, height)] = make_png(width, height)
+            return self._images[(width, height)]
+
+
+# ----------------------------------------------------------------------
+
+def print_table(ranked: List[Dict]) -> None:
+    print(f"\n{'#':>2}  {'serviço':<18} {'sucesso':>8} {'ms/ok':>8} {'p50(ms)':>8} {'p90(ms)':>8} {'p99(ms)':>8} "
+          f"{'KB':>7} {'req/s':>6}  dimensões")
+    print("-" * 99)
+    for summary in ranked:
+        latency = summary['ok_latency_ms'] or {}
+        size = summary['bytes']['p50'] / 1024 if summary['bytes'] else 0
+        dimensions = ', '.join(sorted(summary['dimensions'], key=summary['dimensions'].get, reverse=True)[:2]) or '-'
+        print(f"{summary['rank']:>2}  {summary['provider']:<18} {summary['success_rate']:>7.0%} "
+              f"{summary['ms_per_success'] or '-':>8} {latency.get('p50', '-'):>8} {latency.get('p90', '-'):>8} {latency.get('p99', '-'):>8} "
+              f"{size:>7.1f} {summary['throughput_rps']:>6}  {dimensions}")
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos serviços de screenshot")
+    parser.add_argument('--providers', default=','.join(SERVICES),
+                        help="serviços separados por vírgula (padrão: todos)")
+    parser.add_argument('--limit', type=int, default=0, help="usa só as N primeiras URLs (0 = todas)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="capturas simultâneas por serviço")
+    parser.add_argument('--timeout', type=float, default=TIMEOUT)
+    parser.add_argument('--width', type=int, default=WIDTH)
+    parser.add_argument('--height', type=int, default=HEIGHT)
+    parser.add_argument('--output', default=None,
+                        help="arquivo do relatório JSON (padrão: screenshot_benchmark.json, ou _mock com --mock)")
+    parser.add_argument('--mock', action='store_true', help="usa servidores locais no lugar dos serviços")
+    parser.add_argument('--latency', type=float, default=0.2, help="(--mock) latência base em segundos")
+    parser.add_argument('--jitter', type=float, default=0.1, help="(--mock) variação aleatória da latência")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="(--mock) fração de respostas 503")
+    parser.add_argument('--quota-rate', type=float, default=0.0, help="(--mock) fração de respostas 429")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    providers = [name.strip() for name in args.providers.split(',') if name.strip()]
+    unknown = [name for name in providers if name not in SERVICES]
+    if unknown:
+        parser.error(f"serviços desconhecidos: {', '.join(unknown)} (disponíveis: {', '.join(SERVICES)})")
+    output = args.output or (MOCK_REPORT if args.mock else BENCHMARK_REPORT)
+    urls = load_urls()
+    if args.limit:
+        urls = urls[:args.limit]
+
     print("="*80)
-    print("🔍 TESTADOR DE SERVIÇOS DE SCREENSHOT GRATUITOS")
+    print("🔍 BENCHMARK DOS SERVIÇOS DE SCREENSHOT")
     print("="*80)
-    print(f"\n🎯 URL de teste: {TEST_URL}\n")
-    
-    results = {}
-    
-    for name, service in SERVICES.items():
-        working = test_service(name, service)
-        results[name] = working
-        time.sleep(1)  # Pausa entre requisições
-    
-    # Resumo
+    print(f"\n🎯 {len(urls)} URLs × {len(providers)} serviços, {args.concurrency} capturas simultâneas por serviço"
+          f"{' (simulado)' if args.mock else ''}\n")
+
+    summaries = []
+    mock = MockProviders(args.latency, args.jitter, args.error_rate, args.quota_rate, seed=args.seed) if args.mock else None
+    with mock or contextlib.nullcontext():
+        if mock is not None:
+            http_client.set_url_rewriter(lambda url: local_url(mock.base_url, url),
+                                         lambda url: public_url(mock.base_url, url))
+        # Um serviço por vez: as medidas de um não disputam rede com as do outro
+        for name in providers:
+            print(f"🧪 {name}: {SERVICES[name]['description']}")
+            summary = benchmark_provider(name, urls, args.concurrency, args.timeout, args.width, args.height)
+            summaries.append(summary)
+            print(f"   {summary['ok']}/{summary['attempts']} ok, {summary['wall_s']}s, {summary['outcomes']}")
+
+    ranked = rank(summaries)
+    recommended = [s['provider'] for s in ranked if s['proxy_provider'] and s['success_rate'] >= MIN_SUCCESS_RATE]
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'mock': args.mock,
+        'config': {
+            'urls': len(urls), 'concurrency': args.concurrency, 'timeout': args.timeout,
+            'width': args.width, 'height': args.height,
+            **({'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+                'quota_rate': args.quota_rate, 'seed': args.seed} if args.mock else {})
+        },
+        'recommended_order': recommended,
+        'providers': ranked
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
     print("\n" + "="*80)
-    print("📊 RESUMO DOS RESULTADOS")
-    print("="*80 + "\n")
-    
-    working_services = [name for name, works in results.items() if works]
-    
-    if working_services:
-        print("✅ SERVIÇOS FUNCIONANDO:\n")
-        for name in working_services:
-            print(f"   • {name}")
-            print(f"     {SERVICES[name]['description']}\n")
-        
-        print("\n💡 RECOMENDAÇÃO:")
-        print(f"   Use: {working_services[0]}")
-        print("\n🔧 CÓDIGO PARA O DASHBOARD:\n")
-        
-        # Gera código JavaScript baseado no melhor serviço
-        best = working_services[0]
-        
-        if "Screenshot Machine" in best:
-            print("""
-function getScreenshotUrl(url) {
-    const finalUrl = getPublicUrl(url);
-    return `https://api.screenshotmachine.com/?key=demo&url=${encodeURIComponent(finalUrl)}&dimension=1200x800`;
-}
-            """)
-        elif "Screenshot.rocks" in best:
-            print("""
-function getScreenshotUrl(url) {
-    const finalUrl = getPublicUrl(url);
-    return `https://screenshot.rocks/api/screenshot?url=${encodeURIComponent(finalUrl)}&width=1200&height=800`;
-}
-            """)
-        elif "Microlink" in best:
-            print("""
-function getScreenshotUrl(url) {
-    const finalUrl = getPublicUrl(url);
-    return `https://api.microlink.io/?url=${encodeURIComponent(finalUrl)}&screenshot=true&meta=false&embed=screenshot.url`;
-}
-            """)
+    print("📊 RANKING")
+    print("="*80)
+    print_table(ranked)
+
+    print("\n💡 RECOMENDAÇÃO:")
+    if recommended:
+        print(f"   Ordem do proxy: SCREENSHOT_PROVIDERS={','.join(recommended)}")
+        if not args.mock:
+            print("   (aplicada automaticamente pelo screenshot_cache.py quando a variável não está definida)")
     else:
-        print("❌ NENHUM SERVIÇO FUNCIONOU!")
-        print("\n💡 ALTERNATIVA:")
-        print("   Use placeholders coloridos ou capturas locais")
-    
-    print("\n" + "="*80)
+        print("❌ NENHUM SERVIÇO DO PROXY FUNCIONOU!")
+        print("   Use placeholders coloridos ou capturas locais (generate_previews.py --renderer chrome)")
+    print(f"\n💾 Relatório salvo em: {output}")
+    print("="*80)
+    sys.exit(0 if recommended else 1)
+
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,120 @@
+"""Numeração de versões e delta de /api/sync-github (dashboard_api)"""
+
+import json
+
+import pytest
+
+import dashboard_api
+
+
+def active(repo: str, version: int, domain=None) -> dict:
+    return {'repo_name': repo, 'status': 'active', 'custom_domain': domain,
+            'final_url': f'https://{domain or repo}/', 'version': version}
+
+
+@pytest.fixture
+def world(monkeypatch):
+    """Cache com dois repositórios na versão 2; `refresh` simula a atualização em segundo plano"""
+    state = {'results': [active('A', 1), active('B', 2)], 'refresh_during_read': False}
+    monkeypatch.setitem(dashboard_api.SYNC_STATE, 'version', 2)
+
+    def refresh():
+        version = dashboard_api.bump_version()
+        state['results'] = [active('A', version, 'a.example.com'), state['results'][1]]
+
+    def get_repo_results(repos, max_age=None, force=False):
+        results = list(state['results'])
+        if state['refresh_during_read']:
+            # A atualização termina depois da leitura do cache, antes da resposta
+            state['refresh_during_read'] = False
+            refresh()
+        return results, {}
+
+    monkeypatch.setattr(dashboard_api, 'get_repo_results', get_repo_results)
+    monkeypatch.setattr(dashboard_api, 'iter_repo_results',
+                        lambda repos, max_age, force, cache_info: iter(get_repo_results(repos)[0]))
+    state['refresh'] = refresh
+    return state
+
+
+def test_change_during_read_is_not_skipped_by_next_delta(world):
+    client = dashboard_api.app.test_client()
+    world['refresh_during_read'] = True
+    first = client.get('/api/sync-github').get_json()
+
+    # A versão informada não cobre a mudança que o cliente não recebeu
+    assert first['version'] == 2
+    assert all(repo['custom_domain'] is None for repo in first['repositories'])
+
+    delta = client.get(f"/api/sync-github?since={first['version']}").get_json()
+    assert delta['delta'] is True
+    assert [repo['repo_name'] for repo in delta['repositories']] == ['A']
+    assert delta['custom_domains'] == {'A': 'a.example.com'}
+    assert delta['version'] == 3
+
+
+def test_stream_summary_uses_version_read_before_results(world):
+    client = dashboard_api.app.test_client()
+    world['refresh_during_read'] = True
+    body = client.get('/api/sync-github/stream').get_data(as_text=True)
+
+    events = [block.split('\n') for block in body.strip().split('\n\n')]
+    summary = next(json.loads(lines[1][len('data: '):]) for lines in events if lines[0] == 'event: summary')
+    assert summary['version'] == 2
+
+
+def test_delta_etag_depends_on_since(world):
+    client = dashboard_api.app.test_client()
+    full = client.get('/api/sync-github')
+    delta = client.get('/api/sync-github?since=1')
+    assert full.headers['ETag'] == '"sync-2"'
+    assert delta.headers['ETag'] == '"sync-2-since-1"'
+    assert client.get('/api/sync-github?since=1', headers={'If-None-Match': delta.headers['ETag']}).status_code == 304
+    assert client.get('/api/sync-github?since=1', headers={'If-None-Match': full.headers['ETag']}).status_code == 200
+
+
+@pytest.fixture
+def screenshots(monkeypatch):
+    """Store falso: registra as URLs que chegariam aos serviços de screenshot"""
+    captured = []
+
+    class Store:
+        def get(self, url, width, height, refresh, fingerprint):
+            captured.append(url)
+            return {'digest': '0' * 64}
+
+    monkeypatch.setattr(dashboard_api, 'get_screenshot_store', lambda: Store())
+    monkeypatch.setattr(dashboard_api, 'RESULT_CACHE', dashboard_api.ResultCache(dashboard_api.CACHE_TTL))
+    return captured
+
+
+@pytest.mark.parametrize('url', [
+    'https://mediagrowthmkt-debug.github.io/AMCC-LP/',
+    'https://protecpremiumgranite.com',
+    'granite.protecpremiumgranite.com',
+])
+def test_screenshot_accepts_known_hosts(screenshots, url):
+    response = dashboard_api.app.test_client().get('/api/screenshot', query_string={'url': url})
+    assert response.status_code == 302
+    assert screenshots == [url]
+
+
+@pytest.mark.parametrize('url', [
+    'https://example.com/',
+    'http://169.254.169.254/latest/meta-data/',
+    'https://protecpremiumgranite.com.example.com/',
+])
+def test_screenshot_rejects_unknown_hosts(screenshots, url):
+    response = dashboard_api.app.test_client().get('/api/screenshot', query_string={'url': url})
+    assert response.status_code == 403
+    assert screenshots == []
+
+
+def test_screenshot_accepts_domains_found_by_probes(screenshots):
+    url = 'https://lp.novo-cliente.example/'
+    client = dashboard_api.app.test_client()
+    assert client.get('/api/screenshot', query_string={'url': url}).status_code == 403
+
+    dashboard_api.RESULT_CACHE.set('AMCC-LP', {'status': 'active', 'final_url': url,
+                                               'custom_domain': 'lp.novo-cliente.example'})
+    assert client.get('/api/screenshot', query_string={'url': url}).status_code == 302
@@ -0,0 +1,65 @@
+"""Scan incremental de domínios (fetch_all_github_repos)"""
+
+import pytest
+
+import fetch_all_github_repos as scan
+
+
+def repo(name: str = 'site') -> dict:
+    return {'name': name, 'homepage': None, 'default_branch': 'main',
+            'pushed_at': '2026-01-01T00:00:00Z', 'updated_at': '2026-01-01T00:00:00Z'}
+
+
+@pytest.fixture
+def branches(monkeypatch, tmp_path):
+    """Resposta de cada branch ao ler o CNAME: (domínio, confirmado)"""
+    responses = {}
+
+    async def fetch_cname(repo_name, branch):
+        return responses.get(branch, (None, True))
+
+    monkeypatch.setattr(scan, 'NEGATIVE_CACHE', scan.NegativeCache(str(tmp_path / 'negative.json')))
+    monkeypatch.setattr(scan, 'fetch_pages_source', lambda repo_name: None)
+    monkeypatch.setattr(scan, 'fetch_cname', fetch_cname)
+    return responses
+
+
+def test_network_error_is_rescanned_on_next_run(branches):
+    # gh-pages não respondeu: a ausência de CNAME não está confirmada
+    branches['gh-pages'] = (None, False)
+    first = repo()
+    assert scan.analyze_repo(first) == (None, 'CNAME')
+    assert first['cname_confirmed'] is False
+    assert not scan.NEGATIVE_CACHE.is_negative('site', first['pushed_at'])
+
+    # Mesmo pushed_at/updated_at, mas o resultado anterior não foi confirmado
+    assert not scan.is_unchanged(first, repo())
+
+    branches['gh-pages'] = ('www.site.example', True)
+    second = repo()
+    assert scan.analyze_repo(second) == ('www.site.example', 'CNAME')
+    assert second['cname_confirmed'] is True
+    assert scan.is_unchanged(second, repo())
+
+
+def test_confirmed_absence_is_reused(branches):
+    first = repo()
+    assert scan.analyze_repo(first) == (None, 'CNAME')
+    assert first['cname_confirmed'] is True
+    assert scan.is_unchanged(first, repo())
+
+
+def test_results_without_flag_are_rescanned():
+    # Scans anteriores ao campo cname_confirmed
+    previous = repo()
+    assert not scan.is_unchanged(previous, repo())
+
+
+def test_negative_cache_skips_pages_api(branches, monkeypatch):
+    def fetch_pages_source(repo_name):
+        raise AssertionError('/pages consultado para repositório no cache negativo')
+
+    scan.NEGATIVE_CACHE.add('site', repo()['pushed_at'])
+    monkeypatch.setattr(scan, 'fetch_pages_source', fetch_pages_source)
+    assert scan.analyze_repo(repo()) == (None, 'CNAME')
+    assert scan.NEGATIVE_CACHE.hits == 1
@@ -0,0 +1,55 @@
+"""Geração em lote das miniaturas (generate_previews)"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import generate_previews
+
+KEY = 'https://site.example'
+IMAGE = 'site-abc123-original-0123456789.png'
+
+
+@pytest.fixture
+def previews(monkeypatch, tmp_path):
+    """Manifesto anterior com uma miniatura; a página mudou e precisa ser capturada de novo"""
+    (tmp_path / IMAGE).write_bytes(b'\x89PNG anterior')
+    previous = {'url': KEY, 'name': 'Site', 'company': 'Cliente', 'fingerprint': 'antiga',
+                'images': {'original': {'png': IMAGE, 'width': 1200, 'height': 800}}}
+    generate_previews.save_manifest(str(tmp_path), {'signature': generate_previews.sizes_signature(),
+                                                    'projects': {KEY: previous}})
+
+    target = {'key': KEY, 'url': KEY, 'name': 'Site', 'company': 'Cliente', 'slug': 'site-abc123'}
+    monkeypatch.setattr(generate_previews, 'load_targets', lambda: [dict(target)])
+    monkeypatch.setattr(generate_previews, 'fetch_fingerprints', lambda targets: {KEY: ('nova', KEY + '/')})
+    monkeypatch.setattr(generate_previews, 'capture_with_api', lambda url, fingerprint: (b'captura', 'teste'))
+    # Renderização no mesmo processo (o pool de processos não enxerga o monkeypatch)
+    monkeypatch.setattr(generate_previews, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    return tmp_path, previous
+
+
+def test_render_failure_keeps_previous_entry(previews, monkeypatch):
+    output_dir, previous = previews
+
+    def render_variants(source, slug, output_dir):
+        raise OSError('imagem inválida')
+
+    monkeypatch.setattr(generate_previews, 'render_variants', render_variants)
+    stats = generate_previews.build_previews(output_dir=str(output_dir))
+
+    assert stats['failed'] == 1 and stats['kept_stale'] == 1
+    assert generate_previews.load_manifest(str(output_dir))['projects'][KEY] == previous
+    assert (output_dir / IMAGE).exists()
+
+
+def test_visual_change_is_reset_when_not_reanalyzed(tmp_path):
+    # Projeto reaproveitado: a mudança apontada na execução anterior não vale mais
+    visual = {'ahash': '0' * 16, 'dhash': '0' * 16, 'phash': '0' * 16, 'std': 40.0,
+              'blank': False, 'changed': True, 'distance': 21.0}
+    projects = {KEY: {'name': 'Site', 'company': 'Cliente', 'images': {}, 'visual': visual}}
+
+    stats = generate_previews.analyze_visuals(projects, {}, {KEY: projects[KEY]}, str(tmp_path))
+
+    assert stats['visual_changes'] == 0
+    assert projects[KEY]['visual'] == {**visual, 'changed': False}
+    assert visual['changed'] is True  # o manifesto anterior não é alterado
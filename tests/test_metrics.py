@@ -0,0 +1,30 @@
+"""Exportação das métricas (metrics)"""
+
+import requests
+
+import metrics
+
+
+class QuotaResponse(requests.Response):
+    def __init__(self, remaining: int):
+        super().__init__()
+        self.status_code = 200
+        self._content = ('{"resources": {"core": {"limit": 60, "remaining": %d, "reset": 0}}}' % remaining).encode()
+
+
+def test_github_quota_is_read_from_rate_limit_endpoint(monkeypatch):
+    calls = []
+
+    def request(method, url, **kwargs):
+        calls.append(url)
+        return QuotaResponse(42)
+
+    monkeypatch.setattr(metrics.http_client, 'request', request)
+    monkeypatch.setitem(metrics._github_quota, 'checked_at', 0.0)
+
+    output = metrics.REGISTRY.render()
+    assert 'github_rate_limit_remaining{resource="core"} 42' in output
+    assert 'github_rate_limit_limit{resource="core"} 60' in output
+    # As duas métricas e as exportações seguintes (dentro do TTL) usam a mesma consulta
+    metrics.REGISTRY.render()
+    assert calls == [metrics.GITHUB_RATE_LIMIT_URL]
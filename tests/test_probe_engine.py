@@ -0,0 +1,76 @@
+"""Timeout adaptativo x circuit breaker (probe_engine)"""
+
+import time
+
+import pytest
+import requests
+
+import latency_tracker
+import probe_engine
+from circuit_breaker import CircuitBreaker, HostDownError
+from latency_tracker import LatencyTracker
+
+HOST = 'slow.test'
+URL = f'https://{HOST}/'
+
+
+class FakeResponse:
+    status_code = 200
+    url = URL
+    headers = {}
+
+
+class SlowHost:
+    """Responde depois de `delay` segundos ou levanta ReadTimeout se passar do timeout"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.timeouts = []
+
+    def __call__(self, url, timeout):
+        self.timeouts.append(timeout)
+        if self.delay > timeout:
+            time.sleep(timeout)
+            raise requests.exceptions.ReadTimeout('read timeout')
+        time.sleep(self.delay)
+        return FakeResponse()
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    breaker = CircuitBreaker(threshold=3, cooldown=60)
+    tracker = LatencyTracker(min_samples=10)
+    monkeypatch.setattr(latency_tracker, 'MIN_TIMEOUT', 0.05)
+    monkeypatch.setattr(probe_engine, 'get_circuit_breaker', lambda: breaker)
+    monkeypatch.setattr(probe_engine, 'get_latency_tracker', lambda: tracker)
+    for _ in range(20):
+        tracker.record(HOST, 0.01)
+    engine = probe_engine.ProbeEngine(concurrency=4, per_host=4)
+    engine.breaker = breaker
+    engine.tracker = tracker
+    return engine
+
+
+@pytest.mark.parametrize('hedge', [False, True])
+def test_slower_host_under_ceiling_is_retried_not_tripped(engine, hedge):
+    host = SlowHost(delay=0.2)
+    for _ in range(4):
+        response = engine.run(engine._call(URL, host, URL, hedge=hedge, timeout=1.0))
+        assert response.status_code == 200
+
+    assert engine.breaker.snapshot() == {}
+    # A primeira chamada estoura o timeout adaptativo e repete com o teto do
+    # chamador; as latências novas fazem o timeout do host acompanhar a lentidão
+    assert engine.tracker.stats['timeout_retries'] >= 1
+    assert 1.0 in host.timeouts
+
+
+def test_timeout_at_ceiling_opens_breaker(engine):
+    host = SlowHost(delay=0.5)
+    for _ in range(3):
+        with pytest.raises(requests.exceptions.Timeout):
+            engine.run(engine._call(URL, host, URL, timeout=0.2))
+
+    assert engine.breaker.snapshot()[HOST]['state'] == 'open'
+    with pytest.raises(HostDownError):
+        engine.run(engine._call(URL, host, URL, timeout=0.2))
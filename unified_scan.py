@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Scan unificado: verifica uma única vez cada URL distinta usada pelos scanners
+e gera, a partir desse mesmo resultado, todos os relatórios JSON:
+
+- github_pages_verification.json (verify_github_pages.py)
+- url_check_results.json         (check_dashboard_urls.py)
+- github_repos_analysis.json     (fetch_all_github_repos.py - API do GitHub + CNAME)
+
+O relatório do smart_scanner.py (GitHub Pages e domínios personalizados
+conhecidos) é impresso a partir das mesmas verificações.
+
+Uso:
+    python3 unified_scan.py [--full] [--skip-github-api]
+
+    --full             repassado ao fetch_all_github_repos (desativa o modo incremental)
+    --skip-github-api  não gera github_repos_analysis.json
+"""
+
+import sys
+import time
+from typing import List
+
+import requests
+
+import check_dashboard_urls
+import fetch_all_github_repos
+import smart_scanner
+import verify_github_pages
+from probe_engine import get_engine, normalize_url
+
+
+def collect_targets() -> List[str]:
+    """União (sem repetições) das URLs verificadas pelos scanners"""
+    urls = [
+        f"https://{verify_github_pages.GITHUB_USERNAME}.github.io/{repo}/"
+        for repo in verify_github_pages.KNOWN_REPOS
+    ]
+    urls += [url for _, url in check_dashboard_urls.TEST_URLS]
+    urls += [f"{smart_scanner.GITHUB_PAGES_BASE}/{repo}/" for repo in smart_scanner.REPOS]
+    urls += [f"https://{domain}" for domain in smart_scanner.CUSTOM_DOMAINS.values()]
+
+    distinct = {}
+    for url in urls:
+        distinct.setdefault(normalize_url(url), url)
+    return list(distinct.values())
+
+
+def main():
+    skip_github_api = '--skip-github-api' in sys.argv[1:]
+    engine = get_engine()
+    start = time.time()
+
+    print("="*80)
+    print("🚀 SCAN UNIFICADO")
+    print("="*80 + "\n")
+
+    with engine.shared_probes() as stats:
+        targets = collect_targets()
+        print(f"🌐 Verificando {len(targets)} URLs distintas de uma só vez...\n")
+
+        async def warm(url: str) -> None:
+            try:
+                await engine.probe(url, timeout=verify_github_pages.TIMEOUT)
+            except requests.RequestException:
+                pass  # A mesma exceção é entregue aos scanners abaixo
+
+        engine.map(warm, targets)
+
+        # Os scanners reaproveitam as respostas acima, sem novas requisições
+        verification = verify_github_pages.scan_all_repos()
+        verify_github_pages.save_results(verification)
+
+        print("="*80)
+        print("🔍 URLs DO DASHBOARD")
+        print("="*80 + "\n")
+        url_results = check_dashboard_urls.check_all_urls()
+        print()
+        check_dashboard_urls.save_results(url_results)
+
+        smart_scanner.main()
+
+        # Também dentro do bloco: as verificações do script usam o mesmo motor
+        if not skip_github_api:
+            print("="*80)
+            print("🐙 REPOSITÓRIOS VIA API DO GITHUB")
+            print("="*80 + "\n")
+            fetch_all_github_repos.main()
+
+    print("\n" + "="*80)
+    print("📊 RESUMO DO SCAN UNIFICADO")
+    print("="*80)
+    print(f"URLs verificadas (requisições de página): {stats['distinct']}")
+    print(f"Verificações reaproveitadas: {stats['reused']}")
+    print(f"Tempo total: {time.time() - start:.1f}s")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Scan interrompido pelo usuário")
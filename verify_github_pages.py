@@ -7,7 +7,9 @@ e detectar domínios personalizados através de requisições HTTP.
 import requests
 import json
 from typing import Dict, List, Optional
-import time
+
+from circuit_breaker import HostDownError
+from probe_engine import get_engine
 
 # Configurações
 GITHUB_USERNAME = "mediagrowthmkt-debug"
@@ -54,14 +56,15 @@ KNOWN_REPOS = [
     "LP-PROTEC-QUARTZ",
 ]
 
-def check_github_pages_url(repo_name: str) -> Dict:
+async def check_github_pages_url(repo_name: str) -> Dict:
     """Verifica se a URL do GitHub Pages está ativa"""
     url = f"https://{GITHUB_USERNAME}.github.io/{repo_name}/"
     
-    print(f"🔍 Verificando: {repo_name}...", end=" ")
+    # As verificações rodam em paralelo: cada linha é impressa de uma vez
+    label = f"🔍 Verificando: {repo_name}..."
     
     try:
-        response = requests.get(url, timeout=TIMEOUT, allow_redirects=True)
+        response = await get_engine().probe(url, timeout=TIMEOUT, allow_redirects=True)
         
         if response.status_code == 200:
             # Verifica se houve redirect para domínio personalizado
@@ -69,7 +72,7 @@ def check_github_pages_url(repo_name: str) -> Dict:
             if final_url != url and not final_url.startswith(f"https://{GITHUB_USERNAME}.github.io"):
                 # Domínio personalizado detectado
                 custom_domain = final_url.replace('https://', '').replace('http://', '').split('/')[0]
-                print(f"✅ ATIVO | 🌟 Domínio: {custom_domain}")
+                print(f"{label} ✅ ATIVO | 🌟 Domínio: {custom_domain}")
                 return {
                     'repo_name': repo_name,
                     'github_pages_url': url,
@@ -79,7 +82,7 @@ def check_github_pages_url(repo_name: str) -> Dict:
                     'status_code': response.status_code
                 }
             else:
-                print(f"✅ ATIVO | 🌐 GitHub Pages")
+                print(f"{label} ✅ ATIVO | 🌐 GitHub Pages")
                 return {
                     'repo_name': repo_name,
                     'github_pages_url': url,
@@ -89,7 +92,7 @@ def check_github_pages_url(repo_name: str) -> Dict:
                     'status_code': response.status_code
                 }
         elif response.status_code == 404:
-            print(f"❌ 404 (Não encontrado)")
+            print(f"{label} ❌ 404 (Não encontrado)")
             return {
                 'repo_name': repo_name,
                 'github_pages_url': url,
@@ -97,7 +100,7 @@ def check_github_pages_url(repo_name: str) -> Dict:
                 'status_code': 404
             }
         else:
-            print(f"⚠️  Status: {response.status_code}")
+            print(f"{label} ⚠️  Status: {response.status_code}")
             return {
                 'repo_name': repo_name,
                 'github_pages_url': url,
@@ -105,15 +108,23 @@ def check_github_pages_url(repo_name: str) -> Dict:
                 'status_code': response.status_code
             }
             
+    except HostDownError as e:
+        print(f"{label} 🔌 Host fora do ar ({e.host})")
+        return {
+            'repo_name': repo_name,
+            'github_pages_url': url,
+            'status': 'host_down',
+            'error': str(e)
+        }
     except requests.exceptions.Timeout:
-        print(f"⏱️  Timeout")
+        print(f"{label} ⏱️  Timeout")
         return {
             'repo_name': repo_name,
             'github_pages_url': url,
             'status': 'timeout'
         }
     except requests.exceptions.RequestException as e:
-        print(f"❌ Erro: {str(e)[:50]}")
+        print(f"{label} ❌ Erro: {str(e)[:50]}")
         return {
             'repo_name': repo_name,
             'github_pages_url': url,
@@ -132,11 +143,11 @@ def scan_all_repos() -> Dict:
         'active': 0,
         'with_custom_domain': 0,
         'not_found': 0,
+        'host_down': 0,
         'repositories': []
     }
     
-    for repo in KNOWN_REPOS:
-        result = check_github_pages_url(repo)
+    for result in get_engine().map(check_github_pages_url, KNOWN_REPOS):
         results['repositories'].append(result)
         
         if result['status'] == 'active':
@@ -145,8 +156,8 @@ def scan_all_repos() -> Dict:
                 results['with_custom_domain'] += 1
         elif result['status'] == 'not_found':
             results['not_found'] += 1
-        
-        time.sleep(0.5)  # Rate limiting
+        elif result['status'] == 'host_down':
+            results['host_down'] += 1
     
     return results
 
@@ -159,6 +170,7 @@ def generate_custom_domains_object(results: Dict) -> str:
     print(f"GitHub Pages ativos: {results['active']}")
     print(f"Com domínio personalizado: {results['with_custom_domain']}")
     print(f"Não encontrados (404): {results['not_found']}")
+    print(f"Hosts fora do ar: {results['host_down']}")
     print("="*70 + "\n")
     
     # Gera objeto CUSTOM_DOMAINS
@@ -189,15 +201,19 @@ def generate_custom_domains_object(results: Dict) -> str:
     
     return js_code
 
+def save_results(results: Dict, filename: str = 'github_pages_verification.json') -> None:
+    """Salva os resultados no formato de github_pages_verification.json"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    
+    print(f"💾 Resultados salvos em: {filename}\n")
+
 def main():
     results = scan_all_repos()
     generate_custom_domains_object(results)
     
     # Salva resultados
-    with open('github_pages_verification.json', 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
-    
-    print("💾 Resultados salvos em: github_pages_verification.json\n")
+    save_results(results)
     print("="*70)
     print("✨ VERIFICAÇÃO COMPLETA!")
     print("="*70)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Comparação visual dos previews por hashes perceptuais.
+
+Cada preview é reduzido a uma amostra em tons de cinza e vira três hashes
+de 64 bits (aHash, dHash e pHash). Todas as amostras de uma execução são
+processadas de uma vez em arrays NumPy, e a comparação com a geração
+anterior (distância de Hamming) também é feita em lote. São sinalizados:
+
+- blank: captura em branco ou quase uniforme (página que não carregou,
+  tela de erro lisa)
+- changed: a página mudou visualmente em relação à geração anterior
+
+Usado por generate_previews.py (resultado em previews/manifest.json, campo
+`visual` de cada projeto) e exposto em /api/visual-diff.
+
+Requer NumPy e Pillow (pip install numpy Pillow); sem eles a análise é pulada.
+
+Uso:
+    python3 visual_diff.py   # resumo da última geração
+"""
+
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = None
+    PIL_AVAILABLE = False
+
+VISUAL_DIFF_AVAILABLE = NUMPY_AVAILABLE and PIL_AVAILABLE
+
+SAMPLE_SIZE = 32                       # amostra 32x32 (aHash e pHash)
+DHASH_SIZE = (9, 8)                    # amostra 9x8 (dHash: 8 diferenças por linha)
+SAMPLE_BYTES = SAMPLE_SIZE * SAMPLE_SIZE + DHASH_SIZE[0] * DHASH_SIZE[1]
+HASH_NAMES = ('ahash', 'dhash', 'phash')
+
+# Média de bits diferentes (de 64) entre os três hashes para considerar mudança visual
+CHANGE_THRESHOLD = float(os.environ.get('VISUAL_CHANGE_THRESHOLD', 10))
+# Desvio padrão dos tons de cinza (0-255) abaixo do qual a captura é considerada em branco
+BLANK_STD_THRESHOLD = float(os.environ.get('VISUAL_BLANK_STD', 3.0))
+
+_dct_matrix = None
+
+
+def sample_image(image) -> bytes:
+    """Amostras em tons de cinza usadas pelos hashes (32x32 + 9x8 bytes)"""
+    gray = image.convert('L')
+    return (gray.resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.LANCZOS).tobytes() +
+            gray.resize(DHASH_SIZE, Image.LANCZOS).tobytes())
+
+
+def load_sample(path: str) -> Optional[bytes]:
+    """Amostra de um arquivo de imagem (None se não puder ser lido)"""
+    try:
+        with Image.open(path) as image:
+            # JPEG: decodifica já reduzido (bem mais rápido)
+            image.draft('L', (SAMPLE_SIZE * 4, SAMPLE_SIZE * 4))
+            return sample_image(image)
+    except (OSError, ValueError):
+        return None
+
+
+def _dct() -> 'np.ndarray':
+    """Matriz da DCT-II ortonormal 32x32 (pHash)"""
+    global _dct_matrix
+    if _dct_matrix is None:
+        n = SAMPLE_SIZE
+        k = np.arange(n)[:, None]
+        i = np.arange(n)[None, :]
+        matrix = np.sqrt(2.0 / n) * np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+        matrix[0] /= np.sqrt(2.0)
+        _dct_matrix = matrix.astype(np.float32)
+    return _dct_matrix
+
+
+def _pack(bits: 'np.ndarray') -> 'np.ndarray':
+    """Matriz N x 64 de booleanos -> N hashes uint64"""
+    return np.packbits(bits, axis=1).view('>u8').ravel().astype(np.uint64)
+
+
+def compute_hashes(samples: List[bytes]) -> Dict[str, 'np.ndarray']:
+    """aHash, dHash, pHash (uint64) e desvio padrão de todas as amostras de uma vez"""
+    data = np.frombuffer(b''.join(samples), dtype=np.uint8).reshape(len(samples), SAMPLE_BYTES)
+    square = data[:, :SAMPLE_SIZE * SAMPLE_SIZE].reshape(-1, SAMPLE_SIZE, SAMPLE_SIZE).astype(np.float32)
+    wide = data[:, SAMPLE_SIZE * SAMPLE_SIZE:].reshape(-1, DHASH_SIZE[1], DHASH_SIZE[0]).astype(np.int16)
+
+    # aHash: blocos 4x4 -> 8x8, acima ou abaixo da média da imagem
+    blocks = square.reshape(-1, 8, 4, 8, 4).mean(axis=(2, 4)).reshape(-1, 64)
+    ahash = blocks > blocks.mean(axis=1, keepdims=True)
+
+    # dHash: cada pixel comparado com o vizinho da direita
+    dhash = (wide[:, :, 1:] > wide[:, :, :-1]).reshape(-1, 64)
+
+    # pHash: frequências baixas (8x8) da DCT, acima ou abaixo da mediana (sem o termo DC)
+    dct = _dct()
+    low = (dct @ square @ dct.T)[:, :8, :8].reshape(-1, 64)
+    phash = low > np.median(low[:, 1:], axis=1, keepdims=True)
+
+    return {
+        'ahash': _pack(ahash),
+        'dhash': _pack(dhash),
+        'phash': _pack(phash),
+        'std': square.std(axis=(1, 2))
+    }
+
+
+def hamming(a: 'np.ndarray', b: 'np.ndarray') -> 'np.ndarray':
+    """Bits diferentes entre pares de hashes uint64"""
+    xor = np.bitwise_xor(a, b)
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def analyze(samples: Dict[str, bytes], previous: Dict[str, Optional[Dict]]) -> Dict[str, Dict]:
+    """
+    Hashes de cada amostra, comparados em lote com os da geração anterior.
+    `previous` mapeia a chave para o resultado anterior (campo `visual`) ou None.
+    """
+    keys = list(samples)
+    if not keys:
+        return {}
+    hashes = compute_hashes([samples[key] for key in keys])
+
+    has_previous = np.array([bool(previous.get(key)) for key in keys])
+    distance = np.zeros(len(keys), dtype=np.float32)
+    for name in HASH_NAMES:
+        before = np.array([int(previous[key][name], 16) if previous.get(key) else 0 for key in keys], dtype=np.uint64)
+        distance += hamming(hashes[name], before)
+    distance /= len(HASH_NAMES)
+
+    blank = hashes['std'] < BLANK_STD_THRESHOLD
+    changed = has_previous & (distance > CHANGE_THRESHOLD)
+
+    results = {}
+    for i, key in enumerate(keys):
+        result = {name: f"{int(hashes[name][i]):016x}" for name in HASH_NAMES}
+        result.update(
+            std=round(float(hashes['std'][i]), 2),
+            blank=bool(blank[i]),
+            changed=bool(changed[i]),
+            distance=round(float(distance[i]), 1) if has_previous[i] else None
+        )
+        results[key] = result
+    return results
+
+
+def summarize(manifest: Dict) -> Dict:
+    """Resumo da análise visual do manifesto (usado pela API e pela linha de comando)"""
+    flagged = []
+    analyzed = 0
+    for key, entry in manifest.get('projects', {}).items():
+        visual = entry.get('visual')
+        if not visual:
+            continue
+        analyzed += 1
+        if visual['blank'] or visual['changed']:
+            flagged.append({
+                'key': key,
+                'name': entry.get('name'),
+                'company': entry.get('company'),
+                'url': entry.get('url'),
+                'generated_at': entry.get('generated_at'),
+                **visual
+            })
+    return {
+        'generated_at': manifest.get('generated_at'),
+        'analyzed': analyzed,
+        'blank': sum(1 for item in flagged if item['blank']),
+        'changed': sum(1 for item in flagged if item['changed']),
+        'change_threshold': CHANGE_THRESHOLD,
+        'blank_std_threshold': BLANK_STD_THRESHOLD,
+        'flagged': flagged
+    }
+
+
+def main():
+    from generate_previews import MANIFEST_NAME, PREVIEWS_DIR
+
+    try:
+        with open(os.path.join(PREVIEWS_DIR, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        print("❌ Manifesto não encontrado: rode generate_previews.py primeiro")
+        sys.exit(1)
+
+    summary = summarize(manifest)
+    print(f"🖼️  {summary['analyzed']} previews analisados ({summary['generated_at']})")
+    for item in summary['flagged']:
+        if item['blank']:
+            print(f"⬜ Em branco: {item['company']} - {item['name']} (desvio {item['std']})")
+        if item['changed']:
+            print(f"🔄 Mudou: {item['company']} - {item['name']} ({item['distance']} bits)")
+    if not summary['flagged']:
+        print("✅ Nenhuma captura em branco ou mudança visual")
+    print(json.dumps({k: v for k, v in summary.items() if k != 'flagged'}, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()